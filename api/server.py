@@ -1,10 +1,28 @@
 from fastapi import FastAPI
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 from pathlib import Path
+import asyncio
+import json
+import subprocess
 
 from main import AIPROSCore
+from automation.chain_runner import get_chain_run
+from automation.tools.report_tools import search_endpoint_stats
+from automation.tools.http_cache import http_cache_stats
+from memory.preference_store import set_preference
+from llm.intent_classifier import (
+    intent_warmup_status,
+    query_embedding_cache_stats,
+    intent_llm_metrics,
+    learned_index_stats,
+)
+from llm.ollama_async import ollama_async_stats
+from llm.ollama_service_manager import ollama_health_status
+from llm.ollama_client import chat_stream_metrics
+from llm.completion_cache import llm_cache_stats
+from llm.chat_session import chat_session_stats
 
 # -----------------------------
 # App
@@ -30,11 +48,32 @@ def serve_ui():
     return index_file.read_text(encoding="utf-8")
 
 
+@app.get("/status")
+def status():
+    """
+    Readiness of background warm-up and classifier metrics.
+    """
+    return {
+        "ollama": ollama_health_status(),
+        "intent_index": intent_warmup_status(),
+        "query_embedding_cache": query_embedding_cache_stats(),
+        "intent_llm": intent_llm_metrics(),
+        "learned_examples": learned_index_stats(),
+        "ollama_async": ollama_async_stats(),
+        "chat_stream": chat_stream_metrics(),
+        "llm_cache": llm_cache_stats(),
+        "chat_sessions": chat_session_stats(),
+        "search_endpoints": search_endpoint_stats(),
+        "http_cache": http_cache_stats(),
+    }
+
+
 # -----------------------------
 # API models
 # -----------------------------
 class CommandRequest(BaseModel):
     text: str
+    session_id: str | None = None
 
 
 class ResumeRequest(BaseModel):
@@ -42,30 +81,84 @@ class ResumeRequest(BaseModel):
     data: dict
 
 
+class ChainResumeRequest(BaseModel):
+    choice: dict | None = None
+    cancel: bool = False
+
+
+# -----------------------------
+# Chain streaming
+# -----------------------------
+def _stream_chain(run):
+    """
+    Streams chain events as NDJSON until the run pauses or finishes.
+    """
+    def lines():
+        for event in run.events():
+            yield json.dumps(event, default=str) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+def _stream_chat(tokens):
+    """
+    Streams a chat answer as NDJSON token events as Ollama produces them.
+    `tokens` is an async iterator, so no thread waits on the generation.
+    """
+    async def lines():
+        try:
+            async for token in tokens:
+                yield json.dumps({"type": "chat", "status": "token", "text": token}) + "\n"
+        except Exception as e:
+            yield json.dumps({"type": "chat", "status": "error", "message": str(e)}) + "\n"
+            return
+        yield json.dumps({"type": "chat", "status": "done"}) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+def _confirm_choice(intent: dict, paused: dict, choice: dict) -> dict:
+    """
+    Opens the option picked for a paused chain step and remembers it,
+    like the single-command confirmation flow.
+    """
+    path = choice.get("path")
+    if not path:
+        return {"executed": False, "status": "error", "error": "No option selected"}
+
+    subprocess.Popen(["explorer.exe", path])
+    folder_name = (paused.get("args") or intent.get("args") or {}).get("folder_name")
+    if folder_name:
+        set_preference(f"folder::{folder_name}", path)
+
+    return {"executed": True, "status": "success", "tool": intent.get("tool"), "output": {"path": path}}
+
+
 # -----------------------------
 # Command endpoint
 # -----------------------------
 @app.post("/command")
-def run_command(req: CommandRequest):
+async def run_command(req: CommandRequest):
     print("API_HIT:", req.text)
 
     try:
-        result = core.process_input(req.text)
+        # 🔵 Command chain: steps execute as soon as they are classified
+        run = await asyncio.to_thread(core.start_chain, req.text, confirm=_confirm_choice)
+        if run:
+            return _stream_chain(run)
+
+        result = await core.process_input_async(req.text, stream_chat=True, session_id=req.session_id)
+
+        # 🟢 Chat response, streamed token by token
+        if result.get("mode") == "chat" and result.get("stream") is not None:
+            return _stream_chat(result["stream"])
 
-        # 🟢 Chat response
         if result.get("mode") == "chat":
             return JSONResponse({
                 "status": "chat",
                 "message": result.get("response", "")
             })
 
-        # 🔵 Command chain
-        if result.get("mode") == "chain":
-            return JSONResponse({
-                "status": "chain",
-                "intents": result.get("intents", [])
-            })
-
         # 🟡 Needs confirmation
         if result.get("needs_confirmation"):
             return JSONResponse({
@@ -102,12 +195,12 @@ def run_command(req: CommandRequest):
 # Resume after confirmation
 # -----------------------------
 @app.post("/resume")
-def resume_after_confirmation(req: ResumeRequest):
+async def resume_after_confirmation(req: ResumeRequest):
     """
     Used when user selects one option (folder/app/etc.)
     """
     try:
-        result = core.process_input(req.choice)
+        result = await core.process_input_async(req.choice)
 
         return JSONResponse({
             "type": "success",
@@ -121,17 +214,44 @@ def resume_after_confirmation(req: ResumeRequest):
             "message": str(e)
         })
 
+@app.post("/chain/{run_id}/resume")
+def resume_chain(run_id: str, req: ChainResumeRequest):
+    """
+    Continues (or cancels) a chain paused for confirmation and streams
+    the remaining steps.
+    """
+    run = get_chain_run(run_id)
+    if not run:
+        return JSONResponse({"status": "error", "message": "Unknown chain"}, status_code=404)
+
+    if req.cancel:
+        if not run.cancel():
+            return JSONResponse({"status": "error", "message": f"Chain is already {run.status}"}, status_code=409)
+    elif not run.resume(req.choice):
+        return JSONResponse({"status": "error", "message": f"Chain is {run.status}"}, status_code=409)
+
+    return _stream_chain(run)
+
+
+@app.get("/chain/{run_id}")
+def chain_status(run_id: str):
+    run = get_chain_run(run_id)
+    if not run:
+        return JSONResponse({"status": "error", "message": "Unknown chain"}, status_code=404)
+    return run.snapshot()
+
+
 from voice.speech_to_text import listen_once, get_last_error
 
 @app.post("/voice")
-def voice_command():
+async def voice_command():
     try:
-        text = listen_once()
+        text = await asyncio.to_thread(listen_once)
         if not text:
             msg = get_last_error() or "Could not understand speech"
             return {"status": "error", "message": msg}
 
-        result = core.process_input(text)
+        result = await core.process_input_async(text)
 
         return {
             "status": "ok",
@@ -1,8 +1,8 @@
 import streamlit as st
 import subprocess
+import uuid
 from main import AIPROSCore
 from memory.preference_store import get_preference, set_preference
-from automation.executor import execute_plan
 
 # -----------------------------
 # Session state
@@ -12,7 +12,9 @@ if "pending_confirmation" not in st.session_state:
 
 if "pending_chain" not in st.session_state:
     st.session_state.pending_chain = None
-    st.session_state.pending_chain_index = 0
+
+if "chat_session" not in st.session_state:
+    st.session_state.chat_session = uuid.uuid4().hex
 
 # -----------------------------
 # Page config
@@ -25,26 +27,59 @@ st.markdown("<p style='text-align:center;'>AI Powered Productivity Layer</p>", u
 core = AIPROSCore()
 
 # -----------------------------
-# Chain executor (FIXED)
+# Chain progress (runs server-side, step by step)
 # -----------------------------
-def execute_chain(intents, start_index=0):
-    for i in range(start_index, len(intents)):
-        intent = intents[i]
-        execution = execute_plan(intent, intent["raw"])
-
-        # 🟡 Pause for confirmation
-        if execution.get("needs_confirmation"):
-            return {
-                "type": "confirmation",
-                "index": i,
-                "data": execution
-            }
-
-        # 🔴 Stop ONLY if explicitly failed
-        if execution.get("status") == 'error':
-            return False
+STEP_ICONS = {
+    "pending": "⏳",
+    "running": "▶️",
+    "success": "✅",
+    "error": "❌",
+    "chat": "💬",
+    "skipped": "⏭️",
+    "needs_confirmation": "🟡",
+}
+
+
+def _step_line(step):
+    line = f"{STEP_ICONS.get(step['status'], '•')} {step['raw']}"
+    if step.get("message"):
+        line += f" — {step['message']}"
+    return line
+
+
+def follow_chain(run):
+    """
+    Renders each step as it progresses and returns the chain status
+    once the run pauses or finishes.
+    """
+    rows = []
+    for step in run.snapshot()["steps"]:
+        rows.append(st.empty())
+        rows[-1].markdown(_step_line(step))
+
+    for event in run.events():
+        if event["type"] == "step":
+            rows[event["index"]].markdown(_step_line(event))
+        elif event["status"] != "started":
+            return event["status"]
+    return run.status
+
+
+def handle_chain_status(run, status):
+    if status == "done":
+        st.success("All actions completed successfully.")
+
+    elif status == "paused":
+        paused = next(s for s in run.steps if s["status"] == "needs_confirmation")
+        st.session_state.pending_chain = run
+        st.session_state.pending_confirmation = paused["data"]
+        st.warning("Action paused. Please confirm to continue.")
+
+    elif status == "cancelled":
+        st.info("Chain cancelled.")
 
-    return None
+    else:
+        st.error("Stopped execution because one step failed.")
 
 # -----------------------------
 # Input
@@ -52,29 +87,19 @@ def execute_chain(intents, start_index=0):
 command = st.text_input("Enter a command or message")
 
 if st.button("▶ Send") and command.strip():
-    with st.spinner("AIPROS is thinking..."):
-        result = core.process_input(command)
+    run = core.start_chain(command)
+    if not run:
+        with st.spinner("AIPROS is thinking..."):
+            result = core.process_input(command, session_id=st.session_state.chat_session)
+
+    # 🔵 Chain mode (Phase D2): step 1 runs while later steps are still classified
+    if run:
+        handle_chain_status(run, follow_chain(run))
 
     # 🟢 Chat mode
-    if result.get("mode") == "chat":
+    elif result.get("mode") == "chat":
         st.markdown(f"**AIPROS:** {result['response']}")
 
-    # 🔵 Chain mode (Phase D2)
-    elif result.get("mode") == "chain":
-        chain_result = execute_chain(result["intents"])
-
-        if chain_result is None:
-            st.success("All actions completed successfully.")
-
-        elif chain_result is False:
-            st.error("Stopped execution because one step failed.")
-
-        elif chain_result["type"] == "confirmation":
-            st.session_state.pending_chain = result["intents"]
-            st.session_state.pending_chain_index = chain_result["index"]
-            st.session_state.pending_confirmation = chain_result["data"]
-            st.warning("Action paused. Please confirm to continue.")
-
     # 🟡 Needs confirmation (single command)
     elif result.get("needs_confirmation"):
         folder_name = result["args"]["folder_name"]
@@ -116,18 +141,12 @@ if st.session_state.pending_confirmation:
 
             # 🔁 Resume chain if needed
             if st.session_state.pending_chain:
-                result = execute_chain(
-                    st.session_state.pending_chain,
-                    st.session_state.pending_chain_index + 1
-                )
-
+                run = st.session_state.pending_chain
                 st.session_state.pending_chain = None
-                st.session_state.pending_chain_index = 0
 
-                if result is None:
-                    st.success("All actions completed successfully.")
-                else:
-                    st.error("Chain execution stopped.")
+                # The folder was opened here, so the step counts as done
+                run.resume()
+                handle_chain_status(run, follow_chain(run))
 
             else:
                 st.success("Folder opened.")
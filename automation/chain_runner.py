@@ -0,0 +1,265 @@
+# automation/chain_runner.py
+
+import queue
+import threading
+import uuid
+from collections import OrderedDict
+from contextlib import nullcontext
+from typing import Callable, Iterator
+
+from automation.executor import execute_plan
+from automation.tool_router import IO_TOOL, MIXED_TOOL, tool_class
+from automation.ui_lane import UILane, desktop_turn
+from config import CHAIN_CONFIRM_TIMEOUT
+from llm.command_chain_parser import chain_intent, submit_command_chain
+
+# Finished runs kept around for status lookups
+MAX_FINISHED_RUNS = 32
+
+_RUNS: "OrderedDict[str, ChainRun]" = OrderedDict()
+_RUNS_LOCK = threading.Lock()
+
+
+class ChainRun:
+    """
+    Executes a command chain, starting each step as soon as it is
+    classified. Steps are scheduled by tool class (see tool_router):
+    I/O tools run concurrently, desktop tools run one at a time in chain
+    order on the chain's own UI lane, and mixed tools gather concurrently
+    but write their output in their turn on that lane, and not at all if
+    the run stopped while they were gathering. Actual desktop work
+    also waits for the process-wide desktop turn, shared with other chains
+    and single commands. Only the tool class decides this; steps are not
+    analysed for data dependencies on each other. Progress is published as
+    events:
+
+        {"type": "chain", "id", "status": "started", "steps": [raw, ...]}
+        {"type": "step", "index", "raw", "status": "running" | "success" |
+            "error" | "chat" | "skipped" | "needs_confirmation", ...}
+        {"type": "chain", "id", "status": "paused" | "done" | "stopped" | "cancelled"}
+
+    A step that needs confirmation pauses the run until resume() or
+    cancel(). It keeps its place in the chain's order meanwhile but does
+    not hold the desktop, so other chains and commands carry on. Left unanswered
+    for CHAIN_CONFIRM_TIMEOUT seconds, the run is cancelled, which also
+    frees its threads and lets the registry drop it. A failed step stops
+    steps that have not started yet.
+    """
+
+    def __init__(
+        self,
+        commands: list[str],
+        record: Callable[[str, dict, dict], None] | None = None,
+        confirm: Callable[[dict, dict, dict], dict] | None = None,
+    ):
+        self.id = uuid.uuid4().hex
+        self.commands = commands
+        self.steps = [{"index": i, "raw": cmd, "status": "pending"} for i, cmd in enumerate(commands)]
+        self.status = "running"
+
+        self._record = record
+        self._confirm = confirm
+        self._events: queue.Queue = queue.Queue()
+        self._wake = threading.Event()
+        self._choice: dict | None = None
+        self._cancelled = False
+        self._failed = False
+        self._pause_lock = threading.Lock()
+
+        # Every step starts classifying now; lane tickets fix the UI order
+        self._futures = submit_command_chain(commands)
+        self._lane = UILane()
+        self._tickets = self._lane.tickets(len(commands))
+        self._emit({"type": "chain", "id": self.id, "status": "started", "steps": list(commands)})
+        self._thread = threading.Thread(target=self._run, name=f"chain-{self.id[:8]}", daemon=True)
+        self._thread.start()
+
+    # -----------------------------
+    # Control
+    # -----------------------------
+    def resume(self, choice: dict | None = None) -> bool:
+        """
+        Continues a paused run. `choice` is handed to the confirm callback;
+        without one the paused step counts as handled by the caller.
+        """
+        if self.status != "paused":
+            return False
+        self._choice = choice
+        self.status = "running"
+        self._wake.set()
+        return True
+
+    def cancel(self) -> bool:
+        if self.status in ("done", "stopped", "cancelled"):
+            return False
+        self._cancelled = True
+        self._wake.set()
+        return True
+
+    def events(self) -> Iterator[dict]:
+        """
+        Yields events until the run pauses or finishes. Call again after
+        resume() to follow the rest of the run.
+        """
+        while True:
+            event = self._events.get()
+            yield event
+            if event["type"] == "chain" and event["status"] != "started":
+                return
+
+    def snapshot(self) -> dict:
+        return {"id": self.id, "status": self.status, "steps": [dict(s) for s in self.steps]}
+
+    # -----------------------------
+    # Runner
+    # -----------------------------
+    def _emit(self, event: dict):
+        self._events.put(event)
+
+    def _step(self, index: int, status: str, **fields):
+        step = self.steps[index]
+        step.update(status=status, **fields)
+        self._emit({"type": "step", **step})
+
+    def _finish(self, status: str):
+        self.status = status
+        self._emit({"type": "chain", "id": self.id, "status": status})
+
+    def _run(self):
+        workers = [
+            threading.Thread(target=self._run_step, args=(i,), name=f"chain-{self.id[:8]}-{i}", daemon=True)
+            for i in range(len(self.commands))
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        if self._cancelled:
+            self._finish("cancelled")
+        elif self._failed:
+            self._finish("stopped")
+        else:
+            self._finish("done")
+
+    def _halted(self) -> bool:
+        return self._cancelled or self._failed
+
+    def _run_step(self, index: int):
+        cmd, ticket = self.commands[index], self._tickets[index]
+        try:
+            try:
+                intent = chain_intent(self._futures[index], cmd)
+            except Exception as e:
+                self._failed = True
+                self._step(index, "error", message=str(e))
+                return
+
+            # Chat parts have nothing to execute; show the reply and move on
+            if intent.get("mode") == "chat":
+                self._step(index, "chat", message=intent.get("response", ""))
+                return
+
+            kind = tool_class(intent.get("tool"))
+            if kind == IO_TOOL:
+                # Later desktop steps need not wait for this one
+                self._lane.done(ticket)
+                self._execute(index, intent, cmd)
+            elif kind == MIXED_TOOL:
+                # The tool takes its turn itself, through ui_turn(), and
+                # does not write once an earlier step failed or the run stopped
+                with self._lane.assigned(ticket, halted=self._halted) as binding:
+                    self._execute(index, intent, cmd, binding=binding)
+            else:
+                with self._lane.turn(ticket):
+                    self._execute(index, intent, cmd, desktop=True)
+        finally:
+            self._lane.done(ticket)
+
+    def _execute(self, index: int, intent: dict, cmd: str, desktop: bool = False, binding: dict | None = None):
+        if self._halted():
+            self._step(index, "skipped")
+            return
+
+        self._step(index, "running", tool=intent.get("tool"))
+        with desktop_turn() if desktop else nullcontext():
+            execution = execute_plan(intent, cmd)
+
+        if binding and binding["withdrawn"]:
+            self._step(index, "skipped")
+            return
+
+        if _needs_confirmation(execution):
+            execution = self._pause(index, intent, execution)
+            if execution is None:
+                self._step(index, "skipped")
+                return
+
+        if self._record:
+            self._record(cmd, intent, execution)
+
+        if execution.get("status") == "error":
+            self._failed = True
+            self._step(index, "error", message=_error_message(execution))
+            return
+
+        self._step(index, "success")
+
+    def _pause(self, index: int, intent: dict, execution: dict) -> dict | None:
+        paused = execution.get("output") if not execution.get("needs_confirmation") else execution
+
+        # One confirmation at a time; the client answers them in turn
+        with self._pause_lock:
+            if self._cancelled:
+                return None
+            self._wake.clear()
+            self._step(index, "needs_confirmation", data=paused)
+            self.status = "paused"
+            self._emit({"type": "chain", "id": self.id, "status": "paused"})
+
+            if not self._wake.wait(CHAIN_CONFIRM_TIMEOUT):
+                self._cancelled = True
+                self.steps[index]["message"] = "Confirmation timed out"
+            if self._cancelled:
+                return None
+
+            self.status = "running"
+            choice, self._choice = self._choice, None
+
+        if self._confirm and choice is not None:
+            with desktop_turn():
+                return self._confirm(intent, paused, choice)
+        return {"executed": True, "status": "success", "tool": intent.get("tool")}
+
+
+def _needs_confirmation(execution: dict) -> bool:
+    output = execution.get("output")
+    return bool(
+        execution.get("needs_confirmation")
+        or (isinstance(output, dict) and output.get("needs_confirmation"))
+    )
+
+
+def _error_message(execution: dict) -> str:
+    error = execution.get("error")
+    if isinstance(error, dict):
+        error = error.get("error") or str(error)
+    return str(error) if error else "Command could not be executed"
+
+
+# -----------------------------
+# Registry
+# -----------------------------
+def start_chain_run(commands: list[str], record=None, confirm=None) -> ChainRun:
+    run = ChainRun(commands, record=record, confirm=confirm)
+    with _RUNS_LOCK:
+        _RUNS[run.id] = run
+        finished = [rid for rid, r in _RUNS.items() if r.status in ("done", "stopped", "cancelled")]
+        for rid in finished[:max(0, len(finished) - MAX_FINISHED_RUNS)]:
+            del _RUNS[rid]
+    return run
+
+
+def get_chain_run(run_id: str) -> ChainRun | None:
+    with _RUNS_LOCK:
+        return _RUNS.get(run_id)
@@ -87,3 +87,25 @@ TOOL_REGISTRY = {
     "write_report_to_app": write_report_to_app,
     "gather_topic_to_word": gather_topic_to_word,
 }
+
+# -----------------------------
+# Scheduling classes for command chains
+# -----------------------------
+UI_TOOL = "ui"        # Keyboard, mouse, focus or new windows: one at a time, in order
+IO_TOOL = "io"        # No desktop side effects: runs concurrently
+MIXED_TOOL = "mixed"  # Gathers concurrently, then writes into an app on the UI lane
+
+TOOL_CLASSES = {
+    "search_files": IO_TOOL,
+    "get_screen_size": IO_TOOL,
+
+    "summarize_url_to_app": MIXED_TOOL,
+    "research_topic_to_app": MIXED_TOOL,
+    "write_report_to_app": MIXED_TOOL,
+    "gather_topic_to_word": MIXED_TOOL,
+}
+
+
+def tool_class(tool_name: str | None) -> str:
+    # Anything not known to be side-effect free stays on the UI lane
+    return TOOL_CLASSES.get(tool_name, UI_TOOL)
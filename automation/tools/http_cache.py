@@ -0,0 +1,148 @@
+import hashlib
+import json
+import threading
+import time
+from typing import Callable
+
+import requests
+
+from config import HTTP_CACHE_DIR, HTTP_CACHE_MAX_BYTES, HTTP_CACHE_TTLS
+from llm.cache import DiskLRU
+
+
+class CachedResponse:
+    """
+    The parts of requests.Response the research tools use, rebuilt from
+    a cache entry. `cache` tells where the body came from: "fresh",
+    "revalidated", "stale" (network unavailable) or "network".
+    """
+
+    def __init__(self, url: str, status_code: int, text: str, headers: dict, cache: str):
+        self.url = url
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers
+        self.cache = cache
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} for url: {self.url}")
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class HTTPCache:
+    """
+    Disk-backed GET cache keyed by the full URL.
+
+    Responses stay fresh for the TTL of their source (see HTTP_CACHE_TTLS).
+    After that the next GET is conditional on the stored ETag and
+    Last-Modified, so an unchanged page costs a 304. When the network is
+    unavailable or the server errors, a stored copy is served however
+    old it is. Bodies are stored compressed in a DiskLRU.
+
+    With `extract`, the body is streamed into extract(response) and only
+    its result is stored and returned; it may stop reading early, which
+    drops the rest of the download.
+    """
+
+    def __init__(self, directory, max_bytes: int, ttls: dict[str, float]):
+        self.ttls = dict(ttls)
+        self._disk = DiskLRU(directory, max_bytes)
+        self._lock = threading.Lock()
+        self._stats = {"fresh": 0, "revalidated": 0, "stale": 0, "network": 0, "errors": 0}
+
+    def get(
+        self,
+        url: str,
+        source: str = "default",
+        params: dict | None = None,
+        extract: Callable[[requests.Response], str] | None = None,
+        variant: str | None = None,
+        **kwargs,
+    ) -> CachedResponse:
+        """
+        Same arguments as requests.get, plus the source whose TTL applies.
+        `variant` names what extract produces, so different extractions
+        of one URL get separate entries. Raises requests exceptions only
+        when nothing is stored to fall back on.
+        """
+        full_url = requests.Request("GET", url, params=params).prepare().url
+        variant = variant or ("text" if extract else "raw")
+        key = hashlib.sha256(f"{full_url}|{variant}".encode("utf-8")).hexdigest()
+        entry = self._disk.read(key)
+
+        ttl = self.ttls.get(source, self.ttls["default"])
+        if entry is not None and time.time() - entry["fetched_at"] < ttl:
+            return self._response(entry, "fresh")
+
+        headers = dict(kwargs.pop("headers", None) or {})
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            res = requests.get(full_url, headers=headers, stream=extract is not None, **kwargs)
+            try:
+                if extract is not None and res.status_code == 200:
+                    text = extract(res)
+                else:
+                    text = res.text
+            finally:
+                res.close()
+        except requests.RequestException:
+            if entry is None:
+                self._count("errors")
+                raise
+            return self._response(entry, "stale")
+
+        if res.status_code == 304 and entry is not None:
+            entry["fetched_at"] = time.time()
+            self._disk.write(key, entry)
+            return self._response(entry, "revalidated")
+
+        if res.status_code >= 500 and entry is not None:
+            return self._response(entry, "stale")
+
+        self._count("network")
+        if res.status_code == 200:
+            self._disk.write(key, {
+                "url": full_url,
+                "fetched_at": time.time(),
+                "etag": res.headers.get("ETag"),
+                "last_modified": res.headers.get("Last-Modified"),
+                "content_type": res.headers.get("Content-Type"),
+                "text": text,
+            })
+        return CachedResponse(full_url, res.status_code, text, dict(res.headers), "network")
+
+    def _response(self, entry: dict, cache: str) -> CachedResponse:
+        self._count(cache)
+        headers = {"Content-Type": entry.get("content_type") or ""}
+        return CachedResponse(entry["url"], 200, entry["text"], headers, cache)
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def clear(self):
+        self._disk.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        served = stats["fresh"] + stats["revalidated"] + stats["stale"]
+        total = served + stats["network"]
+        stats["disk_rate"] = served / total if total else None
+        stats["disk"] = self._disk.stats()
+        return stats
+
+
+HTTP_CACHE = HTTPCache(HTTP_CACHE_DIR, HTTP_CACHE_MAX_BYTES, HTTP_CACHE_TTLS)
+
+
+def http_cache_stats() -> dict:
+    return HTTP_CACHE.stats()
@@ -1,8 +1,11 @@
 import re
+import threading
 import time
 import os
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from datetime import datetime
-from html import unescape
+from functools import partial
+from html.parser import HTMLParser
 from urllib.parse import quote_plus, urlparse, parse_qs, unquote
 
 import requests
@@ -10,8 +13,23 @@ import requests
 from automation.tools.system_tools import open_app
 from automation.tools.web_tools import open_url
 from automation.tools.input_tools import type_text
+from automation.tools.http_cache import HTTP_CACHE
+from automation.ui_lane import ui_turn
 from llm.ollama_client import call_ollama
-from config import REPORTS_DIR
+from config import (
+    REPORTS_DIR,
+    OLLAMA_BACKGROUND_SLOTS,
+    SUMMARY_MAX_CHARS,
+    SUMMARY_CHUNK_CHARS,
+    PAGE_TEXT_MAX_CHARS,
+    PAGE_MAX_CHARS,
+    RESEARCH_DEADLINE,
+    RESEARCH_BUDGETS,
+    RESEARCH_MAX_WORKERS,
+    SEARCH_HEDGE_DELAY,
+    SEARCH_CIRCUIT_FAILURES,
+    SEARCH_CIRCUIT_COOLDOWN,
+)
 import importlib
 
 
@@ -29,12 +47,84 @@ def _open_target_app(app_name: str) -> dict:
     return open_app(app_name)
 
 
-def _strip_html(text: str) -> str:
-    text = re.sub(r"(?is)<script.*?>.*?</script>", " ", text)
-    text = re.sub(r"(?is)<style.*?>.*?</style>", " ", text)
-    text = re.sub(r"(?is)<[^>]+>", " ", text)
-    text = re.sub(r"\s+", " ", text)
-    return unescape(text).strip()
+class _TextExtractor(HTMLParser):
+    """
+    Incremental HTML-to-text: collects visible text, skipping script and
+    style contents, and reports once it holds max_chars of it. Block
+    elements end a line and headings start a new section (blank line),
+    so later steps can split on those boundaries.
+    """
+
+    _SKIP = {"script", "style"}
+    _SECTIONS = {"h1", "h2", "h3", "h4", "h5", "h6", "section", "article", "header", "footer"}
+    _BLOCKS = {
+        "p", "div", "br", "hr", "li", "ul", "ol", "dl", "dt", "dd", "tr", "table",
+        "blockquote", "pre", "title", "main", "nav", "aside", "figure", "figcaption",
+    }
+    # Placeholders for breaks; raw whitespace in the page is collapsed
+    _LINE, _SECTION = "\x00", "\x01"
+
+    def __init__(self, max_chars: int):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.size = 0
+        self._parts: list[str] = []
+        self._skip = 0
+
+    def _break(self, tag: str) -> str:
+        if tag in self._SECTIONS:
+            return self._SECTION
+        return self._LINE if tag in self._BLOCKS else " "
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self._SKIP:
+            self._skip += 1
+        self._parts.append(self._break(tag))
+
+    def handle_endtag(self, tag):
+        if tag in self._SKIP and self._skip:
+            self._skip -= 1
+        self._parts.append(self._LINE if tag in self._SECTIONS else self._break(tag))
+
+    def handle_data(self, data):
+        if self._skip:
+            return
+        words = data.split()
+        if words:
+            self._parts.append(data)
+            self.size += len(" ".join(words)) + 1
+
+    @property
+    def full(self) -> bool:
+        return self.size >= self.max_chars
+
+    def text(self) -> str:
+        sections = []
+        for section in "".join(self._parts).split(self._SECTION):
+            lines = (" ".join(line.split()) for line in section.split(self._LINE))
+            section = "\n".join(line for line in lines if line)
+            if section:
+                sections.append(section)
+        return "\n\n".join(sections)[:self.max_chars]
+
+
+def _extract_text(res: requests.Response, max_chars: int = PAGE_TEXT_MAX_CHARS) -> str:
+    """
+    Streams the response body through _TextExtractor and stops reading
+    once max_chars of text are in (or PAGE_MAX_CHARS characters of the
+    page have been read).
+    """
+    if "charset" not in (res.headers.get("Content-Type") or "").lower():
+        res.encoding = "utf-8"
+    parser = _TextExtractor(max_chars)
+    read = 0
+    for chunk in res.iter_content(chunk_size=16 * 1024, decode_unicode=True):
+        parser.feed(chunk)
+        read += len(chunk)
+        if parser.full or read >= PAGE_MAX_CHARS:
+            break
+    parser.close()
+    return parser.text()
 
 
 def _normalize_url(url: str) -> str:
@@ -49,77 +139,211 @@ def _jina_proxy_url(url: str) -> str:
     return f"https://r.jina.ai/http://{stripped}"
 
 
-def _fetch_url_text(url: str, max_chars: int = 8000) -> str | None:
+def _fetch_url_text(url: str, max_chars: int = PAGE_TEXT_MAX_CHARS, timeout: float = 20) -> str | None:
+    # Pages are extracted (and cached) up to at least PAGE_TEXT_MAX_CHARS, then cut.
+    # `timeout` is the budget for both attempts together
+    deadline = time.monotonic() + timeout
     url = _normalize_url(url)
+    cap = max(max_chars, PAGE_TEXT_MAX_CHARS)
+    extract = partial(_extract_text, max_chars=cap)
     try:
-        res = requests.get(
+        res = HTTP_CACHE.get(
             url,
-            timeout=20,
+            source="page",
+            extract=extract,
+            variant=f"text:{cap}",
+            timeout=timeout,
             headers={"User-Agent": "Mozilla/5.0"},
         )
         res.raise_for_status()
-        text = _strip_html(res.text)
-        return text[:max_chars]
+        return res.text[:max_chars]
     except Exception:
-        # Fallback: text proxy (handles many JS-heavy pages)
+        # Fallback: text proxy (handles many JS-heavy pages), in what is left
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
         try:
             proxy = _jina_proxy_url(url)
-            res = requests.get(proxy, timeout=20, headers={"User-Agent": "Mozilla/5.0"})
+            res = HTTP_CACHE.get(
+                proxy,
+                source="page",
+                extract=extract,
+                variant=f"text:{cap}",
+                timeout=remaining,
+                headers={"User-Agent": "Mozilla/5.0"},
+            )
             res.raise_for_status()
-            text = _strip_html(res.text)
-            return text[:max_chars]
+            return res.text[:max_chars]
         except Exception:
             return None
 
 
-def _duckduckgo_search(query: str, max_results: int = 3) -> list[str]:
-    urls = [
-        f"https://duckduckgo.com/html/?q={quote_plus(query)}",
-        f"https://html.duckduckgo.com/html/?q={quote_plus(query)}",
-        f"https://lite.duckduckgo.com/lite/?q={quote_plus(query)}",
-        _jina_proxy_url(f"https://duckduckgo.com/html/?q={quote_plus(query)}"),
-    ]
+def _result(future: Future):
+    if future.done() and not future.cancelled() and future.exception() is None:
+        return future.result()
+    return None
 
-    for url in urls:
-        try:
-            res = requests.get(url, timeout=15, headers={"User-Agent": "Mozilla/5.0"})
-            res.raise_for_status()
-            html = res.text
-
-            links = re.findall(r'class="result__a" href="([^"]+)"', html)
-            if not links:
-                links = re.findall(r'class="result-link" href="([^"]+)"', html)
-            if not links:
-                links = re.findall(r'href="(https?://[^"]+)"', html)
-
-            cleaned = []
-            for link in links:
-                if link.startswith("//"):
-                    link = "https:" + link
-                if not link.startswith("http"):
-                    continue
-                # Unwrap DuckDuckGo redirect links
-                if "duckduckgo.com/l/?" in link and "uddg=" in link:
-                    try:
-                        qs = parse_qs(urlparse(link).query)
-                        if "uddg" in qs:
-                            link = unquote(qs["uddg"][0])
-                    except Exception:
-                        pass
-                if "duckduckgo.com" in link:
-                    continue
-                cleaned.append(link)
-                if len(cleaned) >= max_results:
-                    break
 
-            if cleaned:
-                return cleaned
-        except Exception:
+# -----------------------------
+# DuckDuckGo search
+# -----------------------------
+_SEARCH_ENDPOINTS = {
+    "html": lambda q: f"https://duckduckgo.com/html/?q={q}",
+    "html_host": lambda q: f"https://html.duckduckgo.com/html/?q={q}",
+    "lite": lambda q: f"https://lite.duckduckgo.com/lite/?q={q}",
+    "jina": lambda q: _jina_proxy_url(f"https://duckduckgo.com/html/?q={q}"),
+}
+
+
+class EndpointHealth:
+    """
+    Success rate and latency EWMA per endpoint, with a circuit breaker:
+    after `failures` consecutive failures an endpoint sits out for
+    `cooldown` seconds. The next call after that is a trial; one more
+    failure reopens the circuit, a success closes it.
+    """
+
+    def __init__(self, names: list[str], failures: int, cooldown: float, alpha: float = 0.3):
+        self.failures = failures
+        self.cooldown = cooldown
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self._health = {
+            name: {"successes": 0, "failures": 0, "streak": 0, "latency_ewma": None, "open_until": 0.0}
+            for name in names
+        }
+
+    def _score(self, h: dict) -> float:
+        # Expected seconds per useful answer; unknown endpoints rank by position
+        rate = (h["successes"] + 1) / (h["successes"] + h["failures"] + 2)
+        latency = h["latency_ewma"] if h["latency_ewma"] is not None else RESEARCH_BUDGETS["search"] / 2
+        return latency / rate
+
+    def ranked(self) -> list[str]:
+        """
+        Endpoints with a closed circuit, best first. When every circuit is
+        open, all of them are returned rather than none.
+        """
+        now = time.monotonic()
+        with self._lock:
+            names = sorted(self._health, key=lambda n: self._score(self._health[n]))
+            closed = [n for n in names if self._health[n]["open_until"] <= now]
+        return closed or names
+
+    def record(self, name: str, ok: bool, latency: float):
+        with self._lock:
+            h = self._health[name]
+            if ok:
+                h["successes"] += 1
+                h["streak"] = 0
+                h["open_until"] = 0.0
+                prev = h["latency_ewma"]
+                h["latency_ewma"] = latency if prev is None else self.alpha * latency + (1 - self.alpha) * prev
+            else:
+                h["failures"] += 1
+                h["streak"] += 1
+                if h["streak"] >= self.failures:
+                    h["open_until"] = time.monotonic() + self.cooldown
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            stats = {}
+            for name, h in self._health.items():
+                attempts = h["successes"] + h["failures"]
+                stats[name] = {
+                    "successes": h["successes"],
+                    "failures": h["failures"],
+                    "success_rate": h["successes"] / attempts if attempts else None,
+                    "latency_ewma": h["latency_ewma"],
+                    "circuit": "open" if h["open_until"] > now else "closed",
+                }
+            return stats
+
+
+_SEARCH_HEALTH = EndpointHealth(list(_SEARCH_ENDPOINTS), SEARCH_CIRCUIT_FAILURES, SEARCH_CIRCUIT_COOLDOWN)
+# Separate from the evidence pool, which _duckduckgo_search itself runs on
+_SEARCH_POOL = ThreadPoolExecutor(max_workers=2 * len(_SEARCH_ENDPOINTS), thread_name_prefix="ddg-search")
+
+
+def _parse_search_links(html: str, max_results: int) -> list[str]:
+    links = re.findall(r'class="result__a" href="([^"]+)"', html)
+    if not links:
+        links = re.findall(r'class="result-link" href="([^"]+)"', html)
+    if not links:
+        links = re.findall(r'href="(https?://[^"]+)"', html)
+
+    cleaned = []
+    for link in links:
+        if link.startswith("//"):
+            link = "https:" + link
+        if not link.startswith("http"):
+            continue
+        # Unwrap DuckDuckGo redirect links
+        if "duckduckgo.com/l/?" in link and "uddg=" in link:
+            try:
+                qs = parse_qs(urlparse(link).query)
+                if "uddg" in qs:
+                    link = unquote(qs["uddg"][0])
+            except Exception:
+                pass
+        if "duckduckgo.com" in link:
             continue
+        cleaned.append(link)
+        if len(cleaned) >= max_results:
+            break
+    return cleaned
+
+
+def _search_endpoint(name: str, query: str, max_results: int, timeout: float) -> list[str]:
+    started = time.monotonic()
+    try:
+        url = _SEARCH_ENDPOINTS[name](quote_plus(query))
+        res = requests.get(url, timeout=timeout, headers={"User-Agent": "Mozilla/5.0"})
+        res.raise_for_status()
+        links = _parse_search_links(res.text, max_results)
+    except Exception:
+        links = []
+    # A page without results is usually a block or captcha page
+    _SEARCH_HEALTH.record(name, bool(links), time.monotonic() - started)
+    return links
+
 
+def _first_links(futures) -> list[str]:
+    for future in futures:
+        links = _result(future)
+        if links:
+            return links
     return []
 
 
+def _duckduckgo_search(query: str, max_results: int = 3, timeout: float = 15) -> list[str]:
+    """
+    Races the DuckDuckGo endpoints, healthiest first. Each one joins
+    SEARCH_HEDGE_DELAY after the previous (at once if the previous
+    failed) and the first non-empty result wins; slower requests finish
+    in the background and still update the endpoint health.
+    """
+    pending = set()
+    for name in _SEARCH_HEALTH.ranked():
+        pending.add(_SEARCH_POOL.submit(_search_endpoint, name, query, max_results, timeout))
+        done, pending = wait(pending, timeout=SEARCH_HEDGE_DELAY, return_when=FIRST_COMPLETED)
+        links = _first_links(done)
+        if links:
+            return links
+
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        links = _first_links(done)
+        if links:
+            return links
+    return []
+
+
+def search_endpoint_stats() -> dict:
+    return _SEARCH_HEALTH.stats()
+
+
 def _topic_keywords(topic: str) -> list[str]:
     words = re.findall(r"[a-zA-Z0-9]{3,}", topic.lower())
     return list(dict.fromkeys(words))
@@ -146,13 +370,13 @@ def _is_relevant(text: str, topic: str) -> bool:
     return hits >= max(2, len(keywords) // 2)
 
 
-def _wikipedia_opensearch(topic: str, max_results: int = 3) -> list[str]:
+def _wikipedia_opensearch(topic: str, max_results: int = 3, timeout: float = 15) -> list[str]:
     try:
         url = (
             "https://en.wikipedia.org/w/api.php"
             f"?action=opensearch&search={quote_plus(topic)}&limit={max_results}&namespace=0&format=json"
         )
-        res = requests.get(url, timeout=15, headers={"User-Agent": "Mozilla/5.0"})
+        res = HTTP_CACHE.get(url, source="wikipedia", timeout=timeout, headers={"User-Agent": "Mozilla/5.0"})
         res.raise_for_status()
         data = res.json()
         if not isinstance(data, list) or len(data) < 4:
@@ -162,10 +386,10 @@ def _wikipedia_opensearch(topic: str, max_results: int = 3) -> list[str]:
         return []
 
 
-def _fetch_wikipedia_summary(topic: str, max_chars: int = 6000) -> str | None:
+def _fetch_wikipedia_summary(topic: str, max_chars: int = 6000, timeout: float = 15) -> str | None:
     try:
         url = f"https://en.wikipedia.org/api/rest_v1/page/summary/{quote_plus(topic)}"
-        res = requests.get(url, timeout=15, headers={"User-Agent": "Mozilla/5.0"})
+        res = HTTP_CACHE.get(url, source="wikipedia", timeout=timeout, headers={"User-Agent": "Mozilla/5.0"})
         res.raise_for_status()
         data = res.json()
         extract = data.get("extract")
@@ -176,17 +400,18 @@ def _fetch_wikipedia_summary(topic: str, max_chars: int = 6000) -> str | None:
         return None
 
 
-def _duckduckgo_instant_answer(topic: str, max_chars: int = 2500) -> str | None:
+def _duckduckgo_instant_answer(topic: str, max_chars: int = 2500, timeout: float = 15) -> str | None:
     try:
-        res = requests.get(
+        res = HTTP_CACHE.get(
             "https://api.duckduckgo.com/",
+            source="instant",
             params={
                 "q": topic,
                 "format": "json",
                 "no_html": 1,
                 "skip_disambig": 1,
             },
-            timeout=15,
+            timeout=timeout,
             headers={"User-Agent": "Mozilla/5.0"},
         )
         res.raise_for_status()
@@ -252,6 +477,76 @@ def _compose_research_text(topic: str, wiki: str | None, instant: str | None, pa
     return "\n".join(sections).strip()
 
 
+# -----------------------------
+# Evidence gathering
+# -----------------------------
+_RESEARCH_POOL = ThreadPoolExecutor(max_workers=RESEARCH_MAX_WORKERS, thread_name_prefix="research")
+
+
+def _budget(source: str, deadline: float) -> float:
+    # A source's request timeout, cut short by the overall deadline
+    return min(RESEARCH_BUDGETS[source], deadline - time.monotonic())
+
+
+def _wikipedia_evidence(topic: str, deadline: float) -> str | None:
+    timeout = _budget("wikipedia", deadline)
+    if timeout <= 0:
+        return None
+    titles = _wikipedia_opensearch(topic, max_results=3, timeout=timeout)
+    for title in titles or [topic]:
+        timeout = _budget("wikipedia", deadline)
+        if timeout <= 0:
+            return None
+        wiki = _fetch_wikipedia_summary(title, timeout=timeout)
+        if wiki:
+            return wiki
+    return None
+
+
+def _page_evidence(link: str, topic: str, max_chars: int, deadline: float) -> str | None:
+    timeout = _budget("page", deadline)
+    if timeout <= 0:
+        return None
+    text = _fetch_url_text(link, max_chars=max_chars, timeout=timeout)
+    if text and _is_relevant(text, topic):
+        return _extract_relevant_snippet(text, topic)
+    return None
+
+
+def _gather_evidence(topic: str, max_links: int, max_chars: int) -> tuple[str | None, str | None, list[str]]:
+    """
+    Queries Wikipedia, the DuckDuckGo instant answer and search at once,
+    fetching result pages as soon as links arrive. Returns (wiki, instant,
+    page excerpts) with whatever finished within RESEARCH_DEADLINE; requests
+    still running then are dropped (their budgets bound how long they
+    linger) and queued ones are cancelled.
+    """
+    deadline = time.monotonic() + RESEARCH_DEADLINE
+    wiki_f = _RESEARCH_POOL.submit(_wikipedia_evidence, topic, deadline)
+    instant_f = _RESEARCH_POOL.submit(_duckduckgo_instant_answer, topic, timeout=_budget("instant", deadline))
+    search_f = _RESEARCH_POOL.submit(_duckduckgo_search, topic, max_links, timeout=_budget("search", deadline))
+
+    pending = {wiki_f, instant_f, search_f}
+    pages: list[Future] = []
+    while pending:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+        if search_f in done:
+            pages = [
+                _RESEARCH_POOL.submit(_page_evidence, link, topic, max_chars, deadline)
+                for link in _result(search_f) or []
+            ]
+            pending |= set(pages)
+
+    for future in pending:
+        future.cancel()
+
+    parts = [part for part in (_result(f) for f in pages) if part]
+    return _result(wiki_f), _result(instant_f), parts
+
+
 def _summarize_text(text: str, topic: str | None, mode: str = "summary") -> str:
     if mode == "report":
         style = (
@@ -259,6 +554,12 @@ def _summarize_text(text: str, topic: str | None, mode: str = "summary") -> str:
             "Include: Title, Overview, Key Points, Conclusion. "
             "No citations or links. Use only the provided content."
         )
+    elif mode == "chunk":
+        style = (
+            "This is one part of a longer document. Summarize it in a few short "
+            "paragraphs, keeping key facts, names and numbers. "
+            "No citations or links. Use only the provided content."
+        )
     else:
         style = (
             "Summarize concisely in plain text with short paragraphs. "
@@ -269,7 +570,69 @@ def _summarize_text(text: str, topic: str | None, mode: str = "summary") -> str:
     if topic:
         prompt += f"Topic: {topic}\n\n"
     prompt += f"Content:\n{text}\n\nSummary:"
-    return call_ollama(prompt)
+    return call_ollama(prompt, use_cache=True, kind="background")
+
+
+# -----------------------------
+# Long documents (map-reduce)
+# -----------------------------
+# Bounded like background work in the Ollama scheduler, so chunks do not
+# crowd the queue
+_SUMMARY_POOL = ThreadPoolExecutor(max_workers=OLLAMA_BACKGROUND_SLOTS, thread_name_prefix="summarize")
+
+# Coarsest boundary first: sections, lines/paragraphs, sentences
+_SPLITS = [(r"\n\s*\n", "\n\n"), (r"\n", "\n"), (r"(?<=[.!?])\s+", " ")]
+
+
+def _split_chunks(text: str, size: int, level: int = 0) -> list[str]:
+    """
+    Packs text into chunks of at most `size` characters, cutting at the
+    coarsest boundary that fits; only a single over-long sentence is cut
+    mid-way.
+    """
+    if len(text) <= size:
+        return [text]
+    if level == len(_SPLITS):
+        return [text[i:i + size] for i in range(0, len(text), size)]
+
+    pattern, joiner = _SPLITS[level]
+    chunks, current = [], ""
+    for piece in re.split(pattern, text):
+        piece = piece.strip()
+        if not piece:
+            continue
+        if len(piece) > size:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.extend(_split_chunks(piece, size, level + 1))
+        elif current and len(current) + len(joiner) + len(piece) > size:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f"{current}{joiner}{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _summarize_long(text: str, topic: str | None) -> str:
+    """
+    Summarizes text of any length: chunks are summarized concurrently,
+    then their summaries are reduced the same way until they fit one
+    prompt. Chunk prompts carry no topic, so the completion cache keys
+    each chunk summary by its content alone.
+    """
+    chunks = _split_chunks(text, SUMMARY_CHUNK_CHARS)
+    if len(chunks) == 1:
+        return _summarize_text(text, topic=topic, mode="summary")
+
+    summaries = _SUMMARY_POOL.map(lambda chunk: _summarize_text(chunk, topic=None, mode="chunk"), chunks)
+    combined = "\n\n".join(s.strip() for s in summaries if s.strip())
+    if len(combined) >= len(text):
+        # Summaries did not shrink the text; stop reducing
+        return _summarize_text(combined[:SUMMARY_CHUNK_CHARS], topic=topic, mode="summary")
+    return _summarize_long(combined, topic)
 
 
 def _focus_app_window(app_name: str) -> bool:
@@ -366,45 +729,33 @@ def summarize_url_to_app(url: str, app_name: str, include_sources: bool = False)
     if not app_name:
         return {"executed": False, "error": "No app provided"}
 
-    content = _fetch_url_text(url)
+    content = _fetch_url_text(url, max_chars=SUMMARY_MAX_CHARS)
     if not content:
         return {"executed": False, "error": "Could not fetch URL"}
 
-    summary = _summarize_text(content, topic=url, mode="summary")
+    summary = _summarize_long(content, topic=url)
 
-    if _is_word_app(app_name):
-        word_result = _write_to_word(summary, title=url)
-        if word_result.get("executed"):
-            return {"executed": True, "summary": summary}
-        # fall back to normal typing if Word automation fails
+    # Writing into the app needs the desktop; wait for this step's turn
+    with ui_turn():
+        if _is_word_app(app_name):
+            word_result = _write_to_word(summary, title=url)
+            if word_result.get("executed"):
+                return {"executed": True, "summary": summary}
+            # fall back to normal typing if Word automation fails
 
-    open_result = _open_target_app(app_name)
-    if not open_result.get("executed"):
-        return {"executed": False, "error": "Could not open target app"}
+        open_result = _open_target_app(app_name)
+        if not open_result.get("executed"):
+            return {"executed": False, "error": "Could not open target app"}
 
-    _type_into_app(summary, app_name)
-    return {"executed": True, "summary": summary}
+        _type_into_app(summary, app_name)
+        return {"executed": True, "summary": summary}
 
 
 def research_topic_to_app(topic: str, app_name: str, include_sources: bool = False) -> dict:
     if not app_name:
         return {"executed": False, "error": "No app provided"}
 
-    # Prefer Wikipedia if available (more reliable for named topics)
-    titles = _wikipedia_opensearch(topic, max_results=3)
-    wiki = None
-    for title in titles or [topic]:
-        wiki = _fetch_wikipedia_summary(title)
-        if wiki:
-            break
-    instant = _duckduckgo_instant_answer(topic)
-
-    parts = []
-    links = _duckduckgo_search(topic, max_results=3)
-    for link in links:
-        text = _fetch_url_text(link, max_chars=6000)
-        if text and _is_relevant(text, topic):
-            parts.append(_extract_relevant_snippet(text, topic))
+    wiki, instant, parts = _gather_evidence(topic, max_links=3, max_chars=6000)
 
     if not parts and not wiki and not instant:
             return {
@@ -413,38 +764,27 @@ def research_topic_to_app(topic: str, app_name: str, include_sources: bool = Fal
             }
     summary = _compose_research_text(topic, wiki, instant, parts)
 
-    if _is_word_app(app_name):
-        word_result = _write_to_word(summary, title=topic)
-        if word_result.get("executed"):
-            return {"executed": True, "summary": summary}
-        return {"executed": False, "error": word_result.get("error", "Could not write to Word")}
+    # Writing into the app needs the desktop; wait for this step's turn
+    with ui_turn():
+        if _is_word_app(app_name):
+            word_result = _write_to_word(summary, title=topic)
+            if word_result.get("executed"):
+                return {"executed": True, "summary": summary}
+            return {"executed": False, "error": word_result.get("error", "Could not write to Word")}
 
-    open_result = _open_target_app(app_name)
-    if not open_result.get("executed"):
-        return {"executed": False, "error": "Could not open target app"}
+        open_result = _open_target_app(app_name)
+        if not open_result.get("executed"):
+            return {"executed": False, "error": "Could not open target app"}
 
-    _type_into_app(summary, app_name)
-    return {"executed": True, "summary": summary}
+        _type_into_app(summary, app_name)
+        return {"executed": True, "summary": summary}
 
 
 def write_report_to_app(topic: str, app_name: str, include_sources: bool = False) -> dict:
     if not app_name:
         return {"executed": False, "error": "No app provided"}
 
-    titles = _wikipedia_opensearch(topic, max_results=3)
-    wiki = None
-    for title in titles or [topic]:
-        wiki = _fetch_wikipedia_summary(title)
-        if wiki:
-            break
-    instant = _duckduckgo_instant_answer(topic)
-
-    parts = []
-    links = _duckduckgo_search(topic, max_results=4)
-    for link in links:
-        text = _fetch_url_text(link, max_chars=7000)
-        if text and _is_relevant(text, topic):
-            parts.append(_extract_relevant_snippet(text, topic))
+    wiki, instant, parts = _gather_evidence(topic, max_links=4, max_chars=7000)
 
     if not parts and not wiki and not instant:
             return {
@@ -456,36 +796,24 @@ def write_report_to_app(topic: str, app_name: str, include_sources: bool = False
     if not _summary_mentions_topic(report, topic):
         report = evidence
 
-    if _is_word_app(app_name):
-        word_result = _write_to_word(report, title=topic)
-        if word_result.get("executed"):
-            return {"executed": True, "summary": report}
-        return {"executed": False, "error": word_result.get("error", "Could not write to Word")}
+    # Writing into the app needs the desktop; wait for this step's turn
+    with ui_turn():
+        if _is_word_app(app_name):
+            word_result = _write_to_word(report, title=topic)
+            if word_result.get("executed"):
+                return {"executed": True, "summary": report}
+            return {"executed": False, "error": word_result.get("error", "Could not write to Word")}
 
-    open_result = _open_target_app(app_name)
-    if not open_result.get("executed"):
-        return {"executed": False, "error": "Could not open target app"}
+        open_result = _open_target_app(app_name)
+        if not open_result.get("executed"):
+            return {"executed": False, "error": "Could not open target app"}
 
-    _type_into_app(report, app_name)
-    return {"executed": True, "summary": report}
+        _type_into_app(report, app_name)
+        return {"executed": True, "summary": report}
 
 
 def gather_topic_to_word(topic: str, include_sources: bool = False) -> dict:
-    # Prefer Wikipedia summary if available
-    titles = _wikipedia_opensearch(topic, max_results=3)
-    wiki = None
-    for title in titles or [topic]:
-        wiki = _fetch_wikipedia_summary(title)
-        if wiki:
-            break
-    instant = _duckduckgo_instant_answer(topic)
-
-    parts = []
-    links = _duckduckgo_search(topic, max_results=4)
-    for link in links:
-        text = _fetch_url_text(link, max_chars=7000)
-        if text and _is_relevant(text, topic):
-            parts.append(_extract_relevant_snippet(text, topic))
+    wiki, instant, parts = _gather_evidence(topic, max_links=4, max_chars=7000)
 
     if not parts and not wiki and not instant:
         return {
@@ -495,7 +823,8 @@ def gather_topic_to_word(topic: str, include_sources: bool = False) -> dict:
 
     combined = _compose_research_text(topic, wiki, instant, parts)
 
-    result = _write_to_word(combined, title=topic)
+    with ui_turn():
+        result = _write_to_word(combined, title=topic)
     if not result.get("executed"):
         return result
 
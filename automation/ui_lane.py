@@ -0,0 +1,105 @@
+# automation/ui_lane.py
+
+import threading
+from contextlib import contextmanager
+
+
+class TurnWithdrawn(Exception):
+    """Raised by ui_turn() when the chain owning the turn has stopped."""
+
+
+class UILane:
+    """
+    Admits callers strictly in ticket order, one at a time.
+
+    Callers take numbered tickets up front and wait for their turn. A
+    ticket that turns out not to need its turn must still be released
+    with done(), or later tickets wait.
+
+    Each command chain keeps its own lane to run its desktop steps in
+    chain order. DESKTOP is the process-wide lane that serializes actual
+    keyboard, mouse and focus work across chains and single commands.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._issued = 0
+        self._serving = 0
+        self._finished: set[int] = set()
+
+    def tickets(self, n: int) -> list[int]:
+        with self._cond:
+            start = self._issued
+            self._issued += n
+            return list(range(start, start + n))
+
+    def done(self, ticket: int):
+        with self._cond:
+            if ticket < self._serving or ticket in self._finished:
+                return
+            self._finished.add(ticket)
+            while self._serving in self._finished:
+                self._finished.remove(self._serving)
+                self._serving += 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def turn(self, ticket: int):
+        with self._cond:
+            self._cond.wait_for(lambda: self._serving >= ticket)
+        try:
+            yield
+        finally:
+            self.done(ticket)
+
+    @contextmanager
+    def assigned(self, ticket: int, halted=None):
+        """
+        Binds a ticket on this lane to the current thread so ui_turn()
+        inside a tool waits for it. If halted() is true once the turn
+        comes, ui_turn() raises TurnWithdrawn instead of letting the tool
+        act, and the yielded binding has "withdrawn" set.
+        """
+        binding = {"lane": self, "ticket": ticket, "halted": halted, "withdrawn": False}
+        _local.turn = binding
+        try:
+            yield binding
+        finally:
+            _local.turn = None
+
+
+DESKTOP = UILane()
+_local = threading.local()
+
+
+@contextmanager
+def desktop_turn():
+    """
+    Holds the desktop for the calling thread. Callers are served first
+    come, first served.
+    """
+    ticket = DESKTOP.tickets(1)[0]
+    with DESKTOP.turn(ticket):
+        yield
+
+
+@contextmanager
+def ui_turn():
+    """
+    Used by tools that gather data first and touch the desktop last.
+    Inside a chain step it first waits for the step's turn on the chain's
+    lane and re-checks that the chain is still going; either way it then
+    holds the desktop.
+    """
+    binding = getattr(_local, "turn", None)
+    if binding is None:
+        with desktop_turn():
+            yield
+        return
+    with binding["lane"].turn(binding["ticket"]):
+        halted = binding["halted"]
+        if halted and halted():
+            binding["withdrawn"] = True
+            raise TurnWithdrawn("Chain stopped before this step could write its output")
+        with desktop_turn():
+            yield
@@ -10,9 +10,11 @@ CHROMA_DIR = DATA_DIR / "chroma"
 KEY_DIR = DATA_DIR / "keys"
 SCREENSHOT_DIR = DATA_DIR / "screenshots"
 REPORTS_DIR = DATA_DIR / "reports"
+LLM_CACHE_DIR = DATA_DIR / "llm_cache"
+HTTP_CACHE_DIR = DATA_DIR / "http_cache"
 
 # Ensure directories exist
-for d in [DATA_DIR, LOG_DIR, CHROMA_DIR, KEY_DIR, SCREENSHOT_DIR, REPORTS_DIR]:
+for d in [DATA_DIR, LOG_DIR, CHROMA_DIR, KEY_DIR, SCREENSHOT_DIR, REPORTS_DIR, LLM_CACHE_DIR, HTTP_CACHE_DIR]:
     d.mkdir(parents=True, exist_ok=True)
 
 # LLM Configuration
@@ -20,6 +22,87 @@ OLLAMA_MODEL = "llama3:latest"
 OLLAMA_HOST = "http://localhost:11434"
 EMBEDDING_MODEL = "nomic-embed-text"
 INTENT_SIM_THRESHOLD = 0.78
+EMBED_BATCH_SIZE = 32      # Catalog examples per /api/embed request
+EMBED_MAX_WORKERS = 4      # Parallel /api/embeddings calls when batching is unavailable
+QUERY_EMBED_CACHE_SIZE = 512   # Query embeddings kept in memory (LRU)
+QUERY_EMBED_CACHE_TTL = 3600   # Seconds before a cached query embedding expires
+INTENT_SPECULATIVE = True      # Let the LLM classifier join while the embedding stage is still running
+INTENT_LLM_HEDGE_DELAY = 0.3   # Seconds the embedding stage runs alone before the LLM joins (speculative)
+# Caps the embedding + LLM stages together. It is shorter than the 30s
+# read timeout the LLM classifier used to wait out on its own
+# (OLLAMA_TIMEOUTS["classify"]): a slow model now falls back to chat after 12s.
+INTENT_LATENCY_BUDGET = 12.0   # Seconds before semantic classification gives up (chat fallback)
+INTENT_CACHE_ENABLED = True    # Persist resolved tool intents per utterance (SQLite)
+INTENT_CACHE_TTL = 7 * 24 * 3600  # Seconds a cached intent stays valid
+INTENT_CACHE_VERSION = 1       # Bump to invalidate cached intents after changes the fingerprint cannot see
+LEARNED_INDEX_ENABLED = True   # Learn intent examples from successful executions
+LEARNED_PER_TOOL_CAP = 2000    # Max learned examples per tool (oldest evicted)
+LEARNED_DEDUP_THRESHOLD = 0.97 # Cosine above which a new example counts as a duplicate
+LEARNED_SAVE_EVERY = 20        # Persist the learned index after this many new examples
+CHAIN_MAX_WORKERS = 4          # Command-chain parts resolved concurrently
+CHAIN_CONFIRM_TIMEOUT = 300    # Seconds a paused chain waits for confirmation before it is cancelled
+OLLAMA_POOL_SIZE = 8           # Keep-alive connections held open to Ollama
+OLLAMA_MODEL_SLOTS = 4         # Concurrent generations Ollama serves (OLLAMA_NUM_PARALLEL)
+OLLAMA_CONNECT_TIMEOUT = 2.0   # Seconds to establish a connection to Ollama
+OLLAMA_TIMEOUTS = {            # Read timeout (seconds) per kind of Ollama call
+    "default": 60,
+    "generate": 120,
+    "classify": 30,
+    "embed": 20,
+    "embed_batch": 60,
+    "health": 1,
+    "preload": 300,
+    "background": 180,
+}
+OLLAMA_PRIORITY_CLASSES = {    # Kind of call -> scheduling class; classes are served in this order
+    "classify": "interactive",
+    "chat": "chat",
+    "generate": "chat",
+    "background": "background",
+}
+OLLAMA_QUEUE_LIMITS = {        # Requests allowed to wait per class before new ones are refused
+    "interactive": 32,
+    "chat": 16,
+    "background": 64,
+}
+OLLAMA_BACKGROUND_SLOTS = 3    # Slots background work may hold at once (keep < OLLAMA_MODEL_SLOTS)
+OLLAMA_AGING_SECONDS = 10.0    # Seconds of waiting that promote a request by one class
+OLLAMA_KEEP_ALIVE = "30m"      # How long Ollama keeps a model loaded after each request
+OLLAMA_AUTOSTART = True        # Launch `ollama serve` when the server is not reachable
+OLLAMA_HEALTH_INTERVAL = 15    # Seconds between liveness probes while Ollama is up
+OLLAMA_HEALTH_MAX_BACKOFF = 30 # Max seconds between probes while it is down (doubling from 1s)
+OLLAMA_PRELOAD_REFRESH = 600   # Seconds between warm-up pings that keep models resident
+OLLAMA_START_WAIT = 10         # Seconds a chat waits for a starting Ollama before giving up
+LLM_CACHE_ENABLED = True       # Reuse identical completions (summaries, session-less chat only)
+LLM_CACHE_MEMORY_SIZE = 128    # Completions kept in memory (LRU)
+LLM_CACHE_TTL = 24 * 3600      # Seconds before a cached completion expires
+LLM_CACHE_MAX_BYTES = 64 * 1024 * 1024  # Compressed on-disk size before oldest entries are evicted
+CHAT_CONTEXT_TOKENS = 4096     # Context window of the chat model (match Ollama's num_ctx)
+CHAT_COMPACT_RATIO = 0.75      # Share of the window a session may fill before old turns are summarized
+CHAT_KEEP_TURNS = 4            # Recent exchanges kept verbatim when compacting
+CHAT_MAX_SESSIONS = 64         # Chat sessions kept in memory (least recently used dropped)
+RESEARCH_DEADLINE = 12.0       # Seconds evidence gathering may take before composing what arrived
+RESEARCH_BUDGETS = {           # Per-request timeout (seconds) for each evidence source
+    "wikipedia": 6,
+    "instant": 5,
+    "search": 6,
+    "page": 8,
+}
+RESEARCH_MAX_WORKERS = 8       # Evidence requests in flight at once
+SEARCH_HEDGE_DELAY = 0.75      # Seconds before the next DuckDuckGo endpoint joins the race
+SEARCH_CIRCUIT_FAILURES = 3    # Consecutive failures that take an endpoint out of rotation
+SEARCH_CIRCUIT_COOLDOWN = 300  # Seconds before a failing endpoint is tried again
+SUMMARY_MAX_CHARS = 200_000    # Page text read for "summarize <url>" (summarized in chunks)
+SUMMARY_CHUNK_CHARS = 6000     # Characters per chunk summarized in one prompt
+PAGE_TEXT_MAX_CHARS = 8000     # Visible text extracted (and cached) per fetched page
+PAGE_MAX_CHARS = 2 * 1024 * 1024  # Decoded characters read from a page before extraction gives up
+HTTP_CACHE_MAX_BYTES = 128 * 1024 * 1024  # Compressed research responses kept on disk (LRU)
+HTTP_CACHE_TTLS = {            # Seconds a cached response is used without revalidating, per source
+    "default": 3600,
+    "page": 24 * 3600,
+    "wikipedia": 7 * 24 * 3600,
+    "instant": 24 * 3600,
+}
 
 # Voice
 ENABLE_VOICE = True
@@ -61,6 +61,160 @@ function runQuickCommand(commandText) {
   sendCommand();
 }
 
+/* -------------------------
+   Command chains (streamed step by step)
+------------------------- */
+const STEP_ICONS = {
+  pending: "⏳",
+  running: "▶️",
+  success: "✅",
+  error: "❌",
+  chat: "💬",
+  skipped: "⏭️",
+  needs_confirmation: "🟡"
+};
+
+let chainSteps = [];
+
+function renderChain(note = "") {
+  const lines = chainSteps.map((step) => {
+    const icon = STEP_ICONS[step.status] || "•";
+    return step.message ? `${icon} ${step.raw} — ${step.message}` : `${icon} ${step.raw}`;
+  });
+  if (note) lines.push(note);
+  return lines.join("\n");
+}
+
+// Reads NDJSON events (chain progress or chat tokens) until the stream ends
+async function followEvents(res) {
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (value) buffer += decoder.decode(value, { stream: true });
+
+    let newline;
+    while ((newline = buffer.indexOf("\n")) >= 0) {
+      const line = buffer.slice(0, newline).trim();
+      buffer = buffer.slice(newline + 1);
+      if (line) handleStreamEvent(JSON.parse(line));
+    }
+    if (done) break;
+  }
+}
+
+function handleStreamEvent(event) {
+  if (event.type === "chat") {
+    handleChatEvent(event);
+  } else {
+    handleChainEvent(event);
+  }
+}
+
+/* -------------------------
+   Chat (streamed token by token)
+------------------------- */
+let chatText = "";
+
+// One conversation per page load; the backend keeps its history
+const chatSessionId = window.crypto && crypto.randomUUID
+  ? crypto.randomUUID()
+  : `${Date.now()}-${Math.random().toString(16).slice(2)}`;
+
+function handleChatEvent(event) {
+  switch (event.status) {
+    case "token":
+      chatText += event.text;
+      // ✅ Persistent until next command
+      showToast(chatText, "info", null);
+      break;
+
+    case "done":
+      if (!chatText) showToast("No response from model.", "info", null);
+      chatText = "";
+      break;
+
+    default:
+      showToast(event.message || "Chat failed", "error", 2800);
+      chatText = "";
+  }
+}
+
+function handleChainEvent(event) {
+  if (event.type === "step") {
+    chainSteps[event.index] = event;
+    showToast(renderChain(), "info", null);
+    return;
+  }
+
+  switch (event.status) {
+    case "started":
+      chainSteps = event.steps.map((raw, index) => ({ index, raw, status: "pending" }));
+      showToast(renderChain(), "info", null);
+      break;
+
+    case "paused":
+      showChainConfirmation(event.id);
+      break;
+
+    case "done":
+      showToast(renderChain("All actions completed."), "success", 8000);
+      break;
+
+    case "cancelled":
+      showToast(renderChain("Chain cancelled."), "info", 6000);
+      break;
+
+    default:
+      showToast(renderChain("Stopped because one step failed."), "error", 8000);
+  }
+}
+
+function showChainConfirmation(chainId) {
+  const step = chainSteps.find((s) => s.status === "needs_confirmation");
+  const options = (step && step.data && step.data.options) || [];
+  showToast(renderChain("Which one do you want to open?"), "info", null);
+
+  const choices = document.createElement("div");
+  choices.className = "options";
+  options.forEach((opt) => {
+    const btn = document.createElement("button");
+    btn.className = "option-btn";
+    btn.innerText = opt.label;
+    btn.addEventListener("click", () => resumeChain(chainId, { choice: opt }));
+    choices.appendChild(btn);
+  });
+
+  const cancel = document.createElement("button");
+  cancel.className = "cancel-btn";
+  cancel.innerText = "Cancel";
+  cancel.addEventListener("click", () => resumeChain(chainId, { cancel: true }));
+  choices.appendChild(cancel);
+
+  toast.appendChild(choices);
+}
+
+async function resumeChain(chainId, body) {
+  try {
+    const res = await fetch(`/chain/${chainId}/resume`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify(body)
+    });
+
+    if (!res.ok) {
+      const data = await res.json();
+      showToast(data.message || "Could not resume", "error", 2800);
+      return;
+    }
+    await followEvents(res);
+  } catch (err) {
+    showToast("Backend not reachable", "error", 2800);
+  }
+}
+
 /* -------------------------
    Command execution
 ------------------------- */
@@ -74,9 +228,18 @@ async function sendCommand() {
     const res = await fetch("/command", {
       method: "POST",
       headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({ text })
+      body: JSON.stringify({ text, session_id: chatSessionId })
     });
 
+    // 🔵 Command chains and chat answers stream in as they happen
+    if ((res.headers.get("Content-Type") || "").includes("ndjson")) {
+      status.innerText = "AIPROS is working…";
+      input.value = "";
+      await followEvents(res);
+      hideThinking();
+      return;
+    }
+
     const data = await res.json();
     hideThinking();
 
@@ -86,10 +249,6 @@ async function sendCommand() {
         showToast(data.message || "No response from model.", "info", null);
         break;
 
-      case "chain":
-        showToast("Multiple actions queued. Run them one by one.", "info", 8000);
-        break;
-
       case "success":
         showToast(data.message, "success", 6000);
         break;
@@ -0,0 +1,214 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Hashable
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries also expire after ttl seconds.
+    Tracks hits and misses so callers can report cache effectiveness.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if self.ttl is None or time.monotonic() - stored_at < self.ttl:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.pop(key, None)
+            return entry[1] if entry is not None else default
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class DiskLRU:
+    """
+    Size-bounded store of zlib-compressed JSON entries, one file per key
+    under `directory`. Reads refresh the file's mtime, and once the store
+    grows past max_bytes the least recently used files are deleted until
+    it is back under 90% (so eviction does not run on every write).
+    Freshness is left to the caller.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int, suffix: str = ".json.z"):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self._lock = threading.Lock()
+        self._bytes: int | None = None
+        self._stats = {"reads": 0, "writes": 0, "evictions": 0}
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}{self.suffix}"
+
+    def _files(self):
+        return self.directory.glob(f"*/*{self.suffix}")
+
+    def read(self, key: str) -> dict | None:
+        path = self._path(key)
+        try:
+            entry = json.loads(zlib.decompress(path.read_bytes()))
+        except (OSError, ValueError, zlib.error):
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self._stats["reads"] += 1
+        return entry
+
+    def write(self, key: str, entry: dict) -> bool:
+        blob = zlib.compress(json.dumps(entry).encode("utf-8"))
+        path = self._path(key)
+        tmp = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Each writer gets its own temp file, so concurrent writes of
+            # one key each publish a complete blob
+            with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f"{path.name}.", suffix=".tmp", delete=False) as f:
+                tmp = f.name
+                f.write(blob)
+            with self._lock:
+                replaced = _file_size(path)
+                os.replace(tmp, path)
+                tmp = None
+                self._stats["writes"] += 1
+                if self._bytes is None:
+                    self._bytes = self._scan_bytes()
+                else:
+                    self._bytes += len(blob) - replaced
+                over = self._bytes > self.max_bytes
+        except OSError as e:
+            print("[DISK CACHE ERROR]", e)
+            if tmp:
+                try:
+                    os.unlink(tmp)
+                except OSError:
+                    pass
+            return False
+
+        if over:
+            self._evict()
+        return True
+
+    def remove(self, key: str):
+        path = self._path(key)
+        with self._lock:
+            size = _file_size(path)
+            try:
+                path.unlink()
+            except OSError:
+                return
+            if self._bytes is not None:
+                self._bytes -= size
+
+    def clear(self):
+        for path in self._files():
+            try:
+                path.unlink()
+            except OSError:
+                pass
+        with self._lock:
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["bytes"] = self._bytes
+        stats["max_bytes"] = self.max_bytes
+        return stats
+
+    def _scan_bytes(self) -> int:
+        total = 0
+        for path in self._files():
+            try:
+                total += path.stat().st_size
+            except OSError:
+                pass
+        return total
+
+    def _evict(self):
+        entries = []
+        for path in self._files():
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        evicted = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+
+        with self._lock:
+            self._bytes = total
+            self._stats["evictions"] += evicted
+
+
+def _file_size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
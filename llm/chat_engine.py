@@ -1,9 +1,81 @@
-from llm.ollama_service_manager import is_ollama_running, start_ollama
-from llm.ollama_client import call_ollama
+import asyncio
 
+from config import OLLAMA_START_WAIT
+from llm.ollama_service_manager import OLLAMA_MONITOR
+from llm.ollama_client import call_ollama, call_ollama_async, stream_ollama, stream_ollama_async
+from llm.chat_session import get_chat_session
 
-def chat_response(prompt: str) -> str:
-    if not is_ollama_running():
-        start_ollama()
 
-    return call_ollama(prompt)
+def chat_response(prompt: str, use_cache: bool = True, session_id: str | None = None) -> str:
+    """
+    With session_id the reply continues that conversation (see
+    chat_session). use_cache applies only to calls without one (voice,
+    /resume, one-off prompts): a session turn depends on the history, so
+    it always generates, and the web UI always sends a session.
+    """
+    # Cached liveness; only waits when Ollama is down or still starting
+    OLLAMA_MONITOR.wait_until_alive(OLLAMA_START_WAIT)
+
+    try:
+        if session_id:
+            return get_chat_session(session_id).reply(prompt)
+        return call_ollama(prompt, use_cache=use_cache)
+    except Exception:
+        OLLAMA_MONITOR.request_probe()
+        raise
+
+
+def chat_response_stream(prompt: str, use_cache: bool = True, session_id: str | None = None):
+    """
+    Same as chat_response, but yields the answer as it is generated.
+    """
+    OLLAMA_MONITOR.wait_until_alive(OLLAMA_START_WAIT)
+
+    try:
+        if session_id:
+            yield from get_chat_session(session_id).stream(prompt)
+        else:
+            yield from stream_ollama(prompt, use_cache=use_cache)
+    except Exception:
+        OLLAMA_MONITOR.request_probe()
+        raise
+
+
+async def _wait_until_alive_async():
+    # Only hands the wait to a thread when Ollama is not known to be up
+    if not OLLAMA_MONITOR.alive:
+        await asyncio.to_thread(OLLAMA_MONITOR.wait_until_alive, OLLAMA_START_WAIT)
+
+
+async def chat_response_async(prompt: str, use_cache: bool = True, session_id: str | None = None) -> str:
+    """
+    chat_response for coroutines: awaits the reply without holding a
+    thread for the generation.
+    """
+    await _wait_until_alive_async()
+
+    try:
+        if session_id:
+            return await get_chat_session(session_id).reply_async(prompt)
+        return await call_ollama_async(prompt, use_cache=use_cache)
+    except Exception:
+        OLLAMA_MONITOR.request_probe()
+        raise
+
+
+async def chat_response_stream_async(prompt: str, use_cache: bool = True, session_id: str | None = None):
+    """
+    chat_response_stream for coroutines.
+    """
+    await _wait_until_alive_async()
+
+    try:
+        if session_id:
+            async for token in get_chat_session(session_id).stream_async(prompt):
+                yield token
+        else:
+            async for token in stream_ollama_async(prompt, use_cache=use_cache):
+                yield token
+    except Exception:
+        OLLAMA_MONITOR.request_probe()
+        raise
@@ -0,0 +1,204 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Iterator
+
+from config import CHAT_CONTEXT_TOKENS, CHAT_COMPACT_RATIO, CHAT_KEEP_TURNS, CHAT_MAX_SESSIONS
+from llm.ollama_client import call_ollama, stream_ollama_chat, stream_ollama_chat_async
+
+# Rough characters per token, for sizing a session before Ollama reports counts
+_CHARS_PER_TOKEN = 4
+
+# Sizes Ollama's context to the window compaction plans for
+_CHAT_OPTIONS = {"num_ctx": CHAT_CONTEXT_TOKENS}
+
+COMPACT_PROMPT = """
+You maintain the running summary of a conversation between a user and the assistant AIPROS.
+Fold the new exchanges into the existing summary. Keep names, facts, preferences,
+decisions and open questions; drop small talk. Reply with the summary only.
+
+Existing summary:
+{summary}
+
+New exchanges:
+{transcript}
+"""
+
+
+class ChatSession:
+    """
+    One conversation held over /api/chat.
+
+    Every turn sends the running summary (as a system message), the
+    turns since then and the new message. Each prompt starts with the
+    previous one, so Ollama reuses the KV cache it kept for that prefix
+    and only evaluates the new message; turn latency stays flat as the
+    conversation grows.
+
+    Once a turn fills CHAT_COMPACT_RATIO of the context window, all but
+    the last CHAT_KEEP_TURNS exchanges are folded into the summary on a
+    background thread. The turn after that pays for one full prompt
+    evaluation, then reuse resumes.
+
+    Turns of one session run one at a time, from request to recorded
+    reply, so every prompt extends the previous one.
+    """
+
+    def __init__(self, session_id: str):
+        self.id = session_id
+        self.summary = ""
+        self.messages: list[dict] = []
+        self.tokens = 0
+        self.turns = 0
+        self.compactions = 0
+        self.last_used = time.time()
+        self._lock = threading.Lock()
+        self._turn = threading.Lock()
+        self._compacting = False
+
+    def _prompt(self, text: str) -> list[dict]:
+        with self._lock:
+            messages = list(self.messages)
+            summary = self.summary
+        if summary:
+            messages.insert(0, {"role": "system", "content": f"Summary of the conversation so far:\n{summary}"})
+        messages.append({"role": "user", "content": text})
+        return messages
+
+    def stream(self, text: str) -> Iterator[str]:
+        """
+        Yields the reply token by token. The turn joins the history only
+        when the reply completes.
+        """
+        with self._turn:
+            self.last_used = time.time()
+            prompt = self._prompt(text)
+            final = yield from stream_ollama_chat(prompt, _CHAT_OPTIONS)
+            self._record(prompt, text, final)
+
+    async def stream_async(self, text: str) -> AsyncIterator[str]:
+        """
+        stream() for coroutines.
+        """
+        await self._acquire_turn()
+        try:
+            self.last_used = time.time()
+            prompt = self._prompt(text)
+            final = {}
+            async for token in stream_ollama_chat_async(prompt, final, _CHAT_OPTIONS):
+                yield token
+            self._record(prompt, text, final)
+        finally:
+            self._turn.release()
+
+    async def _acquire_turn(self):
+        # The turn lock is shared with threads, so wait for it off the loop
+        if self._turn.acquire(blocking=False):
+            return
+        acquiring = asyncio.ensure_future(asyncio.to_thread(self._turn.acquire))
+        try:
+            await asyncio.shield(acquiring)
+        except asyncio.CancelledError:
+            # Gave up waiting; hand the turn back once the thread gets it
+            acquiring.add_done_callback(lambda _: self._turn.release())
+            raise
+
+    def _record(self, prompt: list[dict], text: str, final: dict):
+        if not final.get("done"):
+            return
+
+        reply = {"role": "assistant", "content": final["content"]}
+        # Ollama counts only the tokens it had to evaluate, so cached
+        # prefixes make its numbers low; take whichever is larger
+        estimated = sum(len(m["content"]) for m in prompt + [reply]) // _CHARS_PER_TOKEN
+        counted = final.get("prompt_eval_count", 0) + final.get("eval_count", 0)
+
+        with self._lock:
+            self.messages += [{"role": "user", "content": text}, reply]
+            self.turns += 1
+            self.tokens = max(estimated, counted)
+            compact = (
+                not self._compacting
+                and self.tokens > CHAT_CONTEXT_TOKENS * CHAT_COMPACT_RATIO
+                and len(self.messages) > 2 * CHAT_KEEP_TURNS
+            )
+            if compact:
+                self._compacting = True
+
+        if compact:
+            threading.Thread(target=self._compact, name=f"chat-compact-{self.id[:8]}", daemon=True).start()
+
+    def reply(self, text: str) -> str:
+        return "".join(self.stream(text))
+
+    async def reply_async(self, text: str) -> str:
+        return "".join([token async for token in self.stream_async(text)])
+
+    def _compact(self):
+        with self._lock:
+            old = self.messages[:len(self.messages) - 2 * CHAT_KEEP_TURNS]
+            summary = self.summary
+
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in old)
+        try:
+            new_summary = call_ollama(
+                COMPACT_PROMPT.format(summary=summary or "(none)", transcript=transcript),
+                kind="background",
+            ).strip()
+        except Exception as e:
+            print("[CHAT COMPACT ERROR]", e)
+            new_summary = ""
+
+        with self._lock:
+            if new_summary:
+                # Turns added meanwhile were appended after `old`; keep them
+                del self.messages[:len(old)]
+                self.summary = new_summary
+                self.compactions += 1
+            self._compacting = False
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "id": self.id,
+                "turns": self.turns,
+                "messages": len(self.messages),
+                "tokens": self.tokens,
+                "summary_chars": len(self.summary),
+                "compactions": self.compactions,
+                "compacting": self._compacting,
+            }
+
+
+# -----------------------------
+# Registry
+# -----------------------------
+_SESSIONS: "OrderedDict[str, ChatSession]" = OrderedDict()
+_SESSIONS_LOCK = threading.Lock()
+
+
+def get_chat_session(session_id: str) -> ChatSession:
+    """
+    Returns the session with this id, starting a new one if needed.
+    """
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(session_id)
+        if session is None:
+            session = _SESSIONS[session_id] = ChatSession(session_id)
+        _SESSIONS.move_to_end(session_id)
+        while len(_SESSIONS) > CHAT_MAX_SESSIONS:
+            _SESSIONS.popitem(last=False)
+        return session
+
+
+def chat_session_stats() -> dict:
+    with _SESSIONS_LOCK:
+        sessions = [s.snapshot() for s in _SESSIONS.values()]
+    return {
+        "sessions": len(sessions),
+        "turns": sum(s["turns"] for s in sessions),
+        "compactions": sum(s["compactions"] for s in sessions),
+        "compacting": sum(1 for s in sessions if s["compacting"]),
+        "max_tokens": max((s["tokens"] for s in sessions), default=0),
+    }
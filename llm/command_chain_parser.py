@@ -1,25 +1,66 @@
+import copy
 import re
+from concurrent.futures import Future, ThreadPoolExecutor
+from config import CHAIN_MAX_WORKERS
 from llm.reasoning_engine import generate_intent
 
-SPLIT_REGEX = re.compile(r"\s+(and then|then|and)\s+", re.IGNORECASE)
+# Non-capturing: re.split would otherwise return the connectors as parts
+SPLIT_REGEX = re.compile(r"\s+(?:and then|then|and)\s+", re.IGNORECASE)
 
-def parse_command_chain(text: str) -> list[dict]:
+# Shared across requests so concurrent chains stay within the bound
+_CHAIN_POOL = ThreadPoolExecutor(max_workers=CHAIN_MAX_WORKERS, thread_name_prefix="chain-intent")
+
+
+def _dedup_key(cmd: str) -> str:
+    return " ".join(cmd.split())
+
+
+def split_command_chain(text: str) -> list[str]:
     """
-    Splits a compound command into ordered intents.
-    Each intent retains its original raw command text.
+    Splits a compound command into its raw sub-commands, in order.
     """
-    parts = SPLIT_REGEX.split(text)
+    return [p.strip() for p in SPLIT_REGEX.split(text) if p.strip()]
 
-    # Filter out connectors like "and", "then"
-    commands = [p.strip() for p in parts if p.strip() and not SPLIT_REGEX.match(p)]
 
-    intents = []
+def submit_command_chain(commands: list[str]) -> list[Future]:
+    """
+    Starts resolving every sub-command on the chain pool and returns one
+    future per command, in order. Identical commands share a future, so
+    callers must copy the intent before mutating it.
+    """
+    futures = {}
     for cmd in commands:
-        intent = generate_intent(cmd)
+        key = _dedup_key(cmd)
+        if key not in futures:
+            futures[key] = _CHAIN_POOL.submit(generate_intent, cmd)
+    return [futures[_dedup_key(cmd)] for cmd in commands]
 
-        # 🔹 Preserve raw command for Phase D2 execution
-        intent["raw"] = cmd
 
-        intents.append(intent)
+def chain_intent(future: Future, cmd: str) -> dict:
+    """
+    Waits for a submitted command and returns its own copy of the intent.
+    """
+    intent = copy.deepcopy(future.result())
+
+    # 🔹 Preserve raw command for Phase D2 execution
+    intent["raw"] = cmd
+    return intent
+
+
+def parse_command_chain(text: str, defer_chat: bool = False) -> list[dict]:
+    """
+    Splits a compound command into ordered intents.
+    Each intent retains its original raw command text.
+
+    Parts are resolved concurrently; identical parts are resolved once.
+    defer_chat applies to single commands (see generate_intent).
+    """
+    commands = split_command_chain(text)
+
+    if len(commands) == 1:
+        intent = generate_intent(commands[0], defer_chat=defer_chat)
+        intent["raw"] = commands[0]
+        return [intent]
 
-    return intents
\ No newline at end of file
+    futures = submit_command_chain(commands)
+    return [chain_intent(fut, cmd) for fut, cmd in zip(futures, commands)]
@@ -0,0 +1,88 @@
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+
+from config import LLM_CACHE_DIR, LLM_CACHE_MEMORY_SIZE, LLM_CACHE_TTL, LLM_CACHE_MAX_BYTES
+from llm.cache import DiskLRU, TTLCache
+
+
+def completion_key(model: str, prompt: str, options: dict | None = None) -> str:
+    """
+    Content address of a completion: same model, options and prompt give
+    the same key.
+    """
+    blob = json.dumps({"model": model, "options": options or {}, "prompt": prompt}, sort_keys=True)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class CompletionCache:
+    """
+    Two-tier cache of LLM completions.
+
+    Recent entries sit in an in-memory LRU; every entry is also written
+    compressed to a DiskLRU under `directory`, so summaries survive
+    restarts. Entries expire ttl seconds after they were generated, and
+    the least recently used files go once the directory passes max_bytes.
+
+    Callers opt in with use_cache: report summaries and chat prompts sent
+    without a session. Session chat, which is all the web UI sends, never
+    reads or fills it.
+    """
+
+    def __init__(self, directory: Path, memory_size: int, ttl: float, max_bytes: int):
+        self.ttl = ttl
+        # Values are (created_at, response); expiry follows the disk entry
+        self._memory = TTLCache(memory_size)
+        self._disk = DiskLRU(directory, max_bytes)
+        self._lock = threading.Lock()
+        self._stats = {"disk_hits": 0, "disk_misses": 0}
+
+    def get(self, key: str) -> str | None:
+        cached = self._memory.get(key)
+        if cached is not None:
+            created_at, response = cached
+            if time.time() - created_at <= self.ttl:
+                return response
+            self._memory.pop(key)
+
+        entry = self._disk.read(key)
+        if entry is not None and time.time() - entry.get("created_at", 0) > self.ttl:
+            self._disk.remove(key)
+            entry = None
+        self._count("disk_hits" if entry is not None else "disk_misses")
+        if entry is None:
+            return None
+
+        self._memory.set(key, (entry["created_at"], entry["response"]))
+        return entry["response"]
+
+    def set(self, key: str, response: str, model: str | None = None):
+        if not response:
+            return
+        created_at = time.time()
+        self._memory.set(key, (created_at, response))
+        self._disk.write(key, {"model": model, "created_at": created_at, "response": response})
+
+    def clear(self):
+        self._memory.clear()
+        self._disk.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["memory"] = self._memory.stats()
+        stats["disk"] = self._disk.stats()
+        return stats
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+
+LLM_CACHE = CompletionCache(LLM_CACHE_DIR, LLM_CACHE_MEMORY_SIZE, LLM_CACHE_TTL, LLM_CACHE_MAX_BYTES)
+
+
+def llm_cache_stats() -> dict:
+    return LLM_CACHE.stats()
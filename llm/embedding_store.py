@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+import numpy as np
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def model_slug(model: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9]+", "_", model).strip("_") or "default"
+
+
+class ExampleEmbeddingStore:
+    """
+    On-disk cache of example embeddings for one embedding model.
+
+    Vectors live in a .npy file that is memory-mapped on load; a JSON
+    manifest names that file and maps the SHA-1 of each example text to its
+    row. Examples whose text changed simply miss the cache and get
+    re-embedded.
+    """
+
+    def __init__(self, directory: Path, model: str, name: str = "intent_examples"):
+        self.model = model
+        self.directory = Path(directory)
+        self.prefix = f"{name}-{model_slug(model)}"
+        self.manifest_path = self.directory / f"{self.prefix}.json"
+
+    def _read_manifest(self) -> dict | None:
+        try:
+            manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        except Exception:
+            return None
+        if not isinstance(manifest, dict) or manifest.get("model") != self.model:
+            return None
+        if not isinstance(manifest.get("rows"), dict) or not manifest.get("vectors"):
+            return None
+        return manifest
+
+    def load(self, texts: list[str]) -> dict[str, np.ndarray]:
+        """
+        Returns cached vectors for the given texts. Missing, stale or
+        corrupt entries are left out so the caller re-embeds them.
+        """
+        manifest = self._read_manifest()
+        if manifest is None:
+            return {}
+
+        try:
+            vectors = np.load(self.directory / manifest["vectors"], mmap_mode="r")
+        except Exception:
+            return {}
+
+        rows = manifest["rows"]
+        if vectors.ndim != 2 or vectors.shape != (len(rows), manifest.get("dim")):
+            return {}
+
+        found = {}
+        for text in texts:
+            row = rows.get(text_hash(text))
+            if isinstance(row, int) and 0 <= row < vectors.shape[0]:
+                # Copy the row out so the mapping can be released (and
+                # replaced by save) without invalidating callers' vectors
+                found[text] = np.array(vectors[row], dtype=np.float32)
+        del vectors
+        return found
+
+    def save(self, embeddings: dict[str, list[float]]) -> bool:
+        """
+        Replaces the cache with the given text -> vector mapping.
+        Examples no longer present are dropped.
+        """
+        items = [(text, vec) for text, vec in embeddings.items() if vec is not None and len(vec)]
+        if not items:
+            return False
+
+        dim = len(items[0][1])
+        items = [(text, vec) for text, vec in items if len(vec) == dim]
+
+        rows = {text_hash(text): row for row, (text, _) in enumerate(items)}
+        generation = hashlib.sha1(json.dumps([self.model, dim, rows]).encode("utf-8")).hexdigest()[:12]
+        vectors_name = f"{self.prefix}-{generation}.npy"
+        previous = self._read_manifest()
+
+        tmp_vectors = self.directory / f"{vectors_name}.tmp"
+        tmp_manifest = self.manifest_path.with_suffix(".json.tmp")
+        try:
+            out = np.lib.format.open_memmap(
+                tmp_vectors, mode="w+", dtype=np.float32, shape=(len(items), dim)
+            )
+            for row, (_, vec) in enumerate(items):
+                out[row] = np.asarray(vec, dtype=np.float32)
+            out.flush()
+            del out
+            os.replace(tmp_vectors, self.directory / vectors_name)
+
+            # Swapping the manifest is the commit point; the vectors file it
+            # names is always complete
+            manifest = {"model": self.model, "dim": dim, "vectors": vectors_name, "rows": rows}
+            tmp_manifest.write_text(json.dumps(manifest), encoding="utf-8")
+            os.replace(tmp_manifest, self.manifest_path)
+        except Exception:
+            for tmp in (tmp_vectors, tmp_manifest):
+                try:
+                    tmp.unlink()
+                except OSError:
+                    pass
+            return False
+
+        if previous and previous["vectors"] != vectors_name:
+            try:
+                (self.directory / previous["vectors"]).unlink()
+            except OSError:
+                # Still mapped elsewhere (Windows); it is orphaned, not stale
+                pass
+        return True
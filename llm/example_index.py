@@ -0,0 +1,390 @@
+import threading
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+
+
+def _normalize(vec) -> np.ndarray | None:
+    v = np.asarray(vec, dtype=np.float32).ravel()
+    norm = float(np.linalg.norm(v))
+    if norm == 0:
+        return None
+    return v / norm
+
+
+def _quantize(unit: np.ndarray) -> tuple[np.ndarray, float]:
+    """
+    Symmetric per-vector int8 quantization; vector ~= codes * scale.
+    """
+    peak = float(np.max(np.abs(unit)))
+    scale = peak / 127.0 if peak else 1.0
+    return np.clip(np.rint(unit / scale), -127, 127).astype(np.int8), scale
+
+
+def _kmeans(data: np.ndarray, k: int, iterations: int = 8, seed: int = 0) -> np.ndarray:
+    """
+    Spherical k-means on unit vectors; returns L2-normalised centroids.
+    """
+    rng = np.random.default_rng(seed)
+    centroids = data[rng.choice(data.shape[0], size=k, replace=False)].copy()
+    for _ in range(iterations):
+        labels = np.argmax(data @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, data)
+        empty = ~sums.any(axis=1)
+        if empty.any():
+            # Re-seed empty lists so every centroid stays useful
+            sums[empty] = data[rng.choice(data.shape[0], size=int(empty.sum()), replace=False)]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids = sums / norms
+    return centroids.astype(np.float32)
+
+
+class LearnedExampleIndex:
+    """
+    Growable IVF (inverted file) index over int8-quantized example embeddings.
+
+    Below min_train examples every lookup is an exact scan. Past that, the
+    examples are clustered with k-means and a lookup only scores the n_probe
+    lists whose centroids are closest to the query. The clustering is
+    retrained whenever the index doubles in size. Near-duplicates of an
+    existing example are not stored twice, and each tool keeps at most
+    per_tool_cap examples; the oldest one is evicted past the cap.
+    """
+
+    def __init__(
+        self,
+        per_tool_cap: int = 2000,
+        dedup_threshold: float = 0.97,
+        n_probe: int = 8,
+        min_train: int = 1024,
+        max_lists: int = 256,
+    ):
+        self.per_tool_cap = per_tool_cap
+        self.dedup_threshold = dedup_threshold
+        self.n_probe = n_probe
+        self.min_train = min_train
+        self.max_lists = max_lists
+
+        self._lock = threading.RLock()
+        self._retraining = False
+        self._reset(dim=None)
+
+    def _reset(self, dim: int | None):
+        self.dim = dim
+        self._codes = np.zeros((0, dim or 0), dtype=np.int8)
+        self._scales = np.zeros(0, dtype=np.float32)
+        self._row_tool = np.zeros(0, dtype=np.int32)   # -1 = evicted
+        self._row_list = np.zeros(0, dtype=np.int32)
+        self._texts: list[str] = []
+        self._size = 0
+        self._live = 0
+
+        self._tool_names: list[str] = []
+        self._tool_ids: dict[str, int] = {}
+        self._tool_rows: dict[int, deque] = {}
+        self._tool_live: dict[int, int] = {}
+        self._text_rows: dict[str, int] = {}
+
+        self._centroids: np.ndarray | None = None
+        self._inverted: list[list[int]] = []
+        self._inverted_np: list[np.ndarray | None] = []
+        self._trained_size = 0
+
+    def __len__(self) -> int:
+        return self._live
+
+    # -----------------------------
+    # Storage helpers
+    # -----------------------------
+    def _tool_id(self, tool: str) -> int:
+        tid = self._tool_ids.get(tool)
+        if tid is None:
+            tid = len(self._tool_names)
+            self._tool_names.append(tool)
+            self._tool_ids[tool] = tid
+            self._tool_rows[tid] = deque()
+            self._tool_live[tid] = 0
+        return tid
+
+    def _grow(self):
+        capacity = max(64, self._codes.shape[0] * 2)
+        codes = np.zeros((capacity, self.dim), dtype=np.int8)
+        codes[:self._size] = self._codes[:self._size]
+        scales = np.zeros(capacity, dtype=np.float32)
+        scales[:self._size] = self._scales[:self._size]
+        row_tool = np.full(capacity, -1, dtype=np.int32)
+        row_tool[:self._size] = self._row_tool[:self._size]
+        row_list = np.zeros(capacity, dtype=np.int32)
+        row_list[:self._size] = self._row_list[:self._size]
+        self._codes, self._scales = codes, scales
+        self._row_tool, self._row_list = row_tool, row_list
+
+    def _list_rows(self, list_id: int) -> np.ndarray:
+        cached = self._inverted_np[list_id]
+        if cached is None:
+            cached = np.asarray(self._inverted[list_id], dtype=np.int64)
+            self._inverted_np[list_id] = cached
+        return cached
+
+    def _candidate_rows(self, unit: np.ndarray) -> np.ndarray:
+        if self._centroids is None:
+            rows = np.arange(self._size)
+            return rows[self._row_tool[:self._size] >= 0]
+        n_probe = min(self.n_probe, self._centroids.shape[0])
+        probe = np.argpartition(-(self._centroids @ unit), n_probe - 1)[:n_probe]
+        parts = [self._list_rows(int(p)) for p in probe]
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+
+    def _score_rows(self, unit: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        return (self._codes[rows].astype(np.float32) @ unit) * self._scales[rows]
+
+    def _dequantize(self, rows) -> np.ndarray:
+        return self._codes[rows].astype(np.float32) * self._scales[rows][:, None]
+
+    def _nearest_list(self, unit: np.ndarray) -> int:
+        return int(np.argmax(self._centroids @ unit)) if self._centroids is not None else 0
+
+    def _evict(self, row: int):
+        tid = int(self._row_tool[row])
+        if tid < 0:
+            return
+        self._row_tool[row] = -1
+        self._live -= 1
+        self._tool_live[tid] -= 1
+        self._text_rows.pop(self._texts[row], None)
+        if self._centroids is not None:
+            list_id = int(self._row_list[row])
+            self._inverted[list_id].remove(row)
+            self._inverted_np[list_id] = None
+
+    # -----------------------------
+    # Public API
+    # -----------------------------
+    def search(self, vector, k: int = 3) -> list[dict]:
+        unit = _normalize(vector)
+        if unit is None or k <= 0:
+            return []
+        with self._lock:
+            if self._live == 0 or unit.shape[0] != self.dim:
+                return []
+            rows = self._candidate_rows(unit)
+            if rows.size == 0:
+                return []
+            scores = self._score_rows(unit, rows)
+            n = min(k, rows.size)
+            top = np.argpartition(-scores, n - 1)[:n]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            return [
+                {
+                    "tool": self._tool_names[int(self._row_tool[rows[i]])],
+                    "score": float(scores[i]),
+                    "text": self._texts[int(rows[i])],
+                }
+                for i in top
+            ]
+
+    def add(self, text: str, tool: str, vector) -> bool:
+        """
+        Adds a trusted example. Returns False when it was a duplicate
+        (exact text or near-identical vector already labelled with tool).
+        """
+        unit = _normalize(vector)
+        if unit is None:
+            return False
+
+        with self._lock:
+            if self.dim is None:
+                self._reset(dim=unit.shape[0])
+            if unit.shape[0] != self.dim:
+                return False
+
+            tid = self._tool_id(tool)
+
+            existing = self._text_rows.get(text)
+            if existing is None and self._live:
+                rows = self._candidate_rows(unit)
+                if rows.size:
+                    scores = self._score_rows(unit, rows)
+                    best = int(np.argmax(scores))
+                    if scores[best] >= self.dedup_threshold:
+                        existing = int(rows[best])
+            if existing is not None:
+                if self._row_tool[existing] == tid:
+                    return False
+                # A later agreed label for the same utterance: the newest wins
+                self._evict(existing)
+
+            # Deques may hold rows already evicted by a relabel; skip those
+            tool_rows = self._tool_rows[tid]
+            while self._tool_live[tid] >= self.per_tool_cap and tool_rows:
+                oldest = tool_rows.popleft()
+                if self._row_tool[oldest] == tid:
+                    self._evict(oldest)
+
+            if self._size >= self._codes.shape[0]:
+                self._grow()
+            row = self._size
+            self._size += 1
+            self._live += 1
+            self._tool_live[tid] += 1
+            self._codes[row], self._scales[row] = _quantize(unit)
+            self._row_tool[row] = tid
+            self._texts.append(text)
+            self._text_rows[text] = row
+            tool_rows.append(row)
+
+            if self._centroids is not None:
+                list_id = self._nearest_list(unit)
+                self._row_list[row] = list_id
+                self._inverted[list_id].append(row)
+                self._inverted_np[list_id] = None
+
+            needs_training = self._live >= self.min_train and (
+                self._centroids is None
+                or self._live >= 2 * self._trained_size
+                or self._size >= 2 * self._live
+            )
+
+        if needs_training:
+            self.retrain()
+        return True
+
+    def retrain(self):
+        """
+        Re-clusters the live examples and compacts evicted rows. The
+        expensive k-means runs outside the lock so lookups keep working.
+        """
+        with self._lock:
+            if self._retraining or self._live == 0:
+                return
+            self._retraining = True
+            snapshot_size = self._size
+            live_rows = np.flatnonzero(self._row_tool[:snapshot_size] >= 0)
+            data = self._dequantize(live_rows)
+
+        try:
+            norms = np.linalg.norm(data, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            data /= norms
+            n_lists = int(min(self.max_lists, max(1, 4 * np.sqrt(data.shape[0]))))
+            n_lists = min(n_lists, data.shape[0])
+            sample = data
+            if data.shape[0] > 64 * n_lists:
+                pick = np.random.default_rng(0).choice(data.shape[0], size=64 * n_lists, replace=False)
+                sample = data[pick]
+            centroids = _kmeans(sample, n_lists)
+            labels = np.argmax(data @ centroids.T, axis=1).astype(np.int32)
+        except Exception:
+            with self._lock:
+                self._retraining = False
+            return
+
+        with self._lock:
+            row_list = np.zeros(self._size, dtype=np.int32)
+            row_list[live_rows] = labels
+            # Rows appended while k-means was running
+            for row in range(snapshot_size, self._size):
+                if self._row_tool[row] >= 0:
+                    unit = self._dequantize([row])[0]
+                    row_list[row] = int(np.argmax(centroids @ unit))
+
+            keep = np.flatnonzero(self._row_tool[:self._size] >= 0)
+            remap = np.full(self._size, -1, dtype=np.int64)
+            remap[keep] = np.arange(keep.size)
+
+            self._codes = np.ascontiguousarray(self._codes[keep])
+            self._scales = self._scales[keep].copy()
+            self._row_tool = self._row_tool[keep].copy()
+            self._row_list = row_list[keep]
+            self._texts = [self._texts[i] for i in keep]
+            self._size = self._live = int(keep.size)
+            self._text_rows = {text: row for row, text in enumerate(self._texts)}
+            for tid, rows in self._tool_rows.items():
+                self._tool_rows[tid] = deque(int(remap[r]) for r in rows if remap[r] >= 0)
+
+            self._centroids = centroids
+            self._inverted = [[] for _ in range(centroids.shape[0])]
+            for row, list_id in enumerate(self._row_list):
+                self._inverted[int(list_id)].append(row)
+            self._inverted_np = [None] * centroids.shape[0]
+            self._trained_size = self._live
+            self._retraining = False
+
+    def contains(self, text: str) -> bool:
+        with self._lock:
+            return text in self._text_rows
+
+    # -----------------------------
+    # Persistence
+    # -----------------------------
+    def save(self, path: Path) -> bool:
+        with self._lock:
+            if self.dim is None:
+                return False
+            # Rows are in insertion order, so eviction stays oldest-first after load
+            keep = np.flatnonzero(self._row_tool[:self._size] >= 0)
+            payload = {
+                "codes": self._codes[keep],
+                "scales": self._scales[keep],
+                "tools": np.asarray([self._tool_names[t] for t in self._row_tool[keep]], dtype=str),
+                "texts": np.asarray([self._texts[r] for r in keep], dtype=str),
+            }
+            if self._centroids is not None:
+                payload["centroids"] = self._centroids
+                payload["trained_size"] = np.asarray(self._trained_size)
+
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        try:
+            with open(tmp, "wb") as f:
+                np.savez(f, **payload)
+            tmp.replace(path)
+            return True
+        except Exception:
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+            return False
+
+    def load(self, path: Path) -> bool:
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                codes = data["codes"]
+                scales = data["scales"]
+                tools = [str(t) for t in data["tools"]]
+                texts = [str(t) for t in data["texts"]]
+                centroids = data["centroids"] if "centroids" in data else None
+                trained_size = int(data["trained_size"]) if "trained_size" in data else 0
+        except Exception:
+            return False
+
+        with self._lock:
+            self._reset(dim=int(codes.shape[1]) if codes.ndim == 2 and codes.shape[0] else None)
+            if self.dim is None:
+                return False
+            self._codes = np.ascontiguousarray(codes, dtype=np.int8)
+            self._scales = np.asarray(scales, dtype=np.float32)
+            self._size = self._live = codes.shape[0]
+            self._row_tool = np.asarray([self._tool_id(t) for t in tools], dtype=np.int32)
+            self._texts = texts
+            self._text_rows = {text: row for row, text in enumerate(texts)}
+            for row, tid in enumerate(self._row_tool):
+                self._tool_rows[int(tid)].append(row)
+                self._tool_live[int(tid)] += 1
+
+            if centroids is not None and centroids.shape[1] == self.dim:
+                self._centroids = centroids.astype(np.float32)
+                units = self._dequantize(np.arange(self._size))
+                self._row_list = np.argmax(units @ self._centroids.T, axis=1).astype(np.int32)
+                self._inverted = [[] for _ in range(self._centroids.shape[0])]
+                for row, list_id in enumerate(self._row_list):
+                    self._inverted[int(list_id)].append(row)
+                self._inverted_np = [None] * self._centroids.shape[0]
+                self._trained_size = trained_size or self._live
+            else:
+                self._row_list = np.zeros(self._size, dtype=np.int32)
+        return True
@@ -1,19 +1,36 @@
+import atexit
 import json
-import math
 import re
-from datetime import datetime
-from pathlib import Path
-from typing import Any
-
-import requests
+import threading
+import time
+from contextlib import closing
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from typing import Any, Callable
 
 from config import (
-    OLLAMA_HOST,
     OLLAMA_MODEL,
     EMBEDDING_MODEL,
     INTENT_SIM_THRESHOLD,
-    SCREENSHOT_DIR,
+    EMBED_BATCH_SIZE,
+    EMBED_MAX_WORKERS,
+    QUERY_EMBED_CACHE_SIZE,
+    QUERY_EMBED_CACHE_TTL,
+    INTENT_SPECULATIVE,
+    INTENT_LLM_HEDGE_DELAY,
+    INTENT_LATENCY_BUDGET,
+    LEARNED_INDEX_ENABLED,
+    LEARNED_PER_TOOL_CAP,
+    LEARNED_DEDUP_THRESHOLD,
+    LEARNED_SAVE_EVERY,
+    CHROMA_DIR,
 )
+from llm.cache import TTLCache
+from llm.embedding_store import ExampleEmbeddingStore, model_slug
+from llm.example_index import LearnedExampleIndex
+from llm.intent_index import IntentIndex
+from llm.intent_rules import match_rule_intent
+from llm.intent_text import default_screenshot_path, extract_url, split_for_app, strip_prefix
+from llm.ollama_async import OLLAMA_ASYNC, OllamaError
 
 
 INTENT_CATALOG = [
@@ -189,41 +206,277 @@ INTENT_CATALOG = [
 
 
 _EXAMPLE_EMBEDS: dict[str, list[float]] = {}
+_EXAMPLE_STORE = ExampleEmbeddingStore(CHROMA_DIR, EMBEDDING_MODEL)
+_QUERY_EMBEDS = TTLCache(maxsize=QUERY_EMBED_CACHE_SIZE, ttl=QUERY_EMBED_CACHE_TTL)
+
+_INDEX: IntentIndex | None = None
+_INDEX_LOCK = threading.Lock()
+_BATCH_EMBED_SUPPORTED: bool | None = None
+
+_WARMUP_STATUS: dict[str, Any] = {"state": "idle", "done": 0, "total": 0}
+_WARMUP_THREAD: threading.Thread | None = None
+_WARMUP_LOCK = threading.Lock()
+
+# Examples learned from successful executions; grows online
+_LEARNED = LearnedExampleIndex(per_tool_cap=LEARNED_PER_TOOL_CAP, dedup_threshold=LEARNED_DEDUP_THRESHOLD)
+_LEARNED_PATH = CHROMA_DIR / f"learned_examples-{model_slug(EMBEDDING_MODEL)}.npz"
+_LEARN_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="intent-learn")
+_LEARNED_UNSAVED = 0
 
+_LLM_METRICS: dict[str, Any] = {}
+_LLM_METRICS_LOCK = threading.Lock()
 
-def _cosine(a: list[float], b: list[float]) -> float:
-    dot = sum(x * y for x, y in zip(a, b))
-    norm_a = math.sqrt(sum(x * x for x in a))
-    norm_b = math.sqrt(sum(y * y for y in b))
-    if norm_a == 0 or norm_b == 0:
-        return 0.0
-    return dot / (norm_a * norm_b)
+# Shared by speculative classification (embedding + LLM per command)
+_SPECULATIVE_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="intent-speculative")
 
 
 def _embed(text: str) -> list[float] | None:
     try:
-        res = requests.post(
-            f"{OLLAMA_HOST}/api/embeddings",
-            json={"model": EMBEDDING_MODEL, "prompt": text},
-            timeout=20,
+        data = OLLAMA_ASYNC.post_sync(
+            "/api/embeddings",
+            {"model": EMBEDDING_MODEL, "prompt": text},
+            kind="embed",
         )
-        res.raise_for_status()
-        data = res.json()
         return data.get("embedding")
     except Exception:
         return None
 
 
-def _get_example_embedding(example: str) -> list[float] | None:
-    cached = _EXAMPLE_EMBEDS.get(example)
-    if cached:
+def _normalize_query(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _embed_query(text: str) -> list[float] | None:
+    key = (EMBEDDING_MODEL, _normalize_query(text))
+    cached = _QUERY_EMBEDS.get(key)
+    if cached is not None:
         return cached
-    emb = _embed(example)
+    emb = _embed(text)
     if emb:
-        _EXAMPLE_EMBEDS[example] = emb
+        _QUERY_EMBEDS.set(key, emb)
     return emb
 
 
+def query_embedding_cache_stats() -> dict:
+    return _QUERY_EMBEDS.stats()
+
+
+def _embed_batch(texts: list[str]) -> list[list[float]] | None:
+    """
+    Embeds several texts in one /api/embed request. Returns None when the
+    running Ollama has no batch endpoint or the call fails.
+    """
+    global _BATCH_EMBED_SUPPORTED
+    if _BATCH_EMBED_SUPPORTED is False:
+        return None
+    try:
+        embeddings = OLLAMA_ASYNC.embed_sync(texts)
+    except OllamaError as e:
+        # Older Ollama builds only serve /api/embeddings
+        if e.status == 404 and "model" not in e.body.lower():
+            _BATCH_EMBED_SUPPORTED = False
+        return None
+    except Exception:
+        return None
+
+    if not isinstance(embeddings, list) or len(embeddings) != len(texts):
+        return None
+    _BATCH_EMBED_SUPPORTED = True
+    return embeddings
+
+
+def _embed_many(texts: list[str], on_embedded: Callable[[str, list[float]], None]) -> None:
+    """
+    Embeds texts with as few requests as possible, calling on_embedded
+    for each vector as it arrives.
+    """
+    done: set[str] = set()
+
+    # Preferred path: a handful of batched requests
+    for start in range(0, len(texts), EMBED_BATCH_SIZE):
+        batch = texts[start:start + EMBED_BATCH_SIZE]
+        vectors = _embed_batch(batch)
+        if vectors is None:
+            break
+        for text, vec in zip(batch, vectors):
+            if vec:
+                done.add(text)
+                on_embedded(text, vec)
+
+    # Fallback: bounded pool of single-text requests
+    remaining = [text for text in texts if text not in done]
+    if remaining:
+        with ThreadPoolExecutor(max_workers=EMBED_MAX_WORKERS) as pool:
+            futures = {pool.submit(_embed, text): text for text in remaining}
+            for future in as_completed(futures):
+                vec = future.result()
+                if vec:
+                    on_embedded(futures[future], vec)
+
+
+def _catalog_examples() -> list[tuple[str, str]]:
+    return [(entry["tool"], example) for entry in INTENT_CATALOG for example in entry["examples"]]
+
+
+def _report_warmup(done: int, total: int, progress: Callable[[int, int], None] | None) -> None:
+    _WARMUP_STATUS["done"] = done
+    _WARMUP_STATUS["total"] = total
+    if progress:
+        try:
+            progress(done, total)
+        except Exception:
+            pass
+
+
+def _ensure_example_embeddings(texts: list[str], progress: Callable[[int, int], None] | None = None) -> None:
+    # Warm start: reuse embeddings persisted by earlier runs
+    for text, vec in _EXAMPLE_STORE.load(texts).items():
+        _EXAMPLE_EMBEDS.setdefault(text, vec)
+
+    missing = [text for text in dict.fromkeys(texts) if text not in _EXAMPLE_EMBEDS]
+    total = len(set(texts))
+    done = total - len(missing)
+    _report_warmup(done, total, progress)
+    if not missing:
+        return
+
+    def on_embedded(text: str, vec: list[float]) -> None:
+        nonlocal done
+        _EXAMPLE_EMBEDS[text] = vec
+        done += 1
+        _report_warmup(done, total, progress)
+
+    _embed_many(missing, on_embedded)
+
+    if any(text in _EXAMPLE_EMBEDS for text in missing):
+        _EXAMPLE_STORE.save({text: _EXAMPLE_EMBEDS[text] for text in texts if text in _EXAMPLE_EMBEDS})
+
+
+def _get_intent_index(progress: Callable[[int, int], None] | None = None) -> IntentIndex | None:
+    global _INDEX
+    if _INDEX is not None:
+        return _INDEX
+
+    with _INDEX_LOCK:
+        if _INDEX is not None:
+            return _INDEX
+
+        examples = _catalog_examples()
+        _ensure_example_embeddings([example for _, example in examples], progress)
+
+        tools, vectors = [], []
+        for tool, example in examples:
+            emb = _EXAMPLE_EMBEDS.get(example)
+            if emb is not None and len(emb):
+                tools.append(tool)
+                vectors.append(emb)
+        if not vectors:
+            return None
+
+        index = IntentIndex(tools, vectors)
+        # Only keep a complete index; partial ones are rebuilt next time
+        if len(vectors) == len(examples):
+            _INDEX = index
+            _WARMUP_STATUS["state"] = "ready"
+        return index
+
+
+def _load_learned_examples() -> None:
+    _LEARNED.load(_LEARNED_PATH)
+
+
+def _save_learned_examples() -> None:
+    global _LEARNED_UNSAVED
+    if _LEARNED_UNSAVED:
+        _LEARNED_UNSAVED = 0
+        _LEARNED.save(_LEARNED_PATH)
+
+
+# Examples learned since the last periodic save
+atexit.register(_save_learned_examples)
+
+
+def _learn(text: str, tool: str) -> None:
+    global _LEARNED_UNSAVED
+    vec = _embed_query(text)
+    index = _INDEX
+    if not vec or index is None:
+        return
+
+    # The LLM's answer is only trusted when the catalog's nearest example
+    # names the same tool, even if that example scored below the threshold
+    nearest = index.search(vec, k=1)
+    if not nearest or nearest[0]["tool"] != tool:
+        return
+
+    if not _LEARNED.add(text, tool, vec):
+        return
+    _LEARNED_UNSAVED += 1
+    if _LEARNED_UNSAVED >= LEARNED_SAVE_EVERY:
+        _save_learned_examples()
+
+
+def learn_from_execution(text: str, intent: dict) -> None:
+    """
+    Records a successfully executed utterance as a new example for its
+    tool. Only intents the LLM classifier resolved are considered, and
+    only when the embedding stage agrees on the tool: rule matches, cached
+    intents and embedding hits (learned ones included) are never fed back,
+    so a misclassification cannot reinforce itself. Embedding and indexing
+    happen on a background worker.
+    """
+    text = (text or "").strip()
+    tool = intent.get("tool")
+    if not LEARNED_INDEX_ENABLED or not text or not tool or intent.get("source") != "llm":
+        return
+    _LEARN_POOL.submit(_learn, text, tool)
+
+
+def learned_index_stats() -> dict:
+    return {"enabled": LEARNED_INDEX_ENABLED, "examples": len(_LEARNED)}
+
+
+def warm_up_intent_index(progress: Callable[[int, int], None] | None = None) -> bool:
+    """
+    Embeds the whole INTENT_CATALOG ahead of the first command.
+    Returns True once the semantic index is complete.
+    """
+    if _INDEX is None:
+        _WARMUP_STATUS["state"] = "warming"
+    try:
+        _get_intent_index(progress)
+    except Exception:
+        pass
+    if LEARNED_INDEX_ENABLED:
+        try:
+            _load_learned_examples()
+        except Exception:
+            pass
+    if _INDEX is None:
+        _WARMUP_STATUS["state"] = "failed"
+        return False
+    return True
+
+
+def start_intent_warmup() -> threading.Thread | None:
+    """
+    Runs warm_up_intent_index on a daemon thread (once per process).
+    """
+    global _WARMUP_THREAD
+    with _WARMUP_LOCK:
+        if _INDEX is not None or (_WARMUP_THREAD and _WARMUP_THREAD.is_alive()):
+            return _WARMUP_THREAD
+        _WARMUP_THREAD = threading.Thread(target=warm_up_intent_index, name="intent-warmup", daemon=True)
+        _WARMUP_THREAD.start()
+        return _WARMUP_THREAD
+
+
+def intent_warmup_status() -> dict:
+    status = dict(_WARMUP_STATUS)
+    status["ready"] = _INDEX is not None
+    return status
+
+
 def _extract_after_keywords(text: str, keywords: list[str]) -> str | None:
     text_l = text.lower()
     for kw in keywords:
@@ -253,16 +506,6 @@ def _extract_search_query(text: str) -> str | None:
     return _extract_after_keywords(text, ["search for ", "search ", "look up ", "google ", "find "])
 
 
-def _extract_url(text: str) -> str | None:
-    m = re.search(r"(https?://[^\s]+)", text, re.IGNORECASE)
-    if m:
-        return m.group(1)
-    m = re.search(r"\b([a-z0-9\-]+\.)+[a-z]{2,}\b", text, re.IGNORECASE)
-    if m:
-        return m.group(0)
-    return None
-
-
 def _extract_numbers(text: str) -> list[int]:
     return [int(n) for n in re.findall(r"-?\d+", text)]
 
@@ -285,29 +528,6 @@ def _extract_file_path(text: str) -> str | None:
     return _extract_after_keywords(text, ["open file ", "open the file "])
 
 
-def _split_for_app(text: str) -> tuple[str, str | None]:
-    text_l = text.lower()
-    for sep in [" in ", " into "]:
-        if sep in text_l:
-            head, app = text.rsplit(sep, 1)
-            return head.strip(), app.strip()
-    return text, None
-
-
-def _strip_prefix(text: str, prefixes: list[str]) -> str:
-    text_l = text.lower()
-    for p in prefixes:
-        if text_l.startswith(p):
-            return text[len(p):].strip()
-    return text.strip()
-
-
-def _default_screenshot_path() -> str:
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"screenshot_{ts}.png"
-    return str(Path(SCREENSHOT_DIR) / filename)
-
-
 def _extract_whatsapp(text: str) -> dict[str, Any] | None:
     parts = text.split()
     if not parts:
@@ -343,7 +563,7 @@ def _build_intent(tool: str, text: str) -> dict | None:
         return None
 
     if tool == "open_url":
-        url = _extract_url(text)
+        url = extract_url(text)
         if url:
             return {"mode": "tool", "tool": tool, "args": {"url": url}}
         return None
@@ -363,7 +583,7 @@ def _build_intent(tool: str, text: str) -> dict | None:
     if tool == "take_screenshot":
         filename = _extract_after_keywords(text, ["as ", "to "])
         if not filename:
-            filename = _default_screenshot_path()
+            filename = default_screenshot_path()
         return {"mode": "tool", "tool": tool, "args": {"filename": filename}}
 
     if tool == "get_screen_size":
@@ -438,38 +658,38 @@ def _build_intent(tool: str, text: str) -> dict | None:
         return {"mode": "tool", "tool": tool, "args": {"query": query}}
 
     if tool == "summarize_url_to_app":
-        head, app = _split_for_app(text)
+        head, app = split_for_app(text)
         if not app:
             return None
-        url = _extract_url(head)
+        url = extract_url(head)
         if not url:
             return None
         return {"mode": "tool", "tool": tool, "args": {"url": url, "app_name": app}}
 
     if tool == "research_topic_to_app":
-        head, app = _split_for_app(text)
+        head, app = split_for_app(text)
         if not app:
             return None
-        topic = _strip_prefix(head, ["research "])
+        topic = strip_prefix(head, ["research "])
         if not topic:
             return None
         return {"mode": "tool", "tool": tool, "args": {"topic": topic, "app_name": app}}
 
     if tool == "write_report_to_app":
-        head, app = _split_for_app(text)
+        head, app = split_for_app(text)
         if not app:
             return None
-        topic = _strip_prefix(head, ["write report on ", "write a report on ", "write report ", "write a report "])
+        topic = strip_prefix(head, ["write report on ", "write a report on ", "write report ", "write a report "])
         if not topic:
             return None
         return {"mode": "tool", "tool": tool, "args": {"topic": topic, "app_name": app}}
 
     if tool == "gather_topic_to_word":
-        head, app = _split_for_app(text)
+        head, app = split_for_app(text)
         # Only Word is supported for this automation path
         if not app or app.lower() not in {"word", "ms word", "microsoft word"}:
             return None
-        topic = _strip_prefix(head, ["gather ", "collect info on ", "collect "])
+        topic = strip_prefix(head, ["gather ", "collect info on ", "collect "])
         if not topic:
             return None
         return {"mode": "tool", "tool": tool, "args": {"topic": topic}}
@@ -477,96 +697,149 @@ def _build_intent(tool: str, text: str) -> dict | None:
     return None
 
 
-def _heuristic_common_folders(text: str) -> dict | None:
-    text_l = text.lower()
-    folder_names = ["documents", "document", "docs", "downloads", "desktop", "pictures", "photos", "videos", "music"]
-    verbs = ["open", "show", "show me", "go to", "take me to", "launch", "start"]
-    if any(v in text_l for v in verbs):
-        for name in folder_names:
-            if name in text_l:
-                return {
-                    "mode": "tool",
-                    "tool": "open_folder_by_name",
-                    "args": {"folder_name": name},
-                }
-    return None
-
-
-def _heuristic_simple_tools(text: str) -> dict | None:
-    text_l = text.lower()
-    if "screenshot" in text_l or "screen shot" in text_l or "capture screen" in text_l:
-        return {"mode": "tool", "tool": "take_screenshot", "args": {"filename": _default_screenshot_path()}}
-    if "screen size" in text_l or "screen resolution" in text_l:
-        return {"mode": "tool", "tool": "get_screen_size", "args": {}}
-    return None
-
+def classify_intent_embedding(text: str) -> dict | None:
+    query_vec = _embed_query(text)
+    if not query_vec:
+        return None
 
-def _heuristic_report_tools(text: str) -> dict | None:
-    text_l = text.lower()
-    if " in " not in text_l:
+    matches = []
+    index = _get_intent_index()
+    if index is not None:
+        matches += [{**m, "source": "embedding"} for m in index.search(query_vec, k=1)]
+    if LEARNED_INDEX_ENABLED:
+        matches += [{**m, "source": "learned"} for m in _LEARNED.search(query_vec, k=1)]
+    if not matches:
         return None
 
-    if text_l.startswith("summarize"):
-        url = _extract_url(text)
-        head, app = _split_for_app(text)
-        if url and app:
-            return {
-                "mode": "tool",
-                "tool": "summarize_url_to_app",
-                "args": {"url": url, "app_name": app},
-            }
-
-    if text_l.startswith("research "):
-        head, app = _split_for_app(text)
-        if app:
-            topic = _strip_prefix(head, ["research "])
-            if topic:
-                return {
-                    "mode": "tool",
-                    "tool": "research_topic_to_app",
-                    "args": {"topic": topic, "app_name": app},
-                }
-
-    if text_l.startswith("write report") or text_l.startswith("write a report"):
-        head, app = _split_for_app(text)
-        if app:
-            topic = _strip_prefix(head, ["write report on ", "write a report on ", "write report ", "write a report "])
-            if topic:
-                return {
-                    "mode": "tool",
-                    "tool": "write_report_to_app",
-                    "args": {"topic": topic, "app_name": app},
-                }
+    best = max(matches, key=lambda m: m["score"])
+    if best["score"] < INTENT_SIM_THRESHOLD:
+        return None
 
-    return None
+    intent = _build_intent(best["tool"], text)
+    if intent:
+        intent["source"] = best["source"]
+    return intent
+
+
+class _JsonObjectScanner:
+    """
+    Finds the first complete top-level {...} object in streamed text,
+    tracking string literals and escapes so braces inside strings are ignored.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self._pos = 0
+        self._start = -1
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk: str) -> Any:
+        self.buffer += chunk
+        while self._pos < len(self.buffer):
+            ch = self.buffer[self._pos]
+            self._pos += 1
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                if self._depth:
+                    self._in_string = True
+            elif ch == "{":
+                if self._depth == 0:
+                    self._start = self._pos - 1
+                self._depth += 1
+            elif ch == "}" and self._depth:
+                self._depth -= 1
+                if self._depth == 0:
+                    try:
+                        return json.loads(self.buffer[self._start:self._pos])
+                    except ValueError:
+                        # Not valid JSON; keep looking for a later object
+                        self._start = -1
+        return None
 
 
-def classify_intent_embedding(text: str) -> dict | None:
-    query_vec = _embed(text)
-    if not query_vec:
+def _record_llm_metric(name: str, value: float | None) -> None:
+    if value is None:
+        return
+    with _LLM_METRICS_LOCK:
+        _LLM_METRICS[name] = value
+        _LLM_METRICS[f"{name}_total"] = _LLM_METRICS.get(f"{name}_total", 0.0) + value
+        _LLM_METRICS[f"{name}_count"] = _LLM_METRICS.get(f"{name}_count", 0) + 1
+
+
+def intent_llm_metrics() -> dict:
+    """
+    Last and mean time-to-first-token / time-to-valid-JSON (seconds) for
+    classify_intent_llm, plus how many requests were closed early.
+    """
+    with _LLM_METRICS_LOCK:
+        metrics = dict(_LLM_METRICS)
+    for name in ("ttft", "ttvj"):
+        count = metrics.pop(f"{name}_count", 0)
+        total = metrics.pop(f"{name}_total", 0.0)
+        metrics[f"{name}_mean"] = total / count if count else None
+    return metrics
+
+
+def _stream_llm_json(prompt: str, cancel: threading.Event | None = None) -> Any:
+    """
+    Streams the classifier completion and returns the first valid JSON
+    object, closing the request as soon as it is complete.
+    """
+    started = time.monotonic()
+    ttft = None
+    scanner = _JsonObjectScanner()
+    try:
+        chunks = OLLAMA_ASYNC.stream_sync(
+            "/api/generate",
+            {
+                "model": OLLAMA_MODEL,
+                "prompt": prompt,
+                "options": {"temperature": 0, "num_predict": 120},
+            },
+            kind="classify",
+        )
+        # Closing the stream drops the connection, which stops generation
+        with closing(chunks):
+            for chunk in chunks:
+                if cancel is not None and cancel.is_set():
+                    return None
+                token = chunk.get("response", "")
+                if token and ttft is None:
+                    ttft = time.monotonic() - started
+                    _record_llm_metric("ttft", ttft)
+                data = scanner.feed(token)
+                if data is not None:
+                    _record_llm_metric("ttvj", time.monotonic() - started)
+                    if not chunk.get("done"):
+                        with _LLM_METRICS_LOCK:
+                            _LLM_METRICS["early_closes"] = _LLM_METRICS.get("early_closes", 0) + 1
+                    return data
+                if chunk.get("done"):
+                    break
+    except Exception:
         return None
 
-    best_tool = None
-    best_score = 0.0
-
-    for entry in INTENT_CATALOG:
-        tool = entry["tool"]
-        for example in entry["examples"]:
-            ex_vec = _get_example_embedding(example)
-            if not ex_vec:
-                continue
-            score = _cosine(query_vec, ex_vec)
-            if score > best_score:
-                best_score = score
-                best_tool = tool
-
-    if not best_tool or best_score < INTENT_SIM_THRESHOLD:
+    # Same leniency as before: widest {...} span in the full completion
+    match = re.search(r"\{.*\}", scanner.buffer, re.DOTALL)
+    if not match:
         return None
-
-    return _build_intent(best_tool, text)
+    try:
+        data = json.loads(match.group(0))
+    except ValueError:
+        return None
+    _record_llm_metric("ttvj", time.monotonic() - started)
+    return data
 
 
-def classify_intent_llm(text: str) -> dict | None:
+def classify_intent_llm(text: str, cancel: threading.Event | None = None) -> dict | None:
     prompt = (
         "You are an intent classifier. "
         "Return ONLY a JSON object with keys: mode, tool, args. "
@@ -583,26 +856,7 @@ def classify_intent_llm(text: str) -> dict | None:
         "JSON:"
     )
 
-    try:
-        res = requests.post(
-            f"{OLLAMA_HOST}/api/generate",
-            json={
-                "model": OLLAMA_MODEL,
-                "prompt": prompt,
-                "stream": False,
-                "options": {"temperature": 0, "num_predict": 120},
-            },
-            timeout=30,
-        )
-        res.raise_for_status()
-        raw = res.json().get("response", "").strip()
-        match = re.search(r"\{.*\}", raw, re.DOTALL)
-        if not match:
-            return None
-        data = json.loads(match.group(0))
-    except Exception:
-        return None
-
+    data = _stream_llm_json(prompt, cancel)
     if not isinstance(data, dict):
         return None
 
@@ -615,7 +869,7 @@ def classify_intent_llm(text: str) -> dict | None:
         return None
 
     if tool == "take_screenshot" and not args.get("filename"):
-        args["filename"] = _default_screenshot_path()
+        args["filename"] = default_screenshot_path()
 
     if tool == "wait" and "seconds" in args:
         try:
@@ -623,21 +877,78 @@ def classify_intent_llm(text: str) -> dict | None:
         except Exception:
             return None
 
-    return {"mode": "tool", "tool": tool, "args": args}
+    return {"mode": "tool", "tool": tool, "args": args, "source": "llm"}
 
 
-def classify_intent_hybrid(text: str) -> dict | None:
-    heur = _heuristic_common_folders(text)
-    if heur:
-        return heur
-    heur = _heuristic_simple_tools(text)
-    if heur:
-        return heur
-    heur = _heuristic_report_tools(text)
-    if heur:
-        return heur
+def _classify_speculative(text: str, budget: float) -> dict | None:
+    deadline = time.monotonic() + budget
+    embedding = _SPECULATIVE_POOL.submit(classify_intent_embedding, text)
 
+    # Hedge: a confident embedding answer within the delay (usually a few
+    # ms) means the LLM is never called, and an unsure one hands over to it.
+    # Only a slow embedding stage has both running at once.
+    done, pending = wait([embedding], timeout=min(INTENT_LLM_HEDGE_DELAY, budget))
+    if done:
+        try:
+            intent = embedding.result()
+        except Exception:
+            intent = None
+        if intent:
+            return intent
+
+    cancel = threading.Event()
+    pending.add(_SPECULATIVE_POOL.submit(classify_intent_llm, text, cancel))
+
+    while pending:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+        for future in done:
+            try:
+                intent = future.result()
+            except Exception:
+                intent = None
+            if intent:
+                # Not yet started -> dropped; a streaming LLM call stops at
+                # its next token
+                cancel.set()
+                for other in pending:
+                    other.cancel()
+                return intent
+
+    cancel.set()
+    for future in pending:
+        future.cancel()
+    return None
+
+
+def classify_intent_hybrid(text: str, speculative: bool | None = None, budget: float | None = None) -> dict | None:
+    """
+    Keyword rules (llm.intent_rules) first, then the semantic stages:
+    embedding similarity and LLM classification.
+
+    In speculative mode the embedding stage gets INTENT_LLM_HEDGE_DELAY to
+    answer alone; if it is still running then, the LLM starts alongside and
+    the first confident answer wins. Either way, None after the latency
+    budget means the caller falls back to chat.
+    """
+    intent = match_rule_intent(text)
+    if intent:
+        return intent
+
+    if speculative is None:
+        speculative = INTENT_SPECULATIVE
+    if budget is None:
+        budget = INTENT_LATENCY_BUDGET
+
+    if speculative:
+        return _classify_speculative(text, budget)
+
+    deadline = time.monotonic() + budget
     intent = classify_intent_embedding(text)
     if intent:
         return intent
+    if time.monotonic() >= deadline:
+        return None
     return classify_intent_llm(text)
@@ -0,0 +1,75 @@
+import numpy as np
+
+
+class IntentIndex:
+    """
+    Catalog example embeddings packed into one L2-normalised float32 matrix.
+
+    Rows are grouped by tool, so scoring a query is a single matrix-vector
+    product followed by a segmented max that yields the best example score
+    for every tool.
+    """
+
+    def __init__(self, tools: list[str], vectors: list[list[float]]):
+        if len(tools) != len(vectors):
+            raise ValueError("tools and vectors must have the same length")
+
+        # Group rows by tool, keeping the order tools first appear in
+        groups: dict[str, list[int]] = {}
+        for i, tool in enumerate(tools):
+            groups.setdefault(tool, []).append(i)
+
+        order = [i for rows in groups.values() for i in rows]
+        matrix = np.asarray(vectors, dtype=np.float32).reshape(len(tools), -1)[order]
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+
+        self._matrix = np.ascontiguousarray(matrix / norms, dtype=np.float32)
+        self._tools = list(groups.keys())
+        self._offsets = np.cumsum([0] + [len(rows) for rows in groups.values()][:-1])
+
+    def __len__(self) -> int:
+        return self._matrix.shape[0]
+
+    @property
+    def dim(self) -> int:
+        return self._matrix.shape[1]
+
+    @property
+    def tools(self) -> list[str]:
+        return list(self._tools)
+
+    def search(self, query_vec: list[float], k: int = 3) -> list[dict]:
+        """
+        Returns up to k tools ranked by their best cosine similarity.
+        Each entry's margin is its lead over the next ranked tool (or over
+        zero similarity when no other tool is indexed).
+        """
+        if len(self) == 0 or k <= 0:
+            return []
+
+        q = np.asarray(query_vec, dtype=np.float32).ravel()
+        if q.shape[0] != self.dim:
+            return []
+        norm = float(np.linalg.norm(q))
+        if norm == 0:
+            return []
+
+        scores = self._matrix @ (q / norm)
+        per_tool = np.maximum.reduceat(scores, self._offsets)
+
+        # One extra candidate so the k-th result also gets a real margin
+        n = min(k + 1, per_tool.shape[0])
+        if n < per_tool.shape[0]:
+            top = np.argpartition(-per_tool, n - 1)[:n]
+        else:
+            top = np.arange(per_tool.shape[0])
+        top = top[np.argsort(-per_tool[top], kind="stable")]
+
+        ranked = [(self._tools[i], float(per_tool[i])) for i in top]
+        results = []
+        for pos, (tool, score) in enumerate(ranked[:k]):
+            runner_up = ranked[pos + 1][1] if pos + 1 < len(ranked) else 0.0
+            results.append({"tool": tool, "score": score, "margin": score - runner_up})
+        return results
@@ -0,0 +1,133 @@
+import re
+
+from llm.intent_text import default_screenshot_path, extract_url, split_for_app, strip_prefix
+from llm.rule_matcher import RuleMatcher
+
+URL_REGEX = re.compile(r"(https?://[^\s]+)", re.IGNORECASE)
+
+FOLDER_NAMES = ["documents", "document", "docs", "downloads", "desktop", "pictures", "photos", "videos", "music"]
+FOLDER_VERBS = ["open", "show", "show me", "go to", "take me to", "launch", "start"]
+REPORT_PREFIXES = ["write report on ", "write a report on ", "write report ", "write a report "]
+
+
+def _tool(tool: str, **args) -> dict:
+    return {"mode": "tool", "tool": tool, "args": args, "source": "rule"}
+
+
+# -----------------------------
+# Extractors: fn(text, text_l, hits) -> intent | None
+# -----------------------------
+def _open_folder_explicit(text, text_l, hits):
+    return _tool("open_folder_by_name", folder_name=text[11:].strip())
+
+
+def _open_app(text, text_l, hits):
+    # Safety: do NOT auto-convert app to folder
+    return _tool("open_app", app_name=text[5:].strip())
+
+
+def _youtube(text, text_l, hits):
+    query = (
+        text_l.replace("search", "")
+        .replace("play", "")
+        .replace("on youtube", "")
+        .replace("youtube", "")
+        .strip()
+    )
+    return _tool("play_youtube_video", topic=query)
+
+
+def _search_web(text, text_l, hits):
+    return _tool("search_web", query=text[7:].strip())
+
+
+def _open_url_explicit(text, text_l, hits):
+    return _tool("open_url", url=text[8:].strip())
+
+
+def _open_url_raw(text, text_l, hits):
+    m = URL_REGEX.search(text)
+    return _tool("open_url", url=m.group(1)) if m else None
+
+
+def _send_whatsapp(text, text_l, hits):
+    parts = text[13:].strip().split(" ", 1)
+    return _tool(
+        "send_whatsapp",
+        recipient=parts[0],
+        message=parts[1] if len(parts) > 1 else "",
+    )
+
+
+def _common_folder(text, text_l, hits):
+    for name in FOLDER_NAMES:
+        if name in hits:
+            return _tool("open_folder_by_name", folder_name=name)
+    return None
+
+
+def _screenshot(text, text_l, hits):
+    return _tool("take_screenshot", filename=default_screenshot_path())
+
+
+def _screen_size(text, text_l, hits):
+    return _tool("get_screen_size")
+
+
+def _summarize_url(text, text_l, hits):
+    url = extract_url(text)
+    _, app = split_for_app(text)
+    if url and app:
+        return _tool("summarize_url_to_app", url=url, app_name=app)
+    return None
+
+
+def _research(text, text_l, hits):
+    head, app = split_for_app(text)
+    if app:
+        topic = strip_prefix(head, ["research "])
+        if topic:
+            return _tool("research_topic_to_app", topic=topic, app_name=app)
+    return None
+
+
+def _write_report(text, text_l, hits):
+    head, app = split_for_app(text)
+    if app:
+        topic = strip_prefix(head, REPORT_PREFIXES)
+        if topic:
+            return _tool("write_report_to_app", topic=topic, app_name=app)
+    return None
+
+
+# -----------------------------
+# Rules, highest priority first
+# -----------------------------
+INTENT_RULES = [
+    # Explicit command forms
+    {"name": "open_folder", "prefix": ["open folder"], "extract": _open_folder_explicit},
+    {"name": "open_app", "prefix": ["open "], "extract": _open_app},
+    {"name": "youtube", "contains": [["youtube"], ["search", "play"]], "extract": _youtube},
+    {"name": "search_web", "prefix": ["search "], "extract": _search_web},
+    {"name": "open_url", "prefix": ["open url"], "extract": _open_url_explicit},
+    {"name": "raw_url", "contains": [["http://", "https://"]], "extract": _open_url_raw},
+    {"name": "send_whatsapp", "prefix": ["send whatsapp"], "extract": _send_whatsapp},
+
+    # Heuristics for common phrasings
+    {"name": "common_folder", "contains": [FOLDER_VERBS, FOLDER_NAMES], "extract": _common_folder},
+    {"name": "screenshot", "contains": [["screenshot", "screen shot", "capture screen"]], "extract": _screenshot},
+    {"name": "screen_size", "contains": [["screen size", "screen resolution"]], "extract": _screen_size},
+    {"name": "summarize_url", "prefix": ["summarize"], "contains": [[" in "]], "extract": _summarize_url},
+    {"name": "research", "prefix": ["research "], "contains": [[" in "]], "extract": _research},
+    {"name": "write_report", "prefix": ["write report", "write a report"], "contains": [[" in "]], "extract": _write_report},
+]
+
+RULE_MATCHER = RuleMatcher(INTENT_RULES)
+
+
+def match_rule_intent(text: str) -> dict | None:
+    match = RULE_MATCHER.match(text)
+    if not match:
+        return None
+    _, intent = match
+    return intent
@@ -0,0 +1,42 @@
+import re
+from datetime import datetime
+from pathlib import Path
+
+from config import SCREENSHOT_DIR
+
+# -----------------------------
+# Argument helpers shared by the rule extractors and the classifiers
+# -----------------------------
+
+
+def extract_url(text: str) -> str | None:
+    m = re.search(r"(https?://[^\s]+)", text, re.IGNORECASE)
+    if m:
+        return m.group(1)
+    m = re.search(r"\b([a-z0-9\-]+\.)+[a-z]{2,}\b", text, re.IGNORECASE)
+    if m:
+        return m.group(0)
+    return None
+
+
+def split_for_app(text: str) -> tuple[str, str | None]:
+    text_l = text.lower()
+    for sep in [" in ", " into "]:
+        if sep in text_l:
+            head, app = text.rsplit(sep, 1)
+            return head.strip(), app.strip()
+    return text, None
+
+
+def strip_prefix(text: str, prefixes: list[str]) -> str:
+    text_l = text.lower()
+    for p in prefixes:
+        if text_l.startswith(p):
+            return text[len(p):].strip()
+    return text.strip()
+
+
+def default_screenshot_path() -> str:
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"screenshot_{ts}.png"
+    return str(Path(SCREENSHOT_DIR) / filename)
@@ -0,0 +1,389 @@
+import asyncio
+import json
+import queue
+import threading
+from concurrent.futures import Future
+from typing import AsyncIterator, Iterator
+
+import httpx
+
+from config import (
+    OLLAMA_MODEL,
+    OLLAMA_HOST,
+    EMBEDDING_MODEL,
+    OLLAMA_POOL_SIZE,
+    OLLAMA_CONNECT_TIMEOUT,
+    OLLAMA_TIMEOUTS,
+    OLLAMA_MODEL_SLOTS,
+    OLLAMA_KEEP_ALIVE,
+    OLLAMA_PRIORITY_CLASSES,
+    OLLAMA_QUEUE_LIMITS,
+    OLLAMA_BACKGROUND_SLOTS,
+    OLLAMA_AGING_SECONDS,
+)
+from llm.ollama_scheduler import PriorityScheduler, QueueFull
+
+# Scheduling classes, most urgent first
+_CLASSES = ["interactive", "chat", "background"]
+
+
+class OllamaError(Exception):
+    def __init__(self, status: int, body: str):
+        super().__init__(f"Ollama returned HTTP {status}: {body[:200]}")
+        self.status = status
+        self.body = body
+
+
+class AsyncOllama:
+    """
+    asyncio client for the Ollama API, owned by one background event loop.
+    It is the only HTTP client that talks to Ollama: every caller shares
+    its pool of at most `max_connections` keep-alive connections.
+
+    - Generations (classify, chat, generate, background) take one of
+      OLLAMA_MODEL_SLOTS slots from a PriorityScheduler, so extra requests
+      wait here, most urgent first, instead of in Ollama's FIFO queue.
+      Embeddings run on their own model and are not slotted.
+    - Identical non-streaming requests in flight at the same time share a
+      single upstream call.
+    - Coroutines awaited from another event loop (e.g. FastAPI's) are
+      forwarded to the client loop; *_sync wrappers serve plain threads.
+    - Each call names its kind (generate, classify, embed, health, ...);
+      the read timeout comes from `timeouts` for that kind.
+
+    Requests carry OLLAMA_KEEP_ALIVE unless they set their own, so
+    ordinary traffic does not shorten how long models stay loaded.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        connect_timeout: float,
+        timeouts: dict[str, float],
+        slots: int,
+        max_connections: int,
+        scheduler: PriorityScheduler,
+    ):
+        self.host = host.rstrip("/")
+        self.connect_timeout = connect_timeout
+        self.timeouts = dict(timeouts)
+        self.slots = slots
+        self.max_connections = max_connections
+        self.scheduler = scheduler
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._client: httpx.AsyncClient | None = None
+        self._inflight: dict[tuple, asyncio.Future] = {}
+        self._start_lock = threading.Lock()
+        self._stats = {
+            "requests": 0,
+            "upstream": 0,
+            "coalesced": 0,
+            "connections_opened": 0,
+            "rejected": 0,
+            "errors": 0,
+        }
+        self._calls: dict[str, int] = {}
+
+    # -----------------------------
+    # Event loop
+    # -----------------------------
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+
+                def run():
+                    asyncio.set_event_loop(loop)
+                    self._client = httpx.AsyncClient(
+                        limits=httpx.Limits(
+                            max_connections=self.max_connections,
+                            max_keepalive_connections=self.max_connections,
+                        ),
+                    )
+                    ready.set()
+                    loop.run_forever()
+
+                self._thread = threading.Thread(target=run, name="ollama-async", daemon=True)
+                self._thread.start()
+                ready.wait()
+                self._loop = loop
+        return self._loop
+
+    def _submit(self, coro) -> Future:
+        loop = self._ensure_loop()
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("Blocking Ollama call made from the client's own event loop")
+        return asyncio.run_coroutine_threadsafe(coro, loop)
+
+    async def _on_loop(self, coro):
+        # Runs coro on the client loop, whichever loop awaits it
+        loop = self._ensure_loop()
+        if asyncio.get_running_loop() is loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+    # -----------------------------
+    # Requests
+    # -----------------------------
+    def timeout(self, kind: str) -> tuple[float, float]:
+        read = self.timeouts.get(kind, self.timeouts["default"])
+        return (min(self.connect_timeout, read), read)
+
+    def _timeout(self, kind: str) -> httpx.Timeout:
+        connect, read = self.timeout(kind)
+        return httpx.Timeout(read, connect=connect)
+
+    def _upstream(self, kind: str):
+        self._stats["upstream"] += 1
+        self._calls[kind] = self._calls.get(kind, 0) + 1
+
+    async def _trace(self, event: str, info: dict):
+        if event == "connection.connect_tcp.complete":
+            self._stats["connections_opened"] += 1
+
+    async def _slot(self, kind: str) -> str | None:
+        klass = OLLAMA_PRIORITY_CLASSES.get(kind)
+        if klass is None:
+            return None
+        try:
+            await self.scheduler.acquire(klass)
+        except QueueFull as e:
+            self._stats["rejected"] += 1
+            raise OllamaError(503, str(e))
+        return klass
+
+    def _release(self, klass: str | None):
+        if klass is not None:
+            self.scheduler.release(klass)
+
+    async def _send(self, path: str, payload: dict, kind: str) -> dict:
+        slot = await self._slot(kind)
+        try:
+            self._upstream(kind)
+            res = await self._client.post(
+                f"{self.host}{path}",
+                json={"keep_alive": OLLAMA_KEEP_ALIVE, **payload},
+                timeout=self._timeout(kind),
+                extensions={"trace": self._trace},
+            )
+        except Exception:
+            self._stats["errors"] += 1
+            raise
+        finally:
+            self._release(slot)
+
+        if res.status_code >= 400:
+            self._stats["errors"] += 1
+            raise OllamaError(res.status_code, res.text)
+        return res.json()
+
+    async def _post(self, path: str, payload: dict, kind: str) -> dict:
+        self._stats["requests"] += 1
+        key = (path, json.dumps(payload, sort_keys=True))
+        shared = self._inflight.get(key)
+        if shared is not None:
+            self._stats["coalesced"] += 1
+            return await asyncio.shield(shared)
+
+        task = asyncio.ensure_future(self._send(path, payload, kind))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded so one caller giving up does not cancel the others
+        return await asyncio.shield(task)
+
+    async def _get(self, path: str, kind: str) -> httpx.Response:
+        self._stats["requests"] += 1
+        self._upstream(kind)
+        try:
+            return await self._client.get(
+                f"{self.host}{path}",
+                timeout=self._timeout(kind),
+                extensions={"trace": self._trace},
+            )
+        except Exception:
+            self._stats["errors"] += 1
+            raise
+
+    async def get(self, path: str, kind: str) -> httpx.Response:
+        """
+        GETs from Ollama without taking a slot (health probes) and returns
+        the response; callers check the status themselves.
+        """
+        return await self._on_loop(self._get(path, kind))
+
+    async def post(self, path: str, payload: dict, kind: str) -> dict:
+        """
+        POSTs to Ollama and returns the decoded JSON body. Raises
+        OllamaError on HTTP errors and httpx errors on transport failures.
+        """
+        return await self._on_loop(self._post(path, payload, kind))
+
+    async def _stream(self, path: str, payload: dict, kind: str) -> AsyncIterator[dict]:
+        self._stats["requests"] += 1
+        slot = await self._slot(kind)
+        try:
+            self._upstream(kind)
+            async with self._client.stream(
+                "POST",
+                f"{self.host}{path}",
+                json={"keep_alive": OLLAMA_KEEP_ALIVE, **payload, "stream": True},
+                timeout=self._timeout(kind),
+                extensions={"trace": self._trace},
+            ) as res:
+                if res.status_code >= 400:
+                    body = (await res.aread()).decode("utf-8", "replace")
+                    self._stats["errors"] += 1
+                    raise OllamaError(res.status_code, body)
+                async for line in res.aiter_lines():
+                    if line.strip():
+                        yield json.loads(line)
+        finally:
+            # Leaving the block early closes the connection, which stops
+            # the generation upstream
+            self._release(slot)
+
+    # -----------------------------
+    # API
+    # -----------------------------
+    async def generate(self, prompt: str, model: str | None = None, options: dict | None = None, kind: str = "generate") -> dict:
+        payload = {"model": model or OLLAMA_MODEL, "prompt": prompt, "stream": False}
+        if options:
+            payload["options"] = options
+        return await self.post("/api/generate", payload, kind)
+
+    async def chat(self, messages: list[dict], model: str | None = None, options: dict | None = None) -> dict:
+        payload = {"model": model or OLLAMA_MODEL, "messages": messages, "stream": False}
+        if options:
+            payload["options"] = options
+        return await self.post("/api/chat", payload, "chat")
+
+    async def embed(self, texts: list[str], model: str | None = None) -> list[list[float]]:
+        data = await self.post("/api/embed", {"model": model or EMBEDDING_MODEL, "input": texts}, "embed_batch")
+        return data.get("embeddings") or []
+
+    # -----------------------------
+    # Sync wrappers
+    # -----------------------------
+    def get_sync(self, path: str, kind: str) -> httpx.Response:
+        return self._submit(self._get(path, kind)).result()
+
+    def post_sync(self, path: str, payload: dict, kind: str) -> dict:
+        return self._submit(self._post(path, payload, kind)).result()
+
+    def generate_sync(self, prompt: str, model: str | None = None, options: dict | None = None, kind: str = "generate") -> dict:
+        return self._submit(self.generate(prompt, model, options, kind)).result()
+
+    def chat_sync(self, messages: list[dict], model: str | None = None, options: dict | None = None) -> dict:
+        return self._submit(self.chat(messages, model, options)).result()
+
+    def embed_sync(self, texts: list[str], model: str | None = None) -> list[list[float]]:
+        return self._submit(self.embed(texts, model)).result()
+
+    async def stream(self, path: str, payload: dict, kind: str) -> AsyncIterator[dict]:
+        """
+        Yields streamed chunks to a coroutine on any event loop. Closing
+        the iterator early cancels the upstream request.
+        """
+        loop = self._ensure_loop()
+        caller = asyncio.get_running_loop()
+        if caller is loop:
+            async for chunk in self._stream(path, payload, kind):
+                yield chunk
+            return
+
+        chunks: asyncio.Queue = asyncio.Queue()
+        end = object()
+
+        def put(item):
+            try:
+                caller.call_soon_threadsafe(chunks.put_nowait, item)
+            except RuntimeError:
+                # The caller's loop closed after it stopped listening
+                pass
+
+        async def pump():
+            try:
+                async for chunk in self._stream(path, payload, kind):
+                    put(chunk)
+            except Exception as e:
+                put(e)
+            finally:
+                put(end)
+
+        future = asyncio.run_coroutine_threadsafe(pump(), loop)
+        try:
+            while True:
+                item = await chunks.get()
+                if item is end:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            future.cancel()
+
+    def stream_sync(self, path: str, payload: dict, kind: str) -> Iterator[dict]:
+        """
+        Yields streamed chunks in the calling thread. Closing the iterator
+        early cancels the upstream request.
+        """
+        chunks: queue.Queue = queue.Queue()
+        end = object()
+
+        async def pump():
+            try:
+                async for chunk in self._stream(path, payload, kind):
+                    chunks.put(chunk)
+            except Exception as e:
+                chunks.put(e)
+            finally:
+                chunks.put(end)
+
+        future = self._submit(pump())
+        try:
+            while True:
+                item = chunks.get()
+                if item is end:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            future.cancel()
+
+    def stats(self) -> dict:
+        stats = dict(self._stats)
+        stats["host"] = self.host
+        stats["pool_size"] = self.max_connections
+        stats["slots"] = self.slots
+        stats["inflight"] = len(self._inflight)
+        stats["calls"] = dict(self._calls)
+        stats["scheduler"] = self.scheduler.stats()
+        upstream = stats["upstream"]
+        reused = max(0, upstream - stats["connections_opened"])
+        stats["connections_reused"] = reused
+        stats["reuse_rate"] = reused / upstream if upstream else None
+        return stats
+
+
+OLLAMA_ASYNC = AsyncOllama(
+    OLLAMA_HOST,
+    OLLAMA_CONNECT_TIMEOUT,
+    OLLAMA_TIMEOUTS,
+    OLLAMA_MODEL_SLOTS,
+    OLLAMA_POOL_SIZE,
+    PriorityScheduler(
+        OLLAMA_MODEL_SLOTS,
+        _CLASSES,
+        OLLAMA_QUEUE_LIMITS,
+        {"background": OLLAMA_BACKGROUND_SLOTS},
+        OLLAMA_AGING_SECONDS,
+    ),
+)
+
+
+def ollama_async_stats() -> dict:
+    return OLLAMA_ASYNC.stats()
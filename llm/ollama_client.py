@@ -1,22 +1,209 @@
-import requests
-from config import OLLAMA_HOST, OLLAMA_MODEL
-
-def call_ollama(prompt: str) -> str:
-    url = f"{OLLAMA_HOST}/api/generate"
-
-    payload = {
-        "model": OLLAMA_MODEL,
-        "prompt": prompt,
-        "stream": False
-    }
-
-    response = requests.post(
-        url,
-        json=payload,
-        timeout=120
+import threading
+import time
+from contextlib import aclosing, closing
+from typing import AsyncIterator, Generator, Iterator
+
+from config import OLLAMA_MODEL, LLM_CACHE_ENABLED
+from llm.completion_cache import LLM_CACHE, completion_key
+from llm.ollama_async import OLLAMA_ASYNC
+
+_STREAM_METRICS = {"streams": 0, "errors": 0, "ttft_count": 0, "ttft_total": 0.0, "ttft_last": None}
+_STREAM_METRICS_LOCK = threading.Lock()
+
+def call_ollama(prompt: str, use_cache: bool = False, kind: str = "generate") -> str:
+    """
+    With use_cache, an identical earlier completion (same model and
+    prompt) is returned from the completion cache instead of generating.
+    kind="background" queues the call behind interactive and chat work.
+    """
+    key = completion_key(OLLAMA_MODEL, prompt) if LLM_CACHE_ENABLED and use_cache else None
+    if key:
+        cached = LLM_CACHE.get(key)
+        if cached is not None:
+            return cached
+
+    # Waits for a model slot; identical concurrent prompts share one call
+    data = OLLAMA_ASYNC.generate_sync(prompt, kind=kind)
+    response = data.get("response", "")
+
+    if key:
+        LLM_CACHE.set(key, response, OLLAMA_MODEL)
+    return response
+
+async def call_ollama_async(prompt: str, use_cache: bool = False, kind: str = "generate") -> str:
+    """
+    call_ollama for coroutines: awaits the generation without holding a
+    thread.
+    """
+    key = completion_key(OLLAMA_MODEL, prompt) if LLM_CACHE_ENABLED and use_cache else None
+    if key:
+        cached = LLM_CACHE.get(key)
+        if cached is not None:
+            return cached
+
+    data = await OLLAMA_ASYNC.generate(prompt, kind=kind)
+    response = data.get("response", "")
+
+    if key:
+        LLM_CACHE.set(key, response, OLLAMA_MODEL)
+    return response
+
+def stream_ollama(prompt: str, use_cache: bool = False) -> Iterator[str]:
+    """
+    Yields the completion token by token. Closing the generator early
+    stops the generation upstream. With use_cache, a cached completion is
+    yielded whole, and a fresh one is cached once it finishes.
+    """
+    key = completion_key(OLLAMA_MODEL, prompt) if LLM_CACHE_ENABLED and use_cache else None
+    if key:
+        cached = LLM_CACHE.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+    final = yield from _stream_tokens(
+        "/api/generate",
+        {"model": OLLAMA_MODEL, "prompt": prompt},
+        "generate",
+        lambda chunk: chunk.get("response", ""),
     )
+    # Only complete answers are cached
+    if key and final.get("done"):
+        LLM_CACHE.set(key, final["content"], OLLAMA_MODEL)
+
+async def stream_ollama_async(prompt: str, use_cache: bool = False) -> AsyncIterator[str]:
+    """
+    stream_ollama for coroutines.
+    """
+    key = completion_key(OLLAMA_MODEL, prompt) if LLM_CACHE_ENABLED and use_cache else None
+    if key:
+        cached = LLM_CACHE.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+    final = {}
+    async for token in _stream_tokens_async(
+        "/api/generate",
+        {"model": OLLAMA_MODEL, "prompt": prompt},
+        "generate",
+        lambda chunk: chunk.get("response", ""),
+        final,
+    ):
+        yield token
+    if key and final.get("done"):
+        LLM_CACHE.set(key, final["content"], OLLAMA_MODEL)
+
+def _chat_payload(messages: list[dict], options: dict | None) -> dict:
+    payload = {"model": OLLAMA_MODEL, "messages": messages}
+    if options:
+        payload["options"] = options
+    return payload
+
+def stream_ollama_chat(messages: list[dict], options: dict | None = None) -> Generator[str, None, dict]:
+    """
+    Streams an /api/chat reply token by token. The generator's return
+    value is the final chunk (token counts) with the full reply under
+    "content".
+    """
+    return (yield from _stream_tokens(
+        "/api/chat",
+        _chat_payload(messages, options),
+        "chat",
+        lambda chunk: (chunk.get("message") or {}).get("content", ""),
+    ))
+
+async def stream_ollama_chat_async(messages: list[dict], final: dict, options: dict | None = None) -> AsyncIterator[str]:
+    """
+    stream_ollama_chat for coroutines. Async generators cannot return a
+    value, so the final chunk is written into `final` once the reply ends.
+    """
+    async for token in _stream_tokens_async(
+        "/api/chat",
+        _chat_payload(messages, options),
+        "chat",
+        lambda chunk: (chunk.get("message") or {}).get("content", ""),
+        final,
+    ):
+        yield token
+
+class _TokenStream:
+    """
+    Collects the tokens of one streamed reply and records its metrics.
+    """
+
+    def __init__(self, token_of):
+        self.token_of = token_of
+        self.started = time.monotonic()
+        self.tokens = []
+        self.final = {"done": False}
+        with _STREAM_METRICS_LOCK:
+            _STREAM_METRICS["streams"] += 1
+
+    def add(self, chunk: dict) -> str:
+        token = self.token_of(chunk)
+        if token:
+            if not self.tokens:
+                _record_ttft(time.monotonic() - self.started)
+            self.tokens.append(token)
+        if chunk.get("done"):
+            self.final = chunk
+        return token
+
+    def failed(self):
+        with _STREAM_METRICS_LOCK:
+            _STREAM_METRICS["errors"] += 1
+
+    def result(self) -> dict:
+        return {**self.final, "content": "".join(self.tokens)}
+
+def _stream_tokens(path: str, payload: dict, kind: str, token_of) -> Generator[str, None, dict]:
+    stream = _TokenStream(token_of)
+    chunks = OLLAMA_ASYNC.stream_sync(path, payload, kind=kind)
+    try:
+        with closing(chunks):
+            for chunk in chunks:
+                token = stream.add(chunk)
+                if token:
+                    yield token
+                if chunk.get("done"):
+                    break
+    except Exception:
+        stream.failed()
+        raise
+
+    return stream.result()
+
+async def _stream_tokens_async(path: str, payload: dict, kind: str, token_of, final: dict) -> AsyncIterator[str]:
+    stream = _TokenStream(token_of)
+    chunks = OLLAMA_ASYNC.stream(path, payload, kind=kind)
+    try:
+        async with aclosing(chunks):
+            async for chunk in chunks:
+                token = stream.add(chunk)
+                if token:
+                    yield token
+                if chunk.get("done"):
+                    break
+    except Exception:
+        stream.failed()
+        raise
+
+    final.update(stream.result())
 
-    response.raise_for_status()
-    data = response.json()
+def _record_ttft(seconds: float):
+    with _STREAM_METRICS_LOCK:
+        _STREAM_METRICS["ttft_count"] += 1
+        _STREAM_METRICS["ttft_total"] += seconds
+        _STREAM_METRICS["ttft_last"] = seconds
 
-    return data.get("response", "")
+def chat_stream_metrics() -> dict:
+    """
+    Streamed chat counts and time-to-first-token (seconds).
+    """
+    with _STREAM_METRICS_LOCK:
+        metrics = dict(_STREAM_METRICS)
+    count = metrics.pop("ttft_count")
+    total = metrics.pop("ttft_total")
+    metrics["ttft_mean"] = total / count if count else None
+    return metrics
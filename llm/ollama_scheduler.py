@@ -0,0 +1,122 @@
+import asyncio
+import time
+from collections import deque
+
+
+class QueueFull(Exception):
+    pass
+
+
+class PriorityScheduler:
+    """
+    Hands out Ollama model slots by priority class. Lives on the Ollama
+    client's event loop, so it needs no locks.
+
+    - classes are listed from most to least urgent; a free slot goes to
+      the head of the most urgent non-empty queue.
+    - Waiting ages a request: every `aging` seconds in the queue counts as
+      one class more urgent, so background work cannot starve.
+    - Each queue holds at most queue_limits[class] requests; beyond that
+      acquire() raises QueueFull at once instead of piling up work.
+    - Classes in class_slots may hold only that many slots at a time,
+      which keeps a slot free for interactive requests during a report.
+    """
+
+    def __init__(
+        self,
+        slots: int,
+        classes: list[str],
+        queue_limits: dict[str, int],
+        class_slots: dict[str, int],
+        aging: float,
+    ):
+        self.slots = slots
+        self.classes = list(classes)
+        self.queue_limits = dict(queue_limits)
+        self.class_slots = dict(class_slots)
+        self.aging = aging
+        self.active = 0
+        self._active: dict[str, int] = {c: 0 for c in self.classes}
+        self._waiting: dict[str, deque] = {c: deque() for c in self.classes}
+        self._stats = {
+            c: {"served": 0, "rejected": 0, "max_depth": 0, "wait_total": 0.0, "wait_max": 0.0}
+            for c in self.classes
+        }
+
+    async def acquire(self, klass: str):
+        queue = self._waiting[klass]
+        limit = self.queue_limits.get(klass)
+        if limit is not None and len(queue) >= limit:
+            self._stats[klass]["rejected"] += 1
+            raise QueueFull(f"Ollama {klass} queue is full ({limit} waiting)")
+
+        entry = (time.monotonic(), asyncio.get_running_loop().create_future())
+        queue.append(entry)
+        stats = self._stats[klass]
+        stats["max_depth"] = max(stats["max_depth"], len(queue))
+        self._dispatch()
+
+        try:
+            await entry[1]
+        except asyncio.CancelledError:
+            if entry[1].done() and not entry[1].cancelled():
+                # Granted just as the caller gave up
+                self.release(klass)
+            elif entry in queue:
+                queue.remove(entry)
+            raise
+
+    def release(self, klass: str):
+        self.active -= 1
+        self._active[klass] -= 1
+        self._dispatch()
+
+    def _eligible(self, klass: str) -> bool:
+        cap = self.class_slots.get(klass)
+        return cap is None or self._active[klass] < cap
+
+    def _next(self) -> str | None:
+        now = time.monotonic()
+        best, best_rank = None, None
+        for rank, klass in enumerate(self.classes):
+            queue = self._waiting[klass]
+            if not queue or not self._eligible(klass):
+                continue
+            effective = rank - (now - queue[0][0]) / self.aging
+            if best_rank is None or effective < best_rank:
+                best, best_rank = klass, effective
+        return best
+
+    def _dispatch(self):
+        while self.active < self.slots:
+            klass = self._next()
+            if klass is None:
+                return
+            queued_at, future = self._waiting[klass].popleft()
+            if future.done():
+                continue
+
+            waited = time.monotonic() - queued_at
+            stats = self._stats[klass]
+            stats["served"] += 1
+            stats["wait_total"] += waited
+            stats["wait_max"] = max(stats["wait_max"], waited)
+            self.active += 1
+            self._active[klass] += 1
+            future.set_result(None)
+
+    def stats(self) -> dict:
+        classes = {}
+        for klass in self.classes:
+            stats = dict(self._stats[klass])
+            served, waited = stats["served"], stats.pop("wait_total")
+            stats["wait_mean"] = waited / served if served else None
+            stats["waiting"] = len(self._waiting[klass])
+            stats["active"] = self._active[klass]
+            classes[klass] = stats
+        return {
+            "slots": self.slots,
+            "active": self.active,
+            "waiting": sum(len(q) for q in self._waiting.values()),
+            "classes": classes,
+        }
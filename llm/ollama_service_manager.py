@@ -1,17 +1,28 @@
 import subprocess
-import requests
+import threading
 import time
 
-OLLAMA_URL = "http://localhost:11434"
+import httpx
+
+from config import (
+    OLLAMA_MODEL,
+    EMBEDDING_MODEL,
+    OLLAMA_KEEP_ALIVE,
+    OLLAMA_AUTOSTART,
+    OLLAMA_HEALTH_INTERVAL,
+    OLLAMA_HEALTH_MAX_BACKOFF,
+    OLLAMA_PRELOAD_REFRESH,
+)
+from llm.ollama_async import OLLAMA_ASYNC
 
 def is_ollama_running() -> bool:
     try:
-        requests.get(OLLAMA_URL, timeout=1)
+        OLLAMA_ASYNC.get_sync("/", kind="health")
         return True
-    except requests.RequestException:
+    except httpx.HTTPError:
         return False
 
-def start_ollama():
+def _spawn_ollama():
     subprocess.Popen(
         ["ollama", "serve"],
         stdout=subprocess.DEVNULL,
@@ -19,6 +30,9 @@ def start_ollama():
         shell=True
     )
 
+def start_ollama():
+    _spawn_ollama()
+
     # Wait until server is ready
     for _ in range(10):
         if is_ollama_running():
@@ -26,3 +40,128 @@ def start_ollama():
         time.sleep(1)
 
     return False
+
+
+# -----------------------------
+# Background health monitor
+# -----------------------------
+class OllamaHealthMonitor:
+    """
+    Probes Ollama on a background thread so requests can read liveness
+    without a network round trip. While Ollama is up it is probed every
+    OLLAMA_HEALTH_INTERVAL seconds and the configured models are kept
+    loaded; while it is down probes back off exponentially and
+    `ollama serve` is launched once per outage.
+    """
+
+    def __init__(self, models: list[tuple[str, str]], autostart: bool):
+        self.models = models
+        self.autostart = autostart
+        self._alive = threading.Event()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._spawned = False
+        self._status = {
+            "alive": None,
+            "last_probe": None,
+            "last_change": None,
+            "failures": 0,
+            "next_probe_in": None,
+            "serve_started": False,
+            "models": {},
+        }
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="ollama-health", daemon=True)
+                self._thread.start()
+
+    @property
+    def alive(self) -> bool:
+        return self._alive.is_set()
+
+    def request_probe(self):
+        self._wake.set()
+
+    def wait_until_alive(self, timeout: float) -> bool:
+        """
+        Returns at once when Ollama is known to be up; otherwise probes
+        now and waits up to `timeout` seconds for it to come up.
+        """
+        if self.alive:
+            return True
+        self.start()
+        self.request_probe()
+        return self._alive.wait(timeout)
+
+    def status(self) -> dict:
+        with self._lock:
+            return {**self._status, "models": dict(self._status["models"])}
+
+    def _update(self, **fields):
+        with self._lock:
+            self._status.update(fields)
+
+    def _run(self):
+        backoff = 1.0
+        while True:
+            up = is_ollama_running()
+            now = time.time()
+            changed = up != self._status["alive"]
+
+            if up:
+                self._alive.set()
+                backoff = 1.0
+                self._spawned = False
+                self._update(alive=True, last_probe=now, failures=0)
+                if changed:
+                    self._update(last_change=now)
+                self._preload(force=changed)
+                delay = OLLAMA_HEALTH_INTERVAL
+            else:
+                self._alive.clear()
+                self._update(alive=False, last_probe=now, failures=self._status["failures"] + 1)
+                if changed:
+                    self._update(last_change=now, models={})
+                if self.autostart and not self._spawned:
+                    self._spawned = True
+                    try:
+                        _spawn_ollama()
+                        self._update(serve_started=True)
+                    except Exception as e:
+                        print("[OLLAMA START ERROR]", e)
+                delay = backoff
+                backoff = min(backoff * 2, OLLAMA_HEALTH_MAX_BACKOFF)
+
+            self._update(next_probe_in=delay)
+            self._wake.wait(delay)
+            self._wake.clear()
+
+    def _preload(self, force: bool):
+        for model, endpoint in self.models:
+            loaded = self._status["models"].get(model)
+            if not force and loaded and time.time() - loaded < OLLAMA_PRELOAD_REFRESH:
+                continue
+            try:
+                # A request without input only loads the model
+                OLLAMA_ASYNC.post_sync(endpoint, {"model": model, "keep_alive": OLLAMA_KEEP_ALIVE, "stream": False}, kind="preload")
+                with self._lock:
+                    self._status["models"][model] = time.time()
+            except Exception as e:
+                print("[OLLAMA PRELOAD ERROR]", model, e)
+
+
+OLLAMA_MONITOR = OllamaHealthMonitor(
+    [(OLLAMA_MODEL, "/api/generate"), (EMBEDDING_MODEL, "/api/embed")],
+    autostart=OLLAMA_AUTOSTART,
+)
+
+
+def start_ollama_monitor():
+    OLLAMA_MONITOR.start()
+
+
+def ollama_health_status() -> dict:
+    return OLLAMA_MONITOR.status()
@@ -1,110 +1,173 @@
-import re
+import hashlib
+import inspect
+import json
+from functools import lru_cache
+from pathlib import Path
+from types import CodeType
+
+import llm.intent_classifier as intent_classifier
+import llm.intent_rules as intent_rules
+import llm.intent_text as intent_text
+from config import (
+    OLLAMA_MODEL,
+    EMBEDDING_MODEL,
+    INTENT_SIM_THRESHOLD,
+    INTENT_CACHE_ENABLED,
+    INTENT_CACHE_TTL,
+    INTENT_CACHE_VERSION,
+    SCREENSHOT_DIR,
+)
 from llm.chat_engine import chat_response
-from llm.intent_classifier import classify_intent_hybrid
+from llm.intent_classifier import INTENT_CATALOG, classify_intent_hybrid
+from llm.intent_text import default_screenshot_path
+from llm.intent_rules import INTENT_RULES, match_rule_intent
+from memory.intent_cache import get_cached_intent, set_cached_intent, clear_intent_cache
 
-URL_REGEX = re.compile(r"(https?://[^\s]+)", re.IGNORECASE)
 
+def _code_digest(code: CodeType) -> str:
+    """
+    Hash of a function body: bytecode, the names it looks up and its
+    constants (prompt text, keyword lists), nested functions included.
+    """
+    h = hashlib.sha1(code.co_code)
+    h.update(repr(code.co_names).encode("utf-8"))
+    for const in code.co_consts:
+        if isinstance(const, CodeType):
+            h.update(_code_digest(const).encode("ascii"))
+        elif isinstance(const, frozenset):
+            # `x in {...}` literals; set order varies with the hash seed
+            h.update(repr(sorted(map(repr, const))).encode("utf-8"))
+        else:
+            h.update(repr(const).encode("utf-8"))
+    return h.hexdigest()
 
-def generate_intent(text: str) -> dict:
-    text = text.strip()
-    text_l = text.lower()
 
-    # ------------------------------
-    # 1. OPEN FOLDER (explicit ONLY)
-    # ------------------------------
-    if text_l.startswith("open folder"):
-        folder = text[11:].strip()
-        return {
-            "mode": "tool",
-            "tool": "open_folder_by_name",
-            "args": {"folder_name": folder},
-        }
+def _module_digests(module) -> dict[str, str]:
+    return {
+        name: _code_digest(fn.__code__)
+        for name, fn in inspect.getmembers(module, inspect.isfunction)
+        if fn.__module__ == module.__name__
+    }
 
-    # ------------------------------
-    # 2. OPEN APPLICATION
-    # ------------------------------
-    if text_l.startswith("open "):
-        target = text[5:].strip()
-
-        # Safety: do NOT auto-convert app to folder
-        return {
-            "mode": "tool",
-            "tool": "open_app",
-            "args": {"app_name": target},
-        }
 
-    # ------------------------------
-    # 3. YOUTUBE SEARCH / PLAY
-    # ------------------------------
-    if "youtube" in text_l and ("search" in text_l or "play" in text_l):
-        query = (
-            text_l.replace("search", "")
-            .replace("play", "")
-            .replace("on youtube", "")
-            .replace("youtube", "")
-            .strip()
-        )
-        return {
-            "mode": "tool",
-            "tool": "play_youtube_video",
-            "args": {"topic": query},
+@lru_cache(maxsize=1)
+def intent_cache_fingerprint() -> str:
+    """
+    Changes whenever the catalog, the models or the code of the rule and
+    classifier modules change (LLM prompt and argument helpers included),
+    so cached intents resolved under an older setup are never served.
+    INTENT_CACHE_VERSION covers anything else.
+    """
+    rules = [
+        {
+            "name": rule["name"],
+            "prefix": rule.get("prefix", []),
+            "contains": rule.get("contains", []),
         }
+        for rule in INTENT_RULES
+    ]
+    code = [_module_digests(m) for m in (intent_rules, intent_text, intent_classifier)]
+    payload = json.dumps(
+        [INTENT_CACHE_VERSION, OLLAMA_MODEL, EMBEDDING_MODEL, INTENT_SIM_THRESHOLD, INTENT_CATALOG, rules, code],
+        sort_keys=True,
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
 
-    # ------------------------------
-    # 4. SEARCH WEB (explicit)
-    # ------------------------------
-    if text_l.startswith("search "):
-        query = text[7:].strip()
-        return {
-            "mode": "tool",
-            "tool": "search_web",
-            "args": {"query": query},
-        }
 
+def purge_stale_intents() -> None:
+    """
+    Drops cached intents resolved under an older fingerprint. They are
+    never served anyway; this only reclaims the rows.
+    """
+    if not INTENT_CACHE_ENABLED:
+        return
+    try:
+        clear_intent_cache(intent_cache_fingerprint())
+    except Exception as e:
+        print("[INTENT CACHE PURGE ERROR]", e)
+
+
+def _cache_key(text: str) -> str:
+    # Whitespace only: args such as typed text keep the user's casing
+    return " ".join(text.split())
+
+
+def _is_default_screenshot(filename: str | None) -> bool:
+    if not filename:
+        return False
+    path = Path(filename)
+    return path.parent == Path(SCREENSHOT_DIR) and path.name.startswith("screenshot_")
+
+
+def _cacheable_args(intent: dict) -> dict:
+    args = dict(intent.get("args") or {})
+    # Timestamped default filenames are regenerated on every hit
+    if intent.get("tool") == "take_screenshot" and _is_default_screenshot(args.get("filename")):
+        args.pop("filename")
+    return args
+
+
+# Stages whose intents are worth caching; rules answer faster than a lookup
+_CACHED_SOURCES = {"embedding", "learned", "llm"}
+
+
+def _from_cache(text: str) -> dict | None:
+    intent = get_cached_intent(_cache_key(text), intent_cache_fingerprint(), INTENT_CACHE_TTL)
+    if not intent:
+        return None
+    intent["source"] = "cache"
+    if intent["tool"] == "take_screenshot" and not intent["args"].get("filename"):
+        intent["args"]["filename"] = default_screenshot_path()
+    return intent
+
+
+def _resolve_tool_intent(text: str) -> dict | None:
     # ------------------------------
-    # 5. OPEN URL (explicit or raw)
+    # 3. SEMANTIC INTENT (embedding + LLM)
     # ------------------------------
-    if text_l.startswith("open url"):
-        url = text[8:].strip()
-        return {
-            "mode": "tool",
-            "tool": "open_url",
-            "args": {"url": url},
-        }
+    return classify_intent_hybrid(text)
 
-    url_match = URL_REGEX.search(text)
-    if url_match:
-        return {
-            "mode": "tool",
-            "tool": "open_url",
-            "args": {"url": url_match.group(1)},
-        }
+
+def generate_intent(text: str, defer_chat: bool = False) -> dict:
+    """
+    With defer_chat, a chat fallback is returned without a response so the
+    caller can stream one instead.
+    """
+    text = text.strip()
 
     # ------------------------------
-    # 6. SEND WHATSAPP (WEB)
+    # 1. KEYWORD RULES (explicit commands + heuristics, llm/intent_rules.py)
     # ------------------------------
-    if text_l.startswith("send whatsapp"):
-        content = text[13:].strip()
-        parts = content.split(" ", 1)
-        return {
-            "mode": "tool",
-            "tool": "send_whatsapp",
-            "args": {
-                "recipient": parts[0],
-                "message": parts[1] if len(parts) > 1 else "",
-            },
-        }
+    intent = match_rule_intent(text)
+    if intent:
+        return intent
 
     # ------------------------------
-    # 7. SEMANTIC INTENT (HYBRID)
+    # 2. INTENT CACHE (exact utterance)
     # ------------------------------
-    intent = classify_intent_hybrid(text)
+    if INTENT_CACHE_ENABLED:
+        try:
+            cached = _from_cache(text)
+        except Exception:
+            cached = None
+        if cached:
+            return cached
+
+    intent = _resolve_tool_intent(text)
     if intent:
+        if INTENT_CACHE_ENABLED and intent.get("tool") and intent.get("source") in _CACHED_SOURCES:
+            try:
+                set_cached_intent(_cache_key(text), intent_cache_fingerprint(), intent["tool"], _cacheable_args(intent))
+            except Exception:
+                pass
         return intent
 
     # ------------------------------
-    # 8. CHAT FALLBACK
+    # 4. CHAT FALLBACK
     # ------------------------------
+    if defer_chat:
+        return {"mode": "chat", "response": None}
+
     return {
         "mode": "chat",
         "response": chat_response(text),
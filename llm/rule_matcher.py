@@ -0,0 +1,133 @@
+import re
+
+
+class RuleMatcher:
+    """
+    Compiles keyword rules into a single trie-shaped regex so every keyword
+    occurrence in the input is found in one left-to-right pass.
+
+    A rule is a dict:
+        name      label used in diagnostics
+        prefix    keywords of which one must start the (lowercased) text
+        contains  groups of keywords; every group needs at least one hit
+        extract   fn(text, text_l, hits) -> intent dict or None, where
+                  `kw in hits` tells whether keyword kw occurs in the text
+
+    Rules are tried in declaration order, but only those whose keywords were
+    seen in the scan are considered, so adding rules does not add per-rule
+    scanning cost. An extractor returning None falls through to the next
+    candidate rule.
+
+    The scan has a fixed cost of its own. Up to linear_max_rules rules,
+    checking each rule with str.startswith / `in` is cheaper, so small
+    rule sets skip the regex and are tried one by one; hits is then the
+    lowercased text itself, where `in` is a substring test.
+    """
+
+    def __init__(self, rules: list[dict], linear_max_rules: int = 24):
+        self.rules = list(rules)
+        self.linear = len(self.rules) <= linear_max_rules
+        self._compiled = [
+            (
+                rule,
+                tuple(rule.get("prefix", [])),
+                [tuple(group) for group in rule.get("contains", [])],
+            )
+            for rule in self.rules
+        ]
+
+        keywords: set[str] = set()
+        self._keyword_rules: dict[str, list[int]] = {}
+        self._always: list[int] = []
+        for idx, rule in enumerate(self.rules):
+            rule_keywords = list(rule.get("prefix", []))
+            for group in rule.get("contains", []):
+                rule_keywords.extend(group)
+            if not rule_keywords:
+                self._always.append(idx)
+            for kw in dict.fromkeys(rule_keywords):
+                keywords.add(kw)
+                self._keyword_rules.setdefault(kw, []).append(idx)
+
+        # The scan reports the longest keyword at each position; any shorter
+        # keyword that is a prefix of it matched at the same position too
+        self._implied = {
+            kw: frozenset(other for other in keywords if kw.startswith(other))
+            for kw in keywords
+        }
+        self._regex = re.compile(f"(?=({self._trie_pattern(keywords)}))") if keywords else None
+
+    @staticmethod
+    def _trie_pattern(keywords: set[str]) -> str:
+        trie: dict = {}
+        for kw in keywords:
+            node = trie
+            for ch in kw:
+                node = node.setdefault(ch, {})
+            node[""] = {}
+
+        def emit(node: dict) -> str:
+            terminal = "" in node
+            branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+            if not branches:
+                return ""
+            body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+            if terminal:
+                # Greedy optional: prefer the longer keyword, fall back to this one
+                return f"(?:{body})?"
+            return body
+
+        return emit(trie)
+
+    def scan(self, text_l: str) -> set[str]:
+        """
+        Returns the keywords found anywhere in text_l.
+        """
+        if self._regex is None:
+            return set()
+        hits: set[str] = set()
+        for kw in self._regex.findall(text_l):
+            hits.update(self._implied[kw])
+        return hits
+
+    def match(self, text: str) -> tuple[dict, dict] | None:
+        """
+        Returns (rule, intent) for the first rule that matches and extracts,
+        or None.
+        """
+        text_l = text.lower()
+        if self.linear:
+            return self._match_linear(text, text_l)
+
+        hits = self.scan(text_l)
+        candidates = set(self._always)
+        for kw in hits:
+            candidates.update(self._keyword_rules[kw])
+
+        for idx in sorted(candidates):
+            rule, prefixes, groups = self._compiled[idx]
+            if prefixes and not text_l.startswith(prefixes):
+                continue
+            if any(hits.isdisjoint(group) for group in groups):
+                continue
+            intent = rule["extract"](text, text_l, hits)
+            if intent:
+                return rule, intent
+        return None
+
+    def _match_linear(self, text: str, text_l: str) -> tuple[dict, dict] | None:
+        for rule, prefixes, groups in self._compiled:
+            if prefixes and not text_l.startswith(prefixes):
+                continue
+            # for/else: every contains group needs one keyword in the text
+            for group in groups:
+                for kw in group:
+                    if kw in text_l:
+                        break
+                else:
+                    break
+            else:
+                intent = rule["extract"](text, text_l, text_l)
+                if intent:
+                    return rule, intent
+        return None
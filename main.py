@@ -1,12 +1,39 @@
-from llm.reasoning_engine import generate_intent
-from llm.command_chain_parser import parse_command_chain
+import asyncio
+
+from llm.reasoning_engine import generate_intent, purge_stale_intents
+from llm.command_chain_parser import parse_command_chain, split_command_chain
 from automation.executor import execute_plan
+from automation.chain_runner import start_chain_run
+from automation.tool_router import UI_TOOL, tool_class
+from automation.ui_lane import desktop_turn
+from llm.intent_classifier import start_intent_warmup, learn_from_execution
+from llm.ollama_service_manager import start_ollama_monitor
+from llm.chat_engine import (
+    chat_response,
+    chat_response_stream,
+    chat_response_async,
+    chat_response_stream_async,
+)
+from memory.log_store import log_event
 
 
 class AIPROSCore:
-    def process_input(self, user_input: str):
+    def __init__(self, warm_up: bool = True):
+        # Probe Ollama, load the models and embed the intent catalog in
+        # the background so the first command does not pay for it
+        if warm_up:
+            start_ollama_monitor()
+            start_intent_warmup()
+            purge_stale_intents()
+
+    def process_input(self, user_input: str, stream_chat: bool = False, session_id: str | None = None):
+        """
+        With stream_chat, a chat reply comes back as a token generator
+        under "stream" instead of a finished "response". With session_id,
+        chat replies continue that conversation.
+        """
         # 🔹 Phase D1: parse command chain
-        intents = parse_command_chain(user_input)
+        intents = parse_command_chain(user_input, defer_chat=stream_chat or bool(session_id))
 
         # -----------------------------
         # Single intent (existing behavior)
@@ -16,18 +43,23 @@ class AIPROSCore:
 
             # Chat mode
             if intent.get("mode") == "chat":
+                if stream_chat:
+                    return {
+                        "mode": "chat",
+                        "stream": chat_response_stream(intent["raw"], session_id=session_id)
+                    }
+                if session_id:
+                    return {
+                        "mode": "chat",
+                        "response": chat_response(intent["raw"], session_id=session_id)
+                    }
                 return {
                     "mode": "chat",
                     "response": intent.get("response")
                 }
 
             # Execute single command
-            execution = execute_plan(intent, user_input)
-
-            return {
-                "mode": "command",
-                **execution
-            }
+            return self._run_command(user_input, intent)
 
         # -----------------------------
         # Multiple intents (Phase D1 only)
@@ -35,4 +67,80 @@ class AIPROSCore:
         return {
             "mode": "chain",
             "intents": intents
-        }
\ No newline at end of file
+        }
+
+    async def process_input_async(self, user_input: str, stream_chat: bool = False, session_id: str | None = None):
+        """
+        process_input for an event loop. Chat replies await the async
+        Ollama client, so no thread waits out the generation; parsing and
+        command execution (desktop work) run in a worker thread. A
+        streamed reply is an async token iterator.
+        """
+        intents = await asyncio.to_thread(parse_command_chain, user_input, True)
+
+        if len(intents) == 1:
+            intent = intents[0]
+
+            if intent.get("mode") == "chat":
+                if stream_chat:
+                    return {
+                        "mode": "chat",
+                        "stream": chat_response_stream_async(intent["raw"], session_id=session_id)
+                    }
+                return {
+                    "mode": "chat",
+                    "response": await chat_response_async(intent["raw"], session_id=session_id)
+                }
+
+            return await asyncio.to_thread(self._run_command, user_input, intent)
+
+        return {
+            "mode": "chain",
+            "intents": intents
+        }
+
+    def _run_command(self, user_input: str, intent: dict) -> dict:
+        # Desktop tools wait for chain steps that are typing or clicking
+        # (mixed tools take their own turn)
+        if tool_class(intent.get("tool")) == UI_TOOL:
+            with desktop_turn():
+                execution = execute_plan(intent, user_input)
+        else:
+            execution = execute_plan(intent, user_input)
+        self._record_execution(user_input, intent, execution)
+
+        return {
+            "mode": "command",
+            **execution
+        }
+
+    def start_chain(self, user_input: str, confirm=None):
+        """
+        Starts executing a compound command in the background and returns
+        the ChainRun, or None when the input is a single command.
+        """
+        commands = split_command_chain(user_input)
+        if len(commands) < 2:
+            return None
+        return start_chain_run(commands, record=self._record_execution, confirm=confirm)
+
+    def _record_execution(self, user_input: str, intent: dict, execution: dict):
+        """
+        Logs the outcome and offers successful commands to the semantic
+        classifier as new examples (see learn_from_execution for which
+        ones it keeps).
+        """
+        executed = bool(execution.get("executed"))
+        try:
+            log_event(
+                user_input,
+                intent.get("mode"),
+                intent.get("tool"),
+                intent.get("args"),
+                "success" if executed else "error",
+            )
+        except Exception as e:
+            print("[LOG ERROR]", e)
+
+        if executed:
+            learn_from_execution(user_input, intent)
@@ -0,0 +1,94 @@
+import sqlite3
+import json
+import threading
+import time
+from pathlib import Path
+
+DB_PATH = Path(__file__).parent / "aipros_logs.db"
+
+# One connection for the process: opening SQLite per lookup costs more
+# than the lookup itself
+_conn: sqlite3.Connection | None = None
+_lock = threading.Lock()
+
+
+def _get_conn() -> sqlite3.Connection:
+    global _conn
+    if _conn is None:
+        conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+        cur = conn.cursor()
+
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS intent_cache (
+                utterance TEXT PRIMARY KEY,
+                fingerprint TEXT,
+                tool TEXT,
+                args TEXT,
+                created_at REAL
+            )
+        """)
+
+        conn.commit()
+        _conn = conn
+    return _conn
+
+
+def get_cached_intent(utterance: str, fingerprint: str, ttl: float | None = None) -> dict | None:
+    """
+    Returns the stored tool intent for an utterance, or None when missing,
+    expired, or resolved under a different catalog/model/rules fingerprint.
+    """
+    with _lock:
+        cur = _get_conn().cursor()
+        cur.execute(
+            "SELECT fingerprint, tool, args, created_at FROM intent_cache WHERE utterance = ?",
+            (utterance,)
+        )
+        row = cur.fetchone()
+
+    if not row:
+        return None
+
+    stored_fingerprint, tool, args, created_at = row
+    if stored_fingerprint != fingerprint:
+        return None
+    if ttl is not None and time.time() - created_at > ttl:
+        return None
+
+    return {
+        "mode": "tool",
+        "tool": tool,
+        "args": json.loads(args) if args else {},
+    }
+
+
+def set_cached_intent(utterance: str, fingerprint: str, tool: str, args: dict | None):
+    with _lock:
+        conn = _get_conn()
+        conn.execute(
+            """
+            INSERT INTO intent_cache (utterance, fingerprint, tool, args, created_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(utterance)
+            DO UPDATE SET
+                fingerprint = excluded.fingerprint,
+                tool = excluded.tool,
+                args = excluded.args,
+                created_at = excluded.created_at
+            """,
+            (utterance, fingerprint, tool, json.dumps(args or {}), time.time())
+        )
+        conn.commit()
+
+
+def clear_intent_cache(fingerprint: str | None = None):
+    """
+    Removes every entry, or only entries not matching the given fingerprint.
+    """
+    with _lock:
+        conn = _get_conn()
+        if fingerprint is None:
+            conn.execute("DELETE FROM intent_cache")
+        else:
+            conn.execute("DELETE FROM intent_cache WHERE fingerprint != ?", (fingerprint,))
+        conn.commit()
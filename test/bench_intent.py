@@ -0,0 +1,200 @@
+"""
+Labeled intent benchmark: per-stage hit rate, latency and accuracy.
+
+Runs test/intent_corpus.json through classify_intent_hybrid as configured
+(rules, then the speculative or sequential embedding and LLM stages) and
+the chat fallback for what it leaves unresolved. Each utterance counts
+towards the stage that produced its intent, with the latency the caller
+saw. Everything runs against a deterministic local Ollama stand-in, and
+the report is written as JSON so runs can be diffed between commits.
+State the run creates stays in temporary directories; reports go to
+test/bench_reports/ (git-ignored) unless --out is given.
+
+Run: python test/bench_intent.py [--out PATH] [--repeat N]
+"""
+import argparse
+import json
+import subprocess
+import sys
+import os
+import tempfile
+import time
+from pathlib import Path
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import llm.chat_engine as chat_engine
+import llm.intent_classifier as intent_classifier
+import llm.ollama_client as ollama_client
+import llm.reasoning_engine as reasoning_engine
+from llm.ollama_async import OLLAMA_ASYNC, ollama_async_stats
+from llm.embedding_store import ExampleEmbeddingStore
+from ollama_standin import StandinOllama
+
+CORPUS_PATH = Path(__file__).parent / "intent_corpus.json"
+REPORT_DIR = Path(__file__).parent / "bench_reports"
+STAGES = ["rule", "embedding", "learned", "llm", "chat"]
+
+
+def _registered_tools() -> list[str]:
+    try:
+        from automation.tool_router import TOOL_REGISTRY
+        return sorted(TOOL_REGISTRY)
+    except Exception:
+        # Input automation needs a display; the catalog lists the same tools
+        return sorted({entry["tool"] for entry in intent_classifier.INTENT_CATALOG})
+
+
+def _point_at(host: str, workdir: Path):
+    OLLAMA_ASYNC.host = host
+
+    # Cold, isolated state: nothing is read from or written to data/;
+    # no persisted embeddings, no cached intents or completions
+    intent_classifier._EXAMPLE_STORE = ExampleEmbeddingStore(workdir, intent_classifier.EMBEDDING_MODEL)
+    intent_classifier._LEARNED_PATH = workdir / intent_classifier._LEARNED_PATH.name
+    intent_classifier._EXAMPLE_EMBEDS.clear()
+    intent_classifier._INDEX = None
+    intent_classifier._QUERY_EMBEDS.clear()
+    intent_classifier.LEARNED_INDEX_ENABLED = False
+    reasoning_engine.INTENT_CACHE_ENABLED = False
+    ollama_client.LLM_CACHE_ENABLED = False
+
+
+def _percentile(values: list[float], pct: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def _latency_summary(values: list[float]) -> dict:
+    ms = [v * 1000 for v in values]
+    return {
+        "n": len(ms),
+        "p50_ms": _percentile(ms, 50),
+        "p95_ms": _percentile(ms, 95),
+        "p99_ms": _percentile(ms, 99),
+        "mean_ms": sum(ms) / len(ms) if ms else None,
+    }
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def _classify(text: str) -> tuple[str, str, float]:
+    """
+    Resolves text the way generate_intent does (minus the intent cache);
+    returns (stage, predicted tool, seconds).
+    """
+    intent, dt = _timed(intent_classifier.classify_intent_hybrid, text)
+    if intent:
+        return intent.get("source", "llm"), intent["tool"], dt
+
+    # Chat latency includes the semantic stages that gave up first
+    _, chat_dt = _timed(chat_engine.chat_response, text)
+    return "chat", "chat", dt + chat_dt
+
+
+def run(repeat: int = 1) -> dict:
+    corpus = json.loads(CORPUS_PATH.read_text(encoding="utf-8"))
+    tools = _registered_tools()
+    uncovered = sorted(set(tools) - {item["expected"] for item in corpus})
+
+    standin = StandinOllama()
+    with standin as host, tempfile.TemporaryDirectory() as workdir:
+        _point_at(host, Path(workdir))
+
+        _, warmup_s = _timed(intent_classifier.warm_up_intent_index)
+        standin.requests.clear()
+
+        timings = {stage: [] for stage in STAGES}
+        hits = {stage: 0 for stage in STAGES}
+        correct = {stage: 0 for stage in STAGES}
+        per_tool: dict[str, dict] = {}
+        errors = []
+        end_to_end = []
+
+        for _ in range(repeat):
+            for item in corpus:
+                text, expected = item["text"], item["expected"]
+                stage, predicted, dt = _classify(text)
+                timings[stage].append(dt)
+                end_to_end.append(dt)
+                hits[stage] += 1
+                ok = predicted == expected
+                correct[stage] += ok
+                tool_stats = per_tool.setdefault(expected, {"n": 0, "correct": 0})
+                tool_stats["n"] += 1
+                tool_stats["correct"] += ok
+                if not ok:
+                    errors.append({"text": text, "expected": expected, "predicted": predicted, "stage": stage})
+
+        total = len(corpus) * repeat
+        stages = {}
+        for stage in STAGES:
+            stages[stage] = {
+                "hits": hits[stage],
+                "share_of_total": hits[stage] / total,
+                "accuracy": correct[stage] / hits[stage] if hits[stage] else None,
+                "latency": _latency_summary(timings[stage]),
+            }
+
+        return {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "corpus": {"utterances": len(corpus), "repeat": repeat, "uncovered_tools": uncovered},
+            "speculative": intent_classifier.INTENT_SPECULATIVE,
+            "warmup_ms": warmup_s * 1000,
+            "accuracy": sum(correct.values()) / total,
+            "stages": stages,
+            "end_to_end": _latency_summary(end_to_end),
+            # Requests made while classifying, warm-up excluded
+            "ollama_requests": dict(standin.requests),
+            "ollama_async": ollama_async_stats(),
+            "per_tool": dict(sorted(per_tool.items())),
+            "errors": errors,
+        }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.dirname(__file__)),
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--out", type=Path, default=None)
+    parser.add_argument("--repeat", type=int, default=1)
+    opts = parser.parse_args()
+
+    report = run(opts.repeat)
+    out = opts.out or REPORT_DIR / f"intent-{report['commit']}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    print(f"accuracy {report['accuracy']:.1%}  end-to-end p50 {report['end_to_end']['p50_ms']:.1f}ms")
+    for stage, stats in report["stages"].items():
+        lat = stats["latency"]
+        if not stats["hits"]:
+            print(f"  {stage:9s} no hits")
+            continue
+        print(
+            f"  {stage:9s} hits {stats['hits']:3d}  acc {stats['accuracy']:6.1%}"
+            f"  p50 {lat['p50_ms']:7.2f}ms  p95 {lat['p95_ms']:7.2f}ms  p99 {lat['p99_ms']:7.2f}ms"
+        )
+    if report["corpus"]["uncovered_tools"]:
+        print("  tools without utterances:", ", ".join(report["corpus"]["uncovered_tools"]))
+    print(f"report: {out}")
+
+
+if __name__ == "__main__":
+    main()
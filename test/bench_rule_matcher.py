@@ -0,0 +1,195 @@
+"""
+Micro-benchmark: compiled RuleMatcher vs. the original if/elif rule chain.
+
+Run: python test/bench_rule_matcher.py [iterations]
+"""
+import sys
+import os
+import timeit
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from llm.intent_text import default_screenshot_path, extract_url, split_for_app, strip_prefix
+from llm.intent_rules import INTENT_RULES, URL_REGEX, RULE_MATCHER, match_rule_intent
+from llm.rule_matcher import RuleMatcher
+
+
+# -----------------------------
+# Original chain (generate_intent steps 1-6 + hybrid heuristics)
+# -----------------------------
+def _legacy_heuristic_common_folders(text):
+    text_l = text.lower()
+    folder_names = ["documents", "document", "docs", "downloads", "desktop", "pictures", "photos", "videos", "music"]
+    verbs = ["open", "show", "show me", "go to", "take me to", "launch", "start"]
+    if any(v in text_l for v in verbs):
+        for name in folder_names:
+            if name in text_l:
+                return {"mode": "tool", "tool": "open_folder_by_name", "args": {"folder_name": name}}
+    return None
+
+
+def _legacy_heuristic_simple_tools(text):
+    text_l = text.lower()
+    if "screenshot" in text_l or "screen shot" in text_l or "capture screen" in text_l:
+        return {"mode": "tool", "tool": "take_screenshot", "args": {"filename": default_screenshot_path()}}
+    if "screen size" in text_l or "screen resolution" in text_l:
+        return {"mode": "tool", "tool": "get_screen_size", "args": {}}
+    return None
+
+
+def _legacy_heuristic_report_tools(text):
+    text_l = text.lower()
+    if " in " not in text_l:
+        return None
+    if text_l.startswith("summarize"):
+        url = extract_url(text)
+        head, app = split_for_app(text)
+        if url and app:
+            return {"mode": "tool", "tool": "summarize_url_to_app", "args": {"url": url, "app_name": app}}
+    if text_l.startswith("research "):
+        head, app = split_for_app(text)
+        if app:
+            topic = strip_prefix(head, ["research "])
+            if topic:
+                return {"mode": "tool", "tool": "research_topic_to_app", "args": {"topic": topic, "app_name": app}}
+    if text_l.startswith("write report") or text_l.startswith("write a report"):
+        head, app = split_for_app(text)
+        if app:
+            topic = strip_prefix(head, ["write report on ", "write a report on ", "write report ", "write a report "])
+            if topic:
+                return {"mode": "tool", "tool": "write_report_to_app", "args": {"topic": topic, "app_name": app}}
+    return None
+
+
+def legacy_chain(text):
+    text = text.strip()
+    text_l = text.lower()
+    if text_l.startswith("open folder"):
+        return {"mode": "tool", "tool": "open_folder_by_name", "args": {"folder_name": text[11:].strip()}}
+    if text_l.startswith("open "):
+        return {"mode": "tool", "tool": "open_app", "args": {"app_name": text[5:].strip()}}
+    if "youtube" in text_l and ("search" in text_l or "play" in text_l):
+        query = (
+            text_l.replace("search", "").replace("play", "")
+            .replace("on youtube", "").replace("youtube", "").strip()
+        )
+        return {"mode": "tool", "tool": "play_youtube_video", "args": {"topic": query}}
+    if text_l.startswith("search "):
+        return {"mode": "tool", "tool": "search_web", "args": {"query": text[7:].strip()}}
+    if text_l.startswith("open url"):
+        return {"mode": "tool", "tool": "open_url", "args": {"url": text[8:].strip()}}
+    url_match = URL_REGEX.search(text)
+    if url_match:
+        return {"mode": "tool", "tool": "open_url", "args": {"url": url_match.group(1)}}
+    if text_l.startswith("send whatsapp"):
+        parts = text[13:].strip().split(" ", 1)
+        return {
+            "mode": "tool",
+            "tool": "send_whatsapp",
+            "args": {"recipient": parts[0], "message": parts[1] if len(parts) > 1 else ""},
+        }
+    return (
+        _legacy_heuristic_common_folders(text)
+        or _legacy_heuristic_simple_tools(text)
+        or _legacy_heuristic_report_tools(text)
+    )
+
+
+CORPUS = [
+    "open folder projects",
+    "open notepad",
+    "Open Visual Studio Code",
+    "play lofi beats on youtube",
+    "search youtube for python tutorial",
+    "search python decorators",
+    "check https://example.com/docs please",
+    "send whatsapp 911234567890 hello there",
+    "show me downloads",
+    "go to my pictures",
+    "take a screenshot",
+    "capture screen now",
+    "what is my screen resolution",
+    "summarize https://openai.com in word",
+    "research ai agents in notion",
+    "write a report on climate change in google docs",
+    "write report quantum computing in word",
+    "how are you today",
+    "what is euro truck simulator 2",
+    "tell me a joke about computers and cats",
+]
+
+
+def _comparable(intent):
+    if not intent:
+        return intent
+    intent = {k: v for k, v in intent.items() if k != "source"}
+    # Screenshot filenames embed a timestamp
+    if intent.get("tool") == "take_screenshot":
+        return {**intent, "args": {}}
+    return intent
+
+
+def _best_of(fn, iterations, repeat=5):
+    # Minimum over repeats: least disturbed by other load on the machine
+    return min(timeit.repeat(fn, number=iterations, repeat=repeat))
+
+
+def _synthetic_phrasings(n):
+    return [f"run macro {i:03d} " for i in range(n)]
+
+
+def bench_scaling(iterations):
+    """
+    Latency on utterances that match nothing (the worst case for a chain)
+    as the rule set grows with extra phrasings.
+    """
+    misses = [t for t in CORPUS if legacy_chain(t) is None]
+    print("\nno-match latency vs rule count")
+    for n in (0, 100, 300):
+        phrasings = _synthetic_phrasings(n)
+        extra = [
+            {"name": p, "prefix": [p], "extract": lambda text, text_l, hits: {"mode": "tool"}}
+            for p in phrasings
+        ]
+        matcher = RuleMatcher(INTENT_RULES + extra)
+
+        def chain(text):
+            intent = legacy_chain(text)
+            if intent:
+                return intent
+            text_l = text.lower()
+            for p in phrasings:
+                if text_l.startswith(p) or p in text_l:
+                    return {"mode": "tool"}
+            return None
+
+        legacy = _best_of(lambda: [chain(t) for t in misses], iterations)
+        compiled = _best_of(lambda: [matcher.match(t) for t in misses], iterations)
+        calls = iterations * len(misses)
+        print(
+            f"  rules={len(matcher.rules):4d}  legacy {legacy / calls * 1e6:8.2f} us"
+            f"  matcher {compiled / calls * 1e6:8.2f} us"
+        )
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    mismatches = [
+        text for text in CORPUS
+        if _comparable(legacy_chain(text)) != _comparable(match_rule_intent(text.strip()))
+    ]
+
+    legacy = _best_of(lambda: [legacy_chain(t) for t in CORPUS], iterations)
+    compiled = _best_of(lambda: [match_rule_intent(t.strip()) for t in CORPUS], iterations)
+    calls = iterations * len(CORPUS)
+
+    print(f"rules: {len(RULE_MATCHER.rules)}  utterances: {len(CORPUS)}  iterations: {iterations}")
+    print(f"legacy chain : {legacy / calls * 1e6:8.2f} us/utterance")
+    print(f"rule matcher : {compiled / calls * 1e6:8.2f} us/utterance")
+    print(f"mismatches   : {mismatches or 'none'}")
+
+    bench_scaling(max(1, iterations // 4))
+
+
+if __name__ == "__main__":
+    main()
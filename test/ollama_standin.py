@@ -0,0 +1,216 @@
+"""
+Deterministic local stand-in for the Ollama HTTP API, for benchmarks.
+
+Serves /api/embeddings, /api/embed, /api/generate (streaming or not) and
+/api/chat on a background thread. Embeddings are hashed bag-of-words
+vectors, so similar utterances get similar vectors. Every reply adds a
+fixed simulated latency, which keeps runs comparable between commits.
+"""
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+EMBED_DIM = 256
+
+# Keyword -> (tool, arg name) used by the fake classifier completion
+CLASSIFIER_KEYWORDS = [
+    ("whatsapp", "send_whatsapp", None),
+    ("youtube", "play_youtube_video", "topic"),
+    ("screenshot", "take_screenshot", None),
+    ("resolution", "get_screen_size", None),
+    ("scroll", "mouse_scroll", None),
+    ("click", "mouse_click", None),
+    ("cursor", "mouse_move", None),
+    ("hotkey", "press_hotkey", "keys"),
+    ("hit ", "keyboard_press", "key"),
+    ("paste", "paste_text", "text"),
+    ("type", "type_text", "text"),
+    ("wait", "wait", None),
+    ("pause", "wait", None),
+    ("file", "open_file", "filepath"),
+    ("folder", "open_folder_by_name", "folder_name"),
+    ("look up", "search_web", "query"),
+    ("website", "open_url", "url"),
+    ("launch", "open_app", "app_name"),
+]
+
+
+def _features(text: str) -> list[str]:
+    words = re.findall(r"[a-z0-9]+", text.lower())
+    return words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+
+
+def embed(text: str) -> list[float]:
+    vec = [0.0] * EMBED_DIM
+    for feat in _features(text):
+        h = int(hashlib.md5(feat.encode("utf-8")).hexdigest(), 16)
+        vec[h % EMBED_DIM] += 1.0 if (h >> 20) & 1 else -1.0
+    return vec
+
+
+def classify(text: str) -> dict:
+    text_l = text.lower()
+    for kw, tool, arg in CLASSIFIER_KEYWORDS:
+        if kw in text_l:
+            args = {}
+            nums = [int(n) for n in re.findall(r"-?\d+", text)]
+            if tool == "wait":
+                args = {"seconds": nums[0] if nums else 1}
+            elif tool == "mouse_scroll":
+                args = {"amount": -abs(nums[0]) if nums and "down" in text_l else (nums[0] if nums else 100)}
+            elif tool in ("mouse_click", "mouse_move"):
+                args = {"x": nums[0] if nums else 0, "y": nums[1] if len(nums) > 1 else 0}
+            elif tool == "send_whatsapp":
+                args = {"recipient": str(nums[0]) if nums else "", "message": text}
+            elif arg:
+                args = {arg: text_l.split(kw, 1)[-1].strip() or text}
+            return {"mode": "tool", "tool": tool, "args": args}
+    return {"mode": "unknown"}
+
+
+class StandinOllama:
+    """
+    Usage:
+        with StandinOllama() as host:
+            ...  # point llm.ollama_async.OLLAMA_ASYNC.host at host
+    """
+
+    def __init__(
+        self,
+        embed_delay: float = 0.005,
+        first_token_delay: float = 0.05,
+        token_delay: float = 0.004,
+        batch_embed: bool = True,
+    ):
+        self.embed_delay = embed_delay
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self.batch_embed = batch_embed
+        self.requests: dict[str, int] = {}
+        self._server: ThreadingHTTPServer | None = None
+
+    @property
+    def host(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> str:
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _json(self, payload: dict, status: int = 200):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                standin._count(self.path)
+                if self.path == "/api/tags":
+                    return self._json({"models": []})
+                body = b"Ollama is running"
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                standin._count(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                req = json.loads(self.rfile.read(length) or b"{}")
+                if self.path == "/api/embeddings":
+                    time.sleep(standin.embed_delay)
+                    return self._json({"embedding": embed(req.get("prompt", ""))})
+                if self.path == "/api/embed":
+                    if not standin.batch_embed:
+                        return self._json({"error": "404 page not found"}, 404)
+                    inputs = req.get("input")
+                    inputs = [inputs] if isinstance(inputs, str) else list(inputs or [])
+                    time.sleep(standin.embed_delay)
+                    return self._json({"embeddings": [embed(t) for t in inputs]})
+                if self.path == "/api/generate":
+                    return self._generate(req)
+                if self.path == "/api/chat":
+                    messages = req.get("messages") or [{}]
+                    reply = standin._reply(messages[-1].get("content", ""))
+                    return self._stream_or_json(
+                        reply,
+                        lambda tok, done: {"message": {"role": "assistant", "content": tok}, "done": done},
+                        req.get("stream", True),
+                    )
+                self._json({"error": "not found"}, 404)
+
+            def _generate(self, req: dict):
+                prompt = req.get("prompt", "")
+                if "intent classifier" in prompt:
+                    m = re.search(r"Text: (.*)\n", prompt)
+                    text = m.group(1) if m else ""
+                    # Models tend to keep talking after the object closes
+                    reply = json.dumps(classify(text)) + "\nThis JSON describes the user's intent."
+                else:
+                    reply = standin._reply(prompt)
+                return self._stream_or_json(
+                    reply,
+                    lambda tok, done: {"response": tok, "done": done},
+                    req.get("stream", True),
+                )
+
+            def _stream_or_json(self, reply: str, frame, stream: bool):
+                tokens = re.findall(r"\S+\s*|\s+", reply) or [""]
+                time.sleep(standin.first_token_delay)
+                if not stream:
+                    time.sleep(standin.token_delay * len(tokens))
+                    payload = frame(reply, True)
+                    payload["context"] = [len(reply)]
+                    return self._json(payload)
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                try:
+                    for i, tok in enumerate(tokens):
+                        if i:
+                            time.sleep(standin.token_delay)
+                        self._chunk(json.dumps(frame(tok, False)) + "\n")
+                    done = frame("", True)
+                    done["context"] = [len(reply)]
+                    self._chunk(json.dumps(done) + "\n")
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    # Client closed early (e.g. JSON already complete)
+                    pass
+
+            def _chunk(self, data: str):
+                raw = data.encode("utf-8")
+                self.wfile.write(f"{len(raw):x}\r\n".encode("ascii") + raw + b"\r\n")
+                self.wfile.flush()
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self.host
+
+    def __exit__(self, *exc):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def _count(self, path: str):
+        self.requests[path] = self.requests.get(path, 0) + 1
+
+    @staticmethod
+    def _reply(prompt: str) -> str:
+        digest = hashlib.md5(prompt.encode("utf-8")).hexdigest()[:8]
+        return f"This is a deterministic stand-in answer ({digest}). " * 6
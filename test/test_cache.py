@@ -0,0 +1,129 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import threading
+import time
+
+from llm.cache import DiskLRU, TTLCache
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (3, 1, 2)
+
+
+def test_ttl_cache_expires_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    cache = TTLCache(maxsize=8, ttl=10)
+    cache.set("k", "v")
+
+    now[0] += 9
+    assert cache.get("k") == "v"
+    now[0] += 2
+    assert cache.get("k", "gone") == "gone"
+    assert len(cache) == 0
+
+
+def test_ttl_cache_pop_and_disabled():
+    cache = TTLCache(maxsize=4)
+    cache.set("k", "v")
+    assert cache.pop("k") == "v"
+    assert cache.pop("k", "missing") == "missing"
+
+    disabled = TTLCache(maxsize=0)
+    disabled.set("k", "v")
+    assert disabled.get("k") is None
+
+
+def _key(i: int) -> str:
+    return f"{i:02d}" + "f" * 38
+
+
+def test_disk_lru_round_trip(tmp_path):
+    disk = DiskLRU(tmp_path, max_bytes=1 << 20)
+    assert disk.read(_key(1)) is None
+    assert disk.write(_key(1), {"text": "hello", "n": [1, 2]})
+    assert disk.read(_key(1)) == {"text": "hello", "n": [1, 2]}
+
+    disk.remove(_key(1))
+    assert disk.read(_key(1)) is None
+
+
+def test_disk_lru_ignores_corrupt_files(tmp_path):
+    disk = DiskLRU(tmp_path, max_bytes=1 << 20)
+    disk.write(_key(1), {"a": 1})
+    path = next(tmp_path.glob("*/*.json.z"))
+    path.write_bytes(b"not zlib")
+    assert disk.read(_key(1)) is None
+
+
+def test_disk_lru_evicts_least_recently_read(tmp_path):
+    blob = os.urandom(512).hex()
+    probe = DiskLRU(tmp_path / "probe", max_bytes=1 << 20)
+    probe.write(_key(0), {"blob": blob})
+    size = probe._path(_key(0)).stat().st_size
+
+    # Room for three entries; the fourth pushes the oldest out
+    disk = DiskLRU(tmp_path / "lru", max_bytes=int(size * 3.5))
+    for i in range(3):
+        disk.write(_key(i), {"blob": blob})
+        os.utime(disk._path(_key(i)), (1000 + i, 1000 + i))
+
+    # Reading refreshes the mtime, so entry 0 becomes the most recent
+    assert disk.read(_key(0)) is not None
+    disk.write(_key(3), {"blob": blob})
+    disk.write(_key(4), {"blob": blob})
+
+    assert disk.read(_key(1)) is None
+    assert disk.read(_key(0)) is not None
+    assert disk.read(_key(4)) is not None
+    stats = disk.stats()
+    assert stats["evictions"] >= 1
+    assert stats["bytes"] <= disk.max_bytes
+
+
+def test_disk_lru_clear(tmp_path):
+    disk = DiskLRU(tmp_path, max_bytes=1 << 20)
+    for i in range(3):
+        disk.write(_key(i), {"i": i})
+    disk.clear()
+    assert all(disk.read(_key(i)) is None for i in range(3))
+    assert disk.stats()["bytes"] == 0
+
+
+def test_disk_lru_byte_count_tracks_overwrites_and_removals(tmp_path):
+    disk = DiskLRU(tmp_path, max_bytes=1 << 20)
+    disk.write(_key(0), {"v": "x"})
+    for size in (10, 5000, 100):
+        disk.write(_key(0), {"v": os.urandom(size).hex()})
+        assert disk.stats()["bytes"] == disk._scan_bytes()
+
+    disk.write(_key(1), {"v": "y"})
+    disk.remove(_key(0))
+    disk.remove(_key(0))
+    assert disk.stats()["bytes"] == disk._scan_bytes()
+
+
+def test_disk_lru_concurrent_writes_of_one_key(tmp_path):
+    disk = DiskLRU(tmp_path, max_bytes=1 << 20)
+    blobs = [{"writer": i, "v": os.urandom(4000).hex()} for i in range(8)]
+    threads = [threading.Thread(target=disk.write, args=(_key(0), b)) for b in blobs for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert disk.read(_key(0)) in blobs
+    assert list(tmp_path.glob("*/*.tmp")) == []
+    assert disk.stats()["bytes"] == disk._scan_bytes()
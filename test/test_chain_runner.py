@@ -0,0 +1,155 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import threading
+import time
+
+import pytest
+
+# The runner imports the executor, which needs the desktop tools
+pytest.importorskip("pyautogui")
+
+import automation.chain_runner as chain_runner
+import automation.ui_lane as ui_lane
+from automation.tool_router import IO_TOOL, MIXED_TOOL, UI_TOOL
+
+
+@pytest.fixture
+def chain(monkeypatch):
+    """
+    Runs chains whose commands name their tool ("confirm ..." pauses,
+    "fail ..." errors, "fetch ..." is I/O, "gather ..." is mixed and
+    writes through ui_turn()) against a fresh desktop lane and a fake
+    executor. Commands containing "slow" take longer to classify; `hooks`
+    maps a command to a callable run while it executes.
+    """
+    monkeypatch.setattr(ui_lane, "DESKTOP", ui_lane.UILane())
+    monkeypatch.setattr(chain_runner, "submit_command_chain", lambda commands: [None] * len(commands))
+
+    def chain_intent(future, cmd):
+        if "slow" in cmd:
+            time.sleep(0.2)
+        return {"mode": "tool", "tool": cmd.split()[0], "args": {}}
+
+    monkeypatch.setattr(chain_runner, "chain_intent", chain_intent)
+    classes = {"fetch": IO_TOOL, "gather": MIXED_TOOL}
+    monkeypatch.setattr(chain_runner, "tool_class", lambda tool: classes.get(tool, UI_TOOL))
+
+    executed = []
+    hooks = {}
+
+    def execute_plan(intent, cmd):
+        executed.append(cmd)
+        if cmd in hooks:
+            hooks[cmd]()
+        if intent["tool"] == "confirm":
+            return {"executed": False, "needs_confirmation": True, "tool": "confirm"}
+        if intent["tool"] == "fail":
+            return {"executed": False, "status": "error", "tool": "fail", "error": "failed"}
+        if intent["tool"] == "gather":
+            # Like execute_plan, tool exceptions come back as errors
+            try:
+                with ui_lane.ui_turn():
+                    executed.append(f"{cmd} (wrote)")
+            except Exception as e:
+                return {"executed": False, "status": "error", "tool": "gather", "error": str(e)}
+        return {"executed": True, "status": "success", "tool": intent["tool"]}
+
+    monkeypatch.setattr(chain_runner, "execute_plan", execute_plan)
+
+    def start(*commands, **step_hooks):
+        hooks.update(step_hooks)
+        return chain_runner.ChainRun(list(commands)), executed
+
+    return start
+
+
+def _until_stop(run) -> list[dict]:
+    return list(run.events())
+
+
+def test_unanswered_confirmation_cancels_the_run(chain, monkeypatch):
+    monkeypatch.setattr(chain_runner, "CHAIN_CONFIRM_TIMEOUT", 0.2)
+    run, executed = chain("confirm first", "type second")
+
+    assert _until_stop(run)[-1]["status"] == "paused"
+    assert _until_stop(run)[-1]["status"] == "cancelled"
+    run._thread.join(timeout=5)
+
+    assert not run._thread.is_alive()
+    assert run.steps[0]["status"] == "skipped"
+    assert run.steps[0]["message"] == "Confirmation timed out"
+    assert run.steps[1]["status"] == "skipped"
+    assert executed == ["confirm first"]
+
+
+def _in_thread(fn, timeout=2.0) -> bool:
+    """True when fn() finished within the timeout."""
+    worker = threading.Thread(target=fn, daemon=True)
+    worker.start()
+    worker.join(timeout)
+    return not worker.is_alive()
+
+
+def test_desktop_steps_run_in_chain_order(chain):
+    # The first step is classified last but still acts first
+    run, executed = chain("type slow first", "type second", "type third")
+
+    assert _until_stop(run)[-1]["status"] == "done"
+    assert executed == ["type slow first", "type second", "type third"]
+
+
+def test_io_step_does_not_hold_up_later_desktop_steps(chain):
+    typed = threading.Event()
+    waited = []
+    run, executed = chain(
+        "fetch page", "type after",
+        **{"fetch page": lambda: waited.append(typed.wait(2)), "type after": typed.set},
+    )
+
+    assert _until_stop(run)[-1]["status"] == "done"
+    assert waited == [True]
+    assert executed == ["fetch page", "type after"]
+
+
+def test_paused_run_releases_the_desktop(chain):
+    run, executed = chain("confirm first", "type second")
+    assert _until_stop(run)[-1]["status"] == "paused"
+
+    # Single commands and other chains get the desktop meanwhile
+    def single_command():
+        with ui_lane.desktop_turn():
+            pass
+
+    assert _in_thread(single_command)
+    other, _ = chain("type other")
+    assert _in_thread(lambda: _until_stop(other))
+    assert other.status == "done"
+
+    # The paused run keeps its own order: its next step waited
+    assert "type second" not in executed
+    assert run.resume()
+    assert _until_stop(run)[-1]["status"] == "done"
+    assert executed == ["confirm first", "type other", "type second"]
+
+
+def test_mixed_step_does_not_write_after_an_earlier_failure(chain):
+    # The mixed step is already gathering when the desktop step fails
+    gathering = threading.Event()
+    run, executed = chain(
+        "fail first", "gather notes",
+        **{"fail first": lambda: gathering.wait(2), "gather notes": gathering.set},
+    )
+
+    assert _until_stop(run)[-1]["status"] == "stopped"
+    assert run.steps[0]["status"] == "error"
+    assert run.steps[1]["status"] == "skipped"
+    assert "gather notes (wrote)" not in executed
+
+
+def test_mixed_step_writes_in_its_turn(chain):
+    run, executed = chain("type first", "gather notes", "type last")
+
+    assert _until_stop(run)[-1]["status"] == "done"
+    assert executed.index("type first") < executed.index("gather notes (wrote)") < executed.index("type last")
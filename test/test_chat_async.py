@@ -0,0 +1,105 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+import llm.chat_session as chat_session
+from config import CHAT_CONTEXT_TOKENS
+from llm.chat_session import ChatSession
+from llm.ollama_async import OLLAMA_ASYNC
+from ollama_standin import StandinOllama
+
+
+@pytest.fixture
+def standin(monkeypatch):
+    standin = StandinOllama(first_token_delay=0.01, token_delay=0.001)
+    with standin as host:
+        monkeypatch.setattr(OLLAMA_ASYNC, "host", host)
+        yield standin
+
+
+async def _collect(tokens) -> list[str]:
+    return [token async for token in tokens]
+
+
+def test_async_stream_matches_sync_and_records_the_turn(standin):
+    sync_reply = ChatSession("sync").reply("hello")
+    session = ChatSession("async")
+
+    # asyncio.run is a different loop from the client's own
+    tokens = asyncio.run(_collect(session.stream_async("hello")))
+
+    assert len(tokens) > 1
+    assert "".join(tokens) == sync_reply
+    assert session.turns == 1
+    assert session.messages[-1] == {"role": "assistant", "content": sync_reply}
+
+
+def test_closing_async_stream_early_drops_the_turn(standin):
+    session = ChatSession("early")
+
+    async def first_token():
+        tokens = session.stream_async("hello")
+        token = await tokens.__anext__()
+        await tokens.aclose()
+        return token
+
+    assert asyncio.run(first_token())
+    assert session.turns == 0
+    assert session.messages == []
+
+
+@pytest.fixture
+def recorded(monkeypatch):
+    """
+    Fake chat streams that take a moment per turn; returns the
+    (history length, options) each request was sent with.
+    """
+    requests = []
+
+    def stream(messages, options=None):
+        requests.append((len(messages), options))
+        time.sleep(0.05)
+        yield "reply"
+        return {"done": True, "content": "reply"}
+
+    async def stream_async(messages, final, options=None):
+        requests.append((len(messages), options))
+        await asyncio.sleep(0.05)
+        yield "reply"
+        final.update(done=True, content="reply")
+
+    monkeypatch.setattr(chat_session, "stream_ollama_chat", stream)
+    monkeypatch.setattr(chat_session, "stream_ollama_chat_async", stream_async)
+    return requests
+
+
+def test_requests_size_the_context_window(recorded):
+    session = ChatSession("ctx")
+    session.reply("one")
+    asyncio.run(session.reply_async("two"))
+
+    assert [options for _, options in recorded] == [{"num_ctx": CHAT_CONTEXT_TOKENS}] * 2
+
+
+def test_concurrent_turns_of_a_session_run_one_at_a_time(recorded):
+    session = ChatSession("turns")
+    threads = [threading.Thread(target=session.reply, args=(f"sync {i}",)) for i in range(2)]
+    for t in threads:
+        t.start()
+
+    async def replies():
+        await asyncio.gather(session.reply_async("async 0"), session.reply_async("async 1"))
+
+    asyncio.run(replies())
+    for t in threads:
+        t.join()
+
+    # Each request saw every earlier turn: 1, 3, 5, 7 messages
+    assert sorted(n for n, _ in recorded) == [1, 3, 5, 7]
+    assert session.turns == 4
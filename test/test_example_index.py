@@ -0,0 +1,100 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import numpy as np
+
+import llm.intent_classifier as intent_classifier
+from llm.example_index import LearnedExampleIndex
+
+
+def _vec(seed: int, dim: int = 32) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+
+
+def test_exact_and_near_duplicates_are_skipped():
+    index = LearnedExampleIndex(dedup_threshold=0.97)
+    v = _vec(1)
+    assert index.add("open spotify", "open_app", v)
+    assert not index.add("open spotify", "open_app", _vec(2))
+    assert not index.add("open spotify now", "open_app", v + 0.001)
+    assert len(index) == 1
+
+
+def test_per_tool_cap_evicts_oldest():
+    index = LearnedExampleIndex(per_tool_cap=3)
+    for i in range(5):
+        assert index.add(f"utterance {i}", "open_app", _vec(i))
+    index.add("other tool", "search_web", _vec(99))
+
+    assert len(index) == 4
+    assert not index.contains("utterance 0")
+    assert not index.contains("utterance 1")
+    assert index.contains("utterance 4")
+    assert index.contains("other tool")
+
+
+def test_relabel_newest_wins():
+    index = LearnedExampleIndex()
+    v = _vec(7)
+    index.add("play something", "play_youtube_video", v)
+    assert index.add("play something", "open_app", v)
+
+    assert len(index) == 1
+    assert index.search(v, k=1)[0]["tool"] == "open_app"
+
+
+def test_save_load_round_trip(tmp_path):
+    index = LearnedExampleIndex(per_tool_cap=2)
+    vectors = {f"text {i}": _vec(i) for i in range(4)}
+    for i, (text, vec) in enumerate(vectors.items()):
+        index.add(text, "open_app" if i % 2 else "search_web", vec)
+    path = tmp_path / "learned.npz"
+    assert index.save(path)
+
+    loaded = LearnedExampleIndex(per_tool_cap=2)
+    assert loaded.load(path)
+    assert len(loaded) == len(index)
+    for text, vec in vectors.items():
+        assert loaded.contains(text)
+        hit = loaded.search(vec, k=1)[0]
+        assert hit["text"] == text
+        assert hit["tool"] == index.search(vec, k=1)[0]["tool"]
+
+    # Eviction order survives the round trip
+    loaded.add("text 4", "search_web", _vec(4))
+    assert not loaded.contains("text 0")
+    assert loaded.contains("text 2")
+
+
+def test_only_llm_intents_are_learned(monkeypatch):
+    submitted = []
+    monkeypatch.setattr(intent_classifier, "LEARNED_INDEX_ENABLED", True)
+    monkeypatch.setattr(intent_classifier._LEARN_POOL, "submit", lambda fn, *args: submitted.append(args))
+
+    for source in ("rule", "cache", "embedding", "learned", None):
+        intent = {"mode": "tool", "tool": "open_app", "args": {}, "source": source}
+        intent_classifier.learn_from_execution("open spotify", intent)
+    assert submitted == []
+
+    intent_classifier.learn_from_execution("fire up spotify", {"mode": "tool", "tool": "open_app", "source": "llm"})
+    assert submitted == [("fire up spotify", "open_app")]
+
+
+def test_learning_requires_embedding_agreement(monkeypatch, tmp_path):
+    class CatalogIndex:
+        def search(self, vec, k=1):
+            return [{"tool": "open_app", "score": 0.6, "text": "open spotify"}]
+
+    learned = LearnedExampleIndex()
+    monkeypatch.setattr(intent_classifier, "_INDEX", CatalogIndex())
+    monkeypatch.setattr(intent_classifier, "_LEARNED", learned)
+    monkeypatch.setattr(intent_classifier, "_LEARNED_PATH", tmp_path / "learned.npz")
+    monkeypatch.setattr(intent_classifier, "_LEARNED_UNSAVED", 0)
+    monkeypatch.setattr(intent_classifier, "_embed_query", lambda text: list(_vec(len(text))))
+
+    intent_classifier._learn("fire up spotify", "search_web")
+    assert len(learned) == 0
+
+    intent_classifier._learn("fire up spotify", "open_app")
+    assert learned.contains("fire up spotify")
@@ -0,0 +1,144 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from automation.tools.http_cache import HTTPCache
+
+
+class _Origin:
+    """
+    Local server with one page that honours If-None-Match. `status`
+    forces an error response; `hits` counts requests per status sent.
+    """
+
+    def __init__(self):
+        self.body = "<html><body>hello</body></html>"
+        self.etag = '"v1"'
+        self.status = None
+        self.hits: dict[int, int] = {}
+        origin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if origin.status:
+                    status, body = origin.status, b"error"
+                elif self.headers.get("If-None-Match") == origin.etag:
+                    status, body = 304, b""
+                else:
+                    status, body = 200, origin.body.encode("utf-8")
+                origin.hits[status] = origin.hits.get(status, 0) + 1
+                self.send_response(status)
+                self.send_header("ETag", origin.etag)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        host, port = self.server.server_address[:2]
+        self.url = f"http://{host}:{port}/page"
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def origin():
+    server = _Origin()
+    yield server
+    server.close()
+
+
+def test_fresh_entry_skips_the_network(origin, tmp_path):
+    cache = HTTPCache(tmp_path, 1 << 20, {"default": 60})
+    first = cache.get(origin.url, timeout=5)
+    second = cache.get(origin.url, timeout=5)
+
+    assert (first.cache, second.cache) == ("network", "fresh")
+    assert second.text == first.text == origin.body
+    assert origin.hits == {200: 1}
+
+
+def test_expired_entry_revalidates_with_etag(origin, tmp_path):
+    cache = HTTPCache(tmp_path, 1 << 20, {"default": 0})
+    cache.get(origin.url, timeout=5)
+    res = cache.get(origin.url, timeout=5)
+
+    assert res.cache == "revalidated"
+    assert res.text == origin.body
+    assert origin.hits == {200: 1, 304: 1}
+
+
+def test_changed_page_is_fetched_again(origin, tmp_path):
+    cache = HTTPCache(tmp_path, 1 << 20, {"default": 0})
+    cache.get(origin.url, timeout=5)
+    origin.body, origin.etag = "<p>new</p>", '"v2"'
+
+    res = cache.get(origin.url, timeout=5)
+    assert res.cache == "network"
+    assert res.text == "<p>new</p>"
+
+
+def test_server_error_serves_stale_copy(origin, tmp_path):
+    cache = HTTPCache(tmp_path, 1 << 20, {"default": 0})
+    cache.get(origin.url, timeout=5)
+    origin.status = 503
+
+    res = cache.get(origin.url, timeout=5)
+    assert res.cache == "stale"
+    assert res.status_code == 200
+    assert res.text == origin.body
+
+
+def test_unreachable_host_serves_stale_copy_or_raises(origin, tmp_path):
+    cache = HTTPCache(tmp_path, 1 << 20, {"default": 0})
+    cache.get(origin.url, timeout=5)
+    url = origin.url
+    origin.close()
+
+    assert cache.get(url, timeout=2).cache == "stale"
+    with pytest.raises(requests.RequestException):
+        cache.get(url + "?other=1", timeout=2)
+    assert cache.stats()["errors"] == 1
+
+
+def test_errors_are_not_stored(origin, tmp_path):
+    cache = HTTPCache(tmp_path, 1 << 20, {"default": 60})
+    origin.status = 404
+    assert cache.get(origin.url, timeout=5).status_code == 404
+    origin.status = None
+    assert cache.get(origin.url, timeout=5).cache == "network"
+
+
+def test_extract_results_are_cached_per_variant(origin, tmp_path):
+    cache = HTTPCache(tmp_path, 1 << 20, {"default": 60, "wiki": 60})
+    upper = cache.get(origin.url, extract=lambda res: res.text.upper(), variant="upper", timeout=5)
+    raw = cache.get(origin.url, timeout=5)
+    again = cache.get(origin.url, source="wiki", extract=lambda res: "unused", variant="upper", timeout=5)
+
+    assert upper.text == origin.body.upper()
+    assert raw.text == origin.body
+    assert again.cache == "fresh" and again.text == upper.text
+    assert origin.hits == {200: 2}
+
+
+def test_source_ttls(origin, tmp_path, monkeypatch):
+    cache = HTTPCache(tmp_path, 1 << 20, {"default": 60, "search": 1})
+    cache.get(origin.url, source="search", timeout=5)
+    later = time.time() + 5
+    monkeypatch.setattr("automation.tools.http_cache.time.time", lambda: later)
+
+    assert cache.get(origin.url, source="default", timeout=5).cache == "fresh"
+    assert cache.get(origin.url, source="search", timeout=5).cache == "revalidated"
@@ -0,0 +1,111 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import json
+
+import numpy as np
+
+from llm.embedding_store import ExampleEmbeddingStore
+from llm.intent_classifier import _JsonObjectScanner
+from llm.intent_index import IntentIndex
+
+
+# -----------------------------
+# IntentIndex
+# -----------------------------
+def test_search_ranks_tools_by_best_example():
+    index = IntentIndex(
+        ["open_app", "search_web", "open_app"],
+        [[1, 0, 0], [0, 1, 0], [0.6, 0.8, 0]],
+    )
+    assert len(index) == 3
+    assert index.dim == 3
+    assert index.tools == ["open_app", "search_web"]
+
+    results = index.search([0.7, 0.7, 0], k=2)
+    assert [r["tool"] for r in results] == ["open_app", "search_web"]
+    # Best open_app example is [0.6, 0.8], not [1, 0]
+    assert np.isclose(results[0]["score"], (0.6 + 0.8) / np.sqrt(2))
+    assert np.isclose(results[0]["margin"], results[0]["score"] - results[1]["score"])
+    assert np.isclose(results[1]["margin"], results[1]["score"])
+
+
+def test_search_margin_uses_next_tool_beyond_k():
+    index = IntentIndex(["a", "b", "c"], [[1, 0], [0.8, 0.6], [0, 1]])
+    top = index.search([1, 0], k=1)[0]
+    assert top["tool"] == "a"
+    assert np.isclose(top["margin"], 1 - 0.8)
+
+
+def test_search_rejects_bad_queries():
+    index = IntentIndex(["a"], [[1, 0]])
+    assert index.search([0, 0]) == []
+    assert index.search([1, 0, 0]) == []
+    assert index.search([1, 0], k=0) == []
+
+
+# -----------------------------
+# ExampleEmbeddingStore
+# -----------------------------
+def test_store_round_trip(tmp_path):
+    store = ExampleEmbeddingStore(tmp_path, "nomic-embed-text")
+    assert store.load(["open notepad"]) == {}
+    assert store.save({"open notepad": [1.0, 2.0], "search cats": [3.0, 4.0]})
+
+    found = ExampleEmbeddingStore(tmp_path, "nomic-embed-text").load(["open notepad", "unknown"])
+    assert list(found) == ["open notepad"]
+    assert found["open notepad"].tolist() == [1.0, 2.0]
+
+
+def test_store_is_per_model(tmp_path):
+    ExampleEmbeddingStore(tmp_path, "model-a").save({"x": [1.0]})
+    assert ExampleEmbeddingStore(tmp_path, "model-b").load(["x"]) == {}
+
+
+def test_store_replaces_previous_vectors(tmp_path):
+    store = ExampleEmbeddingStore(tmp_path, "m")
+    store.save({"x": [1.0, 0.0]})
+    store.save({"y": [0.0, 1.0]})
+
+    assert store.load(["x", "y"]).keys() == {"y"}
+    assert len(list(tmp_path.glob("*.npy"))) == 1
+
+
+def test_store_ignores_broken_manifest(tmp_path):
+    store = ExampleEmbeddingStore(tmp_path, "m")
+    store.save({"x": [1.0, 0.0]})
+    manifest = json.loads(store.manifest_path.read_text())
+    manifest["dim"] = 3
+    store.manifest_path.write_text(json.dumps(manifest))
+    assert store.load(["x"]) == {}
+
+    store.manifest_path.write_text("{not json")
+    assert store.load(["x"]) == {}
+
+
+# -----------------------------
+# _JsonObjectScanner
+# -----------------------------
+def _feed(pieces: list[str]):
+    scanner = _JsonObjectScanner()
+    for piece in pieces:
+        data = scanner.feed(piece)
+        if data is not None:
+            return data
+    return None
+
+
+def test_scanner_finds_object_split_across_chunks():
+    text = 'Sure! {"mode": "tool", "tool": "open_app", "args": {"app_name": "notepad"}} done'
+    pieces = [text[i:i + 3] for i in range(0, len(text), 3)]
+    assert _feed(pieces) == {"mode": "tool", "tool": "open_app", "args": {"app_name": "notepad"}}
+
+
+def test_scanner_ignores_braces_inside_strings():
+    assert _feed(['{"text": "a } and { b", "q": "say \\"}\\""}']) == {"text": "a } and { b", "q": 'say "}"'}
+
+
+def test_scanner_skips_invalid_objects():
+    assert _feed(["{not json} then ", '{"mode": "unknown"}']) == {"mode": "unknown"}
+    assert _feed(['{"mode": "tool"']) is None
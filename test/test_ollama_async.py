@@ -0,0 +1,36 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import socket
+
+from llm.ollama_async import OLLAMA_ASYNC
+from llm.ollama_service_manager import is_ollama_running
+from ollama_standin import StandinOllama
+
+
+def _closed_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_health_probe_and_generation_share_one_client(monkeypatch):
+    with StandinOllama(first_token_delay=0, token_delay=0) as host:
+        monkeypatch.setattr(OLLAMA_ASYNC, "host", host)
+        before = OLLAMA_ASYNC.stats()
+
+        assert is_ollama_running()
+        OLLAMA_ASYNC.generate_sync("hello")
+        assert is_ollama_running()
+
+        after = OLLAMA_ASYNC.stats()
+        assert after["calls"]["health"] - before["calls"].get("health", 0) == 2
+        assert after["upstream"] - before["upstream"] == 3
+        # All three requests reused one keep-alive connection
+        assert after["connections_opened"] - before["connections_opened"] <= 1
+
+
+def test_health_probe_reports_an_unreachable_server(monkeypatch):
+    monkeypatch.setattr(OLLAMA_ASYNC, "host", f"http://127.0.0.1:{_closed_port()}")
+    assert not is_ollama_running()
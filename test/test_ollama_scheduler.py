@@ -0,0 +1,114 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import asyncio
+
+import pytest
+
+from llm.ollama_scheduler import PriorityScheduler, QueueFull
+
+CLASSES = ["interactive", "chat", "background"]
+
+
+def _scheduler(slots=1, queue_limits=None, class_slots=None, aging=60.0) -> PriorityScheduler:
+    return PriorityScheduler(slots, CLASSES, queue_limits or {}, class_slots or {}, aging)
+
+
+async def _waiter(scheduler, klass, order):
+    await scheduler.acquire(klass)
+    order.append(klass)
+
+
+def test_free_slot_goes_to_most_urgent_class():
+    async def scenario():
+        scheduler = _scheduler(slots=1)
+        await scheduler.acquire("chat")
+        order = []
+        tasks = [asyncio.create_task(_waiter(scheduler, k, order)) for k in ("background", "chat", "interactive")]
+        await asyncio.sleep(0)
+
+        # Each release hands the slot to the next waiter
+        for holder in ("chat", "interactive", "chat"):
+            scheduler.release(holder)
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+        return order, scheduler.stats()
+
+    order, stats = asyncio.run(scenario())
+    assert order == ["interactive", "chat", "background"]
+    assert stats["classes"]["chat"]["served"] == 2
+
+
+def test_full_queue_rejects_at_once():
+    async def scenario():
+        scheduler = _scheduler(slots=1, queue_limits={"background": 1})
+        await scheduler.acquire("background")
+        waiting = asyncio.create_task(scheduler.acquire("background"))
+        await asyncio.sleep(0)
+        with pytest.raises(QueueFull):
+            await scheduler.acquire("background")
+        waiting.cancel()
+        return scheduler.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["classes"]["background"]["rejected"] == 1
+
+
+def test_class_slots_keep_a_slot_free():
+    async def scenario():
+        scheduler = _scheduler(slots=2, class_slots={"background": 1})
+        await scheduler.acquire("background")
+        second = asyncio.create_task(scheduler.acquire("background"))
+        await asyncio.sleep(0)
+        granted_background = second.done()
+
+        # The spare slot still serves interactive work
+        await asyncio.wait_for(scheduler.acquire("interactive"), timeout=1)
+        second.cancel()
+        return granted_background, scheduler.stats()
+
+    granted_background, stats = asyncio.run(scenario())
+    assert not granted_background
+    assert stats["active"] == 2
+
+
+def test_waiting_ages_into_a_more_urgent_class(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("llm.ollama_scheduler.time.monotonic", lambda: now[0])
+
+    async def scenario():
+        scheduler = _scheduler(slots=1, aging=10.0)
+        await scheduler.acquire("chat")
+        order = []
+        old = asyncio.create_task(_waiter(scheduler, "background", order))
+        await asyncio.sleep(0)
+        now[0] += 25   # background has waited 2.5 classes' worth
+        new = asyncio.create_task(_waiter(scheduler, "interactive", order))
+        await asyncio.sleep(0)
+
+        scheduler.release("chat")
+        await asyncio.sleep(0)
+        scheduler.release(order[0])
+        await asyncio.gather(old, new)
+        return order
+
+    assert asyncio.run(scenario()) == ["background", "interactive"]
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def scenario():
+        scheduler = _scheduler(slots=1)
+        await scheduler.acquire("chat")
+        task = asyncio.create_task(scheduler.acquire("chat"))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        waiting = scheduler.stats()["waiting"]
+        scheduler.release("chat")
+        return waiting, scheduler.stats()
+
+    waiting, stats = asyncio.run(scenario())
+    assert waiting == 0
+    assert stats["active"] == 0
@@ -0,0 +1,43 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+
+import llm.reasoning_engine as reasoning_engine
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    """
+    Records intent-cache traffic; semantic stages answer with `semantic`.
+    """
+    calls = {"get": 0, "set": []}
+    semantic = {}
+
+    def get_cached_intent(*args):
+        calls["get"] += 1
+        return None
+
+    monkeypatch.setattr(reasoning_engine, "INTENT_CACHE_ENABLED", True)
+    monkeypatch.setattr(reasoning_engine, "get_cached_intent", get_cached_intent)
+    monkeypatch.setattr(reasoning_engine, "set_cached_intent", lambda key, fp, tool, args: calls["set"].append(tool))
+    monkeypatch.setattr(reasoning_engine, "classify_intent_hybrid", lambda text: dict(semantic) or None)
+    return calls, semantic
+
+
+def test_rule_hits_skip_the_intent_cache(cache):
+    calls, _ = cache
+    intent = reasoning_engine.generate_intent("open notepad")
+
+    assert intent["source"] == "rule"
+    assert calls == {"get": 0, "set": []}
+
+
+@pytest.mark.parametrize("source", ["embedding", "learned", "llm"])
+def test_semantic_intents_are_cached(cache, source):
+    calls, semantic = cache
+    semantic.update(mode="tool", tool="take_screenshot", args={}, source=source)
+
+    assert reasoning_engine.generate_intent("grab what is on my display")["tool"] == "take_screenshot"
+    assert calls == {"get": 1, "set": ["take_screenshot"]}
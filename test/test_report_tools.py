@@ -0,0 +1,110 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import time
+
+import pytest
+
+# report_tools pulls in the desktop tools, which need a display
+pytest.importorskip("pyautogui")
+
+import automation.tools.report_tools as report_tools
+from automation.tools.report_tools import _TextExtractor, _split_chunks
+
+
+# -----------------------------
+# _TextExtractor
+# -----------------------------
+def _extract(html: str, max_chars: int = 10_000, step: int | None = None) -> str:
+    parser = _TextExtractor(max_chars)
+    step = step or len(html)
+    for i in range(0, len(html), step):
+        parser.feed(html[i:i + step])
+    parser.close()
+    return parser.text()
+
+
+PAGE = """
+<html><head><title>Page</title><style>p { color: red }</style></head>
+<body>
+  <script>var x = "<p>hidden</p>";</script>
+  <h1>Heading</h1>
+  <p>First   paragraph
+     spans lines.</p>
+  <p>Second &amp; <b>bold</b> text.</p>
+  <h2>Next</h2>
+  <ul><li>one</li><li>two</li></ul>
+</body></html>
+"""
+
+
+def test_extractor_keeps_visible_text_in_sections():
+    assert _extract(PAGE) == (
+        "Page\n\n"
+        "Heading\n"
+        "First paragraph spans lines.\n"
+        "Second & bold text.\n\n"
+        "Next\n"
+        "one\n"
+        "two"
+    )
+
+
+def test_extractor_is_incremental():
+    assert _extract(PAGE, step=7) == _extract(PAGE)
+
+
+def test_extractor_reports_full_and_truncates():
+    parser = _TextExtractor(max_chars=20)
+    parser.feed("<p>" + "word " * 10 + "</p>")
+    assert parser.full
+    assert len(parser.text()) == 20
+    assert not _TextExtractor(max_chars=20).full
+
+
+# -----------------------------
+# _split_chunks
+# -----------------------------
+def test_short_text_is_one_chunk():
+    assert _split_chunks("short text", 100) == ["short text"]
+
+
+def test_chunks_cut_at_paragraphs_first():
+    paragraphs = ["a" * 40, "b" * 40, "c" * 40]
+    chunks = _split_chunks("\n\n".join(paragraphs), 90)
+    assert chunks == ["a" * 40 + "\n\n" + "b" * 40, "c" * 40]
+
+
+def test_long_paragraph_falls_back_to_sentences():
+    sentences = [f"Sentence number {i} is here." for i in range(10)]
+    text = "Intro.\n\n" + " ".join(sentences)
+    chunks = _split_chunks(text, 60)
+
+    assert chunks[0] == "Intro."
+    assert all(len(c) <= 60 for c in chunks)
+    assert " ".join(chunks[1:]) == " ".join(sentences)
+
+
+def test_overlong_sentence_is_cut_hard():
+    chunks = _split_chunks("x" * 250, 100)
+    assert chunks == ["x" * 100, "x" * 100, "x" * 50]
+
+
+# -----------------------------
+# _fetch_url_text
+# -----------------------------
+def test_proxy_fallback_gets_the_remaining_budget(monkeypatch):
+    timeouts = []
+
+    def get(url, timeout, **kwargs):
+        timeouts.append(timeout)
+        if len(timeouts) == 1:
+            time.sleep(0.3)
+            raise OSError("direct fetch failed")
+        raise OSError("proxy failed")
+
+    monkeypatch.setattr(report_tools.HTTP_CACHE, "get", get)
+    assert report_tools._fetch_url_text("https://example.com", timeout=1.0) is None
+    assert timeouts[0] == 1.0
+    assert 0.5 < timeouts[1] <= 0.7